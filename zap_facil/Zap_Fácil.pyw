@@ -1,19 +1,37 @@
 # zap_facil.pyw (Versão Final Refatorada)
 import wx
+import os
 import sys
+import constants as C
 from ui import ZapFacilUI
 from functions import WhatsAppBot
+from event_bus import EventBus
 from disclaimer_ui import DisclaimerDialog
 # MODIFICADO: Importa a função mais específica 'save_setting'
 from config_manager import is_disclaimer_accepted, save_setting
 
 
+def _schedule_startup_probe():
+    """
+    Usado pelo startup_benchmark.py: assim que a primeira janela estiver na
+    tela (primeira volta do loop de eventos), escreve o marcador e encerra.
+    """
+    if not os.environ.get(C.STARTUP_PROBE_ENV):
+        return
+
+    def report_and_exit():
+        print(C.STARTUP_PROBE_MARKER, flush=True)
+        os._exit(0)
+    wx.CallAfter(report_and_exit)
+
+
 def main():
     """Função principal que controla a inicialização do aplicativo."""
     app = wx.App(False)
 
     if not is_disclaimer_accepted():
         dialog = DisclaimerDialog(None)
+        _schedule_startup_probe()
         result = dialog.ShowModal()
         dialog.Destroy()
 
@@ -29,7 +47,7 @@ def main():
     frame = ZapFacilUI(
         None, title="Zap Fácil - Automação Inteligente para WhatsApp")
 
-    bot_instance = WhatsAppBot(frame)
+    bot_instance = WhatsAppBot(EventBus())
 
     # --- CORREÇÃO CRÍTICA APLICADA ---
     # Em vez de atribuir 'frame.bot' diretamente, usamos o método 'set_bot'.
@@ -38,6 +56,7 @@ def main():
     frame.set_bot(bot_instance)
 
     frame.Show()
+    _schedule_startup_probe()
     app.MainLoop()
 
 
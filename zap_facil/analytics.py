@@ -0,0 +1,157 @@
+# analytics.py
+# Consolidação (rollups) dos resultados das campanhas no banco de relatórios.
+# Os totais por dia, por origem da lista, por motivo de falha e por
+# destinatário são somados uma única vez, quando a campanha termina, e
+# subtraídos se ela for excluída. Assim os indicadores da janela de
+# relatórios nunca precisam percorrer o histórico inteiro.
+
+from datetime import datetime, timedelta
+
+import constants as C
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    day TEXT PRIMARY KEY,
+    campaigns INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    partial INTEGER NOT NULL DEFAULT 0,
+    fail INTEGER NOT NULL DEFAULT 0,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    timed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rollup_source (
+    source TEXT PRIMARY KEY,
+    campaigns INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    partial INTEGER NOT NULL DEFAULT 0,
+    fail INTEGER NOT NULL DEFAULT 0,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    timed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rollup_reasons (
+    day TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, reason)
+);
+CREATE TABLE IF NOT EXISTS rollup_recipients (
+    identifier TEXT COLLATE NOCASE PRIMARY KEY,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    fail INTEGER NOT NULL DEFAULT 0,
+    last_at REAL
+);
+"""
+
+# Totais de uma campanha, calculados apenas sobre as linhas dela.
+_CAMPAIGN_TOTALS = """
+SELECT COUNT(*),
+       COALESCE(SUM(status = :success), 0),
+       COALESCE(SUM(status = :partial), 0),
+       COALESCE(SUM(status = :failure), 0),
+       COALESCE(SUM(duration_ms), 0),
+       COUNT(duration_ms)
+FROM recipients WHERE campaign_id = :campaign_id
+"""
+
+_COUNTER_UPSERT = """
+INSERT INTO {table} ({key}, campaigns, total, success, partial, fail, duration_ms, timed)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT ({key}) DO UPDATE SET
+    campaigns = campaigns + excluded.campaigns,
+    total = total + excluded.total,
+    success = success + excluded.success,
+    partial = partial + excluded.partial,
+    fail = fail + excluded.fail,
+    duration_ms = duration_ms + excluded.duration_ms,
+    timed = timed + excluded.timed
+"""
+
+
+def _day_of(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def apply_campaign(conn, campaign_id, sign=1):
+    """
+    Soma (sign=1) ou subtrai (sign=-1) uma campanha dos rollups. Deve ser
+    chamada dentro da transação que finaliza ou exclui a campanha.
+    """
+    campaign = conn.execute(
+        "SELECT started_at, source_type, source_path FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+    if campaign is None:
+        return
+    started_at, source_type, source_path = campaign
+    day = _day_of(started_at)
+    source = source_path or source_type or C.ANALYTICS_UNKNOWN_SOURCE
+    totals = conn.execute(_CAMPAIGN_TOTALS, {
+        "success": C.STATUS_SUCCESS, "partial": C.STATUS_PARTIAL,
+        "failure": C.STATUS_FAILURE, "campaign_id": campaign_id}).fetchone()
+    row = [sign] + [sign * value for value in totals]
+    conn.execute(_COUNTER_UPSERT.format(
+        table="rollup_daily", key="day"), [day] + row)
+    conn.execute(_COUNTER_UPSERT.format(
+        table="rollup_source", key="source"), [source] + row)
+    conn.execute(
+        "INSERT INTO rollup_reasons (day, reason, count) "
+        "SELECT ?, reason, ? * COUNT(*) FROM recipients "
+        "WHERE campaign_id = ? AND status = ? AND reason IS NOT NULL AND reason != '' GROUP BY reason "
+        "ON CONFLICT (day, reason) DO UPDATE SET count = count + excluded.count",
+        (day, sign, campaign_id, C.STATUS_FAILURE))
+    conn.execute(
+        "INSERT INTO rollup_recipients (identifier, attempts, success, fail, last_at) "
+        "SELECT identifier, ? * COUNT(*), ? * SUM(status != ?), ? * SUM(status = ?), MAX(processed_at) "
+        "FROM recipients WHERE campaign_id = ? GROUP BY identifier "
+        "ON CONFLICT (identifier) DO UPDATE SET "
+        "attempts = attempts + excluded.attempts, success = success + excluded.success, "
+        "fail = fail + excluded.fail, last_at = MAX(COALESCE(last_at, 0), excluded.last_at)",
+        (sign, sign, C.STATUS_FAILURE, sign, C.STATUS_FAILURE, campaign_id))
+    # Limpa as linhas que chegaram a zero após uma exclusão.
+    if sign < 0:
+        conn.execute("DELETE FROM rollup_daily WHERE campaigns <= 0")
+        conn.execute("DELETE FROM rollup_source WHERE campaigns <= 0")
+        conn.execute("DELETE FROM rollup_reasons WHERE count <= 0")
+        conn.execute("DELETE FROM rollup_recipients WHERE attempts <= 0")
+
+
+def backfill(conn):
+    """Soma aos rollups as campanhas finalizadas antes de eles existirem."""
+    finished = conn.execute(
+        "SELECT id FROM campaigns WHERE status != ?", (C.CAMPAIGN_STATUS_RUNNING,)).fetchall()
+    for (campaign_id,) in finished:
+        apply_campaign(conn, campaign_id)
+
+
+def summary(conn, days=C.ANALYTICS_WINDOW_DAYS):
+    """
+    Indicadores dos últimos 'days' dias: campanhas, destinatários, taxa de
+    sucesso, tempo médio por destinatário e principais motivos de falha.
+    """
+    since = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    campaigns, total, success, partial, fail, duration_ms, timed = conn.execute(
+        "SELECT COALESCE(SUM(campaigns), 0), COALESCE(SUM(total), 0), COALESCE(SUM(success), 0), "
+        "COALESCE(SUM(partial), 0), COALESCE(SUM(fail), 0), COALESCE(SUM(duration_ms), 0), "
+        "COALESCE(SUM(timed), 0) FROM rollup_daily WHERE day >= ?", (since,)).fetchone()
+    top_reasons = conn.execute(
+        "SELECT reason, SUM(count) AS total FROM rollup_reasons WHERE day >= ? "
+        "GROUP BY reason ORDER BY total DESC LIMIT ?", (since, C.ANALYTICS_TOP_REASONS)).fetchall()
+    return {
+        "days": days,
+        "campaigns": campaigns,
+        "total": total,
+        "success": success,
+        "partial": partial,
+        "fail": fail,
+        "success_rate": (success + partial) / total if total else None,
+        "avg_duration_ms": duration_ms / timed if timed else None,
+        "top_reasons": [(reason, count) for reason, count in top_reasons],
+    }
+
+
+def recipient_stats(conn, identifier):
+    """Tentativas, sucessos e falhas acumulados de um destinatário."""
+    return conn.execute(
+        "SELECT identifier, attempts, success, fail, last_at FROM rollup_recipients "
+        "WHERE identifier = ?", (identifier,)).fetchone()
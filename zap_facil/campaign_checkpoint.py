@@ -0,0 +1,146 @@
+# campaign_checkpoint.py
+# Pontos de controle (checkpoints) das campanhas em andamento.
+# Cada campanha grava, no diretório de configuração, um arquivo com a sua
+# configuração (primeira linha, em JSON) seguida de uma linha por
+# destinatário processado. Se o programa, o navegador ou a máquina caírem,
+# a campanha pode ser retomada sem reenviar para quem já recebeu.
+# O cabeçalho também guarda onde os resultados estão sendo gravados (a
+# campanha no banco de relatórios e o relatório .txt), e cada linha leva a
+# sua posição na campanha: a retomada continua a mesma campanha.
+
+import os
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import constants as C
+import config_manager
+
+CHECKPOINT_DIR = config_manager.CONFIG_DIR / C.CHECKPOINT_SUBDIR
+
+# Chaves da configuração da campanha que são gravadas no checkpoint.
+_CONFIG_KEYS = ("contact_list_path", "message", "image_pdf_path",
+                "audio_path", "manual_contacts", "cooldown_hours", "export_results")
+
+
+def _checkpoint_path(campaign_id):
+    return CHECKPOINT_DIR / f"{campaign_id}{C.CHECKPOINT_SUFFIX}"
+
+
+def _serialize_config(campaign_config, campaign_id, started_at, store_id, report_path):
+    data = {key: campaign_config.get(key) for key in _CONFIG_KEYS}
+    data["source_type"] = campaign_config["source_type"].name
+    data["campaign_id"] = campaign_id
+    data["started_at"] = started_at.isoformat()
+    data["store_id"] = store_id
+    data["report_path"] = str(report_path) if report_path else None
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _deserialize_config(line):
+    data = json.loads(line)
+    config = {key: data.get(key) for key in _CONFIG_KEYS}
+    config["source_type"] = C.SourceType[data["source_type"]]
+    if config.get("manual_contacts"):
+        config["manual_contacts"] = [tuple(pair)
+                                     for pair in config["manual_contacts"]]
+    progress = {
+        "started_at": datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None,
+        "store_id": data.get("store_id"),
+        "report_path": Path(data["report_path"]) if data.get("report_path") else None,
+    }
+    return config, data["campaign_id"], progress
+
+
+class CheckpointWriter:
+    """
+    Grava o progresso de uma campanha. Cada registro vai para o sistema
+    operacional imediatamente (sobrevive a uma queda do programa); o fsync,
+    que protege contra quedas da máquina, é feito em lotes.
+    """
+
+    def __init__(self, campaign_config, campaign_id, started_at, store_id=None,
+                 report_path=None, resume=False):
+        CHECKPOINT_DIR.mkdir(parents=True, exist_ok=True)
+        self.path = _checkpoint_path(campaign_id)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        if resume and self.path.exists():
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write(_serialize_config(
+                campaign_config, campaign_id, started_at, store_id, report_path) + "\n")
+            self._sync()
+            _prune_old_checkpoints(keep=self.path)
+
+    def record(self, seq, identifier, status):
+        self._file.write(f"{status}\t{seq}\t{identifier}\n")
+        self._file.flush()
+        self._pending += 1
+        if (self._pending >= C.CHECKPOINT_FSYNC_EVERY
+                or time.monotonic() - self._last_sync >= C.CHECKPOINT_FSYNC_SECONDS):
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self, completed=False):
+        """Fecha o checkpoint; campanhas concluídas têm o arquivo removido."""
+        if self._file.closed:
+            return
+        self._sync()
+        self._file.close()
+        if completed:
+            os.remove(self.path)
+
+
+def _prune_old_checkpoints(keep):
+    checkpoints = sorted(CHECKPOINT_DIR.glob(f"*{C.CHECKPOINT_SUFFIX}"))
+    for path in checkpoints[:-C.CHECKPOINTS_TO_KEEP]:
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def load_latest():
+    """
+    Retorna (configuração, id da campanha, progresso) da campanha
+    interrompida mais recente, ou None se não houver nenhuma. O progresso
+    traz o início, a campanha no banco, o relatório, os destinatários já
+    concluídos ("done"), a última posição gravada ("last_seq") e os totais
+    de sucessos e falhas até a interrupção.
+    """
+    if not CHECKPOINT_DIR.exists():
+        return None
+    for path in sorted(CHECKPOINT_DIR.glob(f"*{C.CHECKPOINT_SUFFIX}"), reverse=True):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config, campaign_id, progress = _deserialize_config(
+                    f.readline())
+                done = set()
+                last_seq = success = fail = 0
+                for line in f:
+                    # Uma linha sem quebra no final foi gravada pela metade.
+                    if not line.endswith("\n"):
+                        break
+                    status, _, rest = line.rstrip("\n").partition("\t")
+                    seq, _, identifier = rest.partition("\t")
+                    last_seq = max(last_seq, int(seq))
+                    if status in (C.STATUS_SUCCESS, C.STATUS_PARTIAL):
+                        done.add(identifier)
+                        success += 1
+                    else:
+                        fail += 1
+            progress.update(done=done, last_seq=last_seq,
+                            success=success, fail=fail)
+            return config, campaign_id, progress
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
@@ -0,0 +1,69 @@
+# campaign_control.py
+# Estado de execução da campanha (rodando/pausada) com esperas
+# interrompíveis. As esperas do laço de envio (intervalo entre destinatários,
+# pausa e tentativas de reconexão) aguardam numa Condition em vez de dormir
+# com time.sleep: parar, retomar ou encerrar o programa acorda a thread na
+# hora, sem esperar o fim do intervalo em curso.
+
+import time
+import threading
+
+
+class CampaignController:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._running = False
+        self._paused = False
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def start(self):
+        with self._condition:
+            self._running = True
+            self._paused = False
+            self._condition.notify_all()
+
+    def stop(self):
+        """Para a campanha; retorna (estava rodando, estava pausada)."""
+        with self._condition:
+            state = (self._running, self._paused)
+            self._running = False
+            self._paused = False
+            self._condition.notify_all()
+            return state
+
+    def toggle_pause(self):
+        """Alterna pausa/retomada; retorna o novo estado de pausa."""
+        with self._condition:
+            self._paused = not self._paused
+            self._condition.notify_all()
+            return self._paused
+
+    def sleep(self, seconds):
+        """
+        Espera até 'seconds' segundos, ou menos se a campanha for parada.
+        Uma pausa não encurta a espera (nada é enviado durante ela de
+        qualquer forma) e passa a valer em wait_while_paused(). Retorna True
+        se a campanha ainda estiver rodando.
+        """
+        deadline = time.monotonic() + seconds
+        with self._condition:
+            while self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return self._running
+
+    def wait_while_paused(self):
+        """Bloqueia enquanto a campanha estiver pausada; retorna True se ela continua rodando."""
+        with self._condition:
+            while self._running and self._paused:
+                self._condition.wait()
+            return self._running
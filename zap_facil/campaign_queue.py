@@ -0,0 +1,138 @@
+# campaign_queue.py
+# Fila de trabalhos do navegador.
+# Uma única thread é dona do WebDriver e executa, um de cada vez, tudo o que
+# o usa: a conexão e as campanhas manuais, retomadas ou agendadas. Disparos
+# simultâneos entram na fila por prioridade (e, na mesma prioridade, por
+# ordem de chegada) em vez de disputar o mesmo navegador.
+
+import heapq
+import logging
+import itertools
+import threading
+import time
+
+
+class Job:
+    """Trabalho na fila; 'wait()' aguarda o fim e 'result' guarda o retorno."""
+
+    def __init__(self, job_id, kind, description, priority, target, args):
+        self.id = job_id
+        self.kind = kind
+        self.description = description
+        self.priority = priority
+        self.submitted_at = time.time()
+        self.result = None
+        self.cancelled = False
+        self._target = target
+        self._args = args
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class JobQueue:
+    """Fila de prioridade com uma única thread de execução."""
+
+    def __init__(self, on_change=None, on_error=None):
+        # on_change(trabalho atual ou None, pendentes em ordem) é chamado a
+        # cada alteração, fora da trava e na thread que fez a alteração.
+        # on_error(trabalho, exceção) recebe o que escapar de um alvo.
+        self._on_change = on_change
+        self._on_error = on_error
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._current = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._work, name="DriverWorker", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind, description, priority, target, *args):
+        """Enfileira 'target(*args)'; retorna o Job, ou None se a fila foi encerrada."""
+        with self._condition:
+            if self._closed:
+                return None
+            job = Job(next(self._ids), kind, description,
+                      priority, target, args)
+            heapq.heappush(self._heap, (priority, job.id, job))
+            self._condition.notify()
+        self._changed()
+        return job
+
+    @property
+    def current(self):
+        return self._current
+
+    def pending(self):
+        with self._condition:
+            return [job for _, _, job in sorted(self._heap)]
+
+    def has_pending(self, kind):
+        with self._condition:
+            return any(job.kind == kind for _, _, job in self._heap)
+
+    def jobs_ahead(self, job):
+        """Quantos trabalhos serão executados antes de 'job' (0 se já está em execução)."""
+        with self._condition:
+            if job is self._current or job.done:
+                return 0
+            ahead = sum(1 for entry in self._heap if entry < (job.priority, job.id))
+            return ahead + (self._current is not None)
+
+    def cancel_pending(self):
+        """Descarta os trabalhos que ainda não começaram; retorna quantos eram."""
+        with self._condition:
+            cancelled = [job for _, _, job in self._heap]
+            self._heap.clear()
+        for job in cancelled:
+            job.cancelled = True
+            job._done.set()
+        if cancelled:
+            self._changed()
+        return len(cancelled)
+
+    def close(self):
+        """Recusa novos trabalhos e descarta os pendentes; o atual termina normalmente."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self.cancel_pending()
+
+    def is_worker_thread(self):
+        return threading.current_thread() is self._thread
+
+    def _changed(self):
+        if self._on_change:
+            self._on_change(self._current, self.pending())
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._heap and not self._closed:
+                    self._condition.wait()
+                if not self._heap:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+                self._current = job
+            self._changed()
+            try:
+                job.result = job._target(*job._args)
+            except Exception as e:
+                # Os alvos tratam os próprios erros; isto só protege a thread
+                # e garante que a falha não passe em silêncio.
+                job.result = e
+                logging.getLogger(__name__).exception(
+                    "Falha no trabalho '%s'", job.description)
+                if self._on_error:
+                    self._on_error(job, e)
+            finally:
+                with self._condition:
+                    self._current = None
+                job._done.set()
+                self._changed()
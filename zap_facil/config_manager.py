@@ -1,8 +1,9 @@
 # config_manager.py (Versão Padronizada)
 import os
+import threading
 import configparser
+from contextlib import contextmanager
 from pathlib import Path
-from cryptography.fernet import Fernet
 import constants as C
 
 # --- CAMINHOS E DIRETÓRIOS ---
@@ -18,51 +19,141 @@ def _ensure_config_dir():
     os.makedirs(CONFIG_DIR, exist_ok=True)
 
 # --- LÓGICA PARA CONFIG.INI (NÃO SENSÍVEL) ---
+# O config.ini fica em cache na memória e só é relido quando o tamanho ou o
+# mtime do arquivo mudam (por exemplo, editado por outra instância).
+# Alterações feitas dentro de batch() ficam separadas, na thread que as fez,
+# e são gravadas juntas, uma única vez, ao fim do bloco.
+
+_config_lock = threading.RLock()
+_cached_config = None
+_cached_signature = None
+_config_version = 0
+_batches = threading.local()  # Pilha de alterações pendentes, por thread
+
+
+def _file_signature(path):
+    """Tamanho e mtime de um arquivo (None se não existir), usados para invalidar caches."""
+    try:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
 
 
 def _load_general_config():
-    """Carrega o arquivo config.ini e retorna um objeto ConfigParser."""
-    _ensure_config_dir()
-    config = configparser.ConfigParser()
-    if CONFIG_PATH.exists():
-        config.read(CONFIG_PATH, encoding="utf-8")
-    return config
+    """Retorna o ConfigParser em cache, relendo o config.ini apenas se ele mudou."""
+    global _cached_config, _cached_signature, _config_version
+    with _config_lock:
+        signature = _file_signature(CONFIG_PATH)
+        if _cached_config is None or signature != _cached_signature:
+            _ensure_config_dir()
+            config = configparser.ConfigParser()
+            if signature is not None:
+                config.read(CONFIG_PATH, encoding="utf-8")
+            _cached_config, _cached_signature = config, signature
+            _config_version += 1
+        return _cached_config
 
 
 def _save_general_config(config):
-    """Salva o objeto ConfigParser no arquivo config.ini."""
-    _ensure_config_dir()
-    with open(CONFIG_PATH, "w", encoding="utf-8") as config_file:
-        config.write(config_file)
+    """Salva o ConfigParser no config.ini de forma atômica (arquivo temporário + replace)."""
+    global _cached_config, _cached_signature, _config_version
+    try:
+        _ensure_config_dir()
+        tmp_path = CONFIG_PATH.with_name(f"{CONFIG_PATH.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as config_file:
+            config.write(config_file)
+            config_file.flush()
+            os.fsync(config_file.fileno())
+        os.replace(tmp_path, CONFIG_PATH)
+    except BaseException:
+        # O cache não pode guardar valores que não chegaram ao disco.
+        _cached_config = None
+        raise
+    _cached_config, _cached_signature = config, _file_signature(CONFIG_PATH)
+    _config_version += 1
+
+
+def _apply_changes(changes):
+    """Grava 'changes' ({(seção, chave): valor}) sobre uma cópia do config atual."""
+    with _config_lock:
+        current = _load_general_config()
+        config = configparser.ConfigParser()
+        config.read_dict({section: dict(current.items(section, raw=True))
+                          for section in current.sections()})
+        for (section, key), value in changes.items():
+            if not config.has_section(section):
+                config.add_section(section)
+            config.set(section, key, value)
+        _save_general_config(config)
+
+
+def get_config_version():
+    """Número que muda sempre que o config.ini é relido ou gravado."""
+    with _config_lock:
+        _load_general_config()
+        return _config_version
+
+
+@contextmanager
+def batch():
+    """
+    Agrupa várias chamadas a save_setting em uma única gravação atômica.
+    As alterações só ficam visíveis depois da gravação, e as outras threads
+    continuam lendo as configurações normalmente durante o bloco. Se ocorrer
+    uma exceção, as alterações do bloco são descartadas (num batch aninhado,
+    apenas as dele).
+    """
+    stack = _batches.__dict__.setdefault("stack", [])
+    stack.append({})
+    try:
+        yield
+    except BaseException:
+        stack.pop()
+        raise
+    changes = stack.pop()
+    if stack:
+        stack[-1].update(changes)
+    elif changes:
+        _apply_changes(changes)
 
 
 def save_setting(section, key, value):
     """Salva uma configuração geral no config.ini."""
-    config = _load_general_config()
-    if not config.has_section(section):
-        config.add_section(section)
-    config.set(section, key, str(value))
-    _save_general_config(config)
+    stack = getattr(_batches, "stack", None)
+    if stack:
+        stack[-1][(section, key)] = str(value)
+    else:
+        _apply_changes({(section, key): str(value)})
 
 
 def get_setting(section, key, fallback=None):
     """Pega um valor de uma configuração geral do config.ini."""
-    config = _load_general_config()
-    return config.get(section, key, fallback=fallback)
+    with _config_lock:
+        return _load_general_config().get(section, key, fallback=fallback)
 
 
 def get_section(section_name):
     """Retorna um dicionário com todas as configurações de uma seção do config.ini."""
-    config = _load_general_config()
-    if config.has_section(section_name):
-        return dict(config.items(section_name))
-    return {}
+    with _config_lock:
+        config = _load_general_config()
+        if config.has_section(section_name):
+            return dict(config.items(section_name))
+        return {}
 
 
 # --- LÓGICA PARA LICENSE.KEY (SENSÍVEL) ---
 
+# A chave mestra, o objeto Fernet e a licença já descriptografada ficam em
+# memória; só são relidos se master.key ou license.key mudarem no disco.
+_secure_lock = threading.Lock()
+_fernet_cache = None   # (assinatura de master.key, Fernet)
+_license_cache = None  # ((assinatura de master.key, assinatura de license.key), licença)
+
+
 def _get_or_generate_master_key():
     """Carrega a chave de criptografia mestra ou gera uma nova se não existir."""
+    from cryptography.fernet import Fernet
     _ensure_config_dir()
     if MASTER_KEY_PATH.exists():
         with open(MASTER_KEY_PATH, "rb") as key_file:
@@ -74,20 +165,34 @@ def _get_or_generate_master_key():
         return key
 
 
+def _get_fernet():
+    """Retorna o Fernet da chave mestra, reaproveitado enquanto master.key não mudar."""
+    global _fernet_cache
+    signature = _file_signature(MASTER_KEY_PATH)
+    if _fernet_cache is None or _fernet_cache[0] != signature:
+        # Importado aqui: a licença não é lida na abertura do programa.
+        from cryptography.fernet import Fernet
+        fernet = Fernet(_get_or_generate_master_key())
+        _fernet_cache = (_file_signature(MASTER_KEY_PATH), fernet)
+    return _fernet_cache[1]
+
+
 def save_license_key(license_string: str):
     """
     Criptografa e salva a string da licença no arquivo seguro.
     """
+    global _license_cache
     if not isinstance(license_string, str):
         raise TypeError("A chave de licença deve ser uma string.")
 
-    master_key = _get_or_generate_master_key()
-    f = Fernet(master_key)
-
-    encrypted_license = f.encrypt(license_string.encode("utf-8"))
+    with _secure_lock:
+        f = _get_fernet()
+        encrypted_license = f.encrypt(license_string.encode("utf-8"))
 
-    with open(SECURE_DATA_PATH, "wb") as data_file:
-        data_file.write(encrypted_license)
+        with open(SECURE_DATA_PATH, "wb") as data_file:
+            data_file.write(encrypted_license)
+        _license_cache = ((_fernet_cache[0], _file_signature(
+            SECURE_DATA_PATH)), license_string)
     return True
 
 
@@ -96,21 +201,28 @@ def get_license_key():
     Descriptografa e retorna a string da licença do arquivo seguro.
     Retorna None se não houver licença ou se o arquivo estiver corrompido.
     """
-    if not SECURE_DATA_PATH.exists():
-        return None
-
-    master_key = _get_or_generate_master_key()
-    f = Fernet(master_key)
-
-    try:
-        with open(SECURE_DATA_PATH, "rb") as data_file:
-            encrypted_license = data_file.read()
-
-        decrypted_license = f.decrypt(encrypted_license).decode("utf-8")
+    global _license_cache
+    with _secure_lock:
+        signatures = (_file_signature(MASTER_KEY_PATH),
+                      _file_signature(SECURE_DATA_PATH))
+        if _license_cache is not None and _license_cache[0] == signatures:
+            return _license_cache[1]
+        if signatures[1] is None:
+            _license_cache = (signatures, None)
+            return None
+
+        f = _get_fernet()
+        try:
+            with open(SECURE_DATA_PATH, "rb") as data_file:
+                encrypted_license = data_file.read()
+
+            decrypted_license = f.decrypt(encrypted_license).decode("utf-8")
+        except Exception:
+            # Erro na descriptografia (chave mestra mudou, arquivo corrompido, etc.)
+            decrypted_license = None
+        # O Fernet pode ter gerado uma chave nova; registra as assinaturas atuais.
+        _license_cache = ((_fernet_cache[0], signatures[1]), decrypted_license)
         return decrypted_license
-    except Exception:
-        # Erro na descriptografia (chave mestra mudou, arquivo corrompido, etc.)
-        return None
 
 # --- FUNÇÕES LEGADAS (Mantidas para compatibilidade) ---
 
@@ -124,6 +236,7 @@ def save_settings(settings_dict):
     """
     Mescla um dicionário de configurações na seção 'General' do config.ini.
     """
-    for key, value in settings_dict.items():
-        save_setting("General", key, value)
+    with batch():
+        for key, value in settings_dict.items():
+            save_setting("General", key, value)
     return True
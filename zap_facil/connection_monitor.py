@@ -0,0 +1,100 @@
+# connection_monitor.py
+# Monitor da conexão com o WhatsApp Web.
+# A leitura da página é um único comando ao navegador (um script que procura
+# o painel principal e o QR Code) e acontece sempre na thread da fila de
+# trabalhos, a única que usa o WebDriver: com a fila ociosa, a thread do
+# monitor só pede a leitura, como um trabalho de baixa prioridade; durante
+# uma campanha, o próprio laço de envio faz a leitura entre os contatos.
+# O resultado fica em memória, e o bot é avisado assim que a conexão cai ou
+# volta.
+
+import time
+import threading
+from contextlib import nullcontext
+
+import constants as C
+from locators import MAIN_PANEL, QR_CODE_CANVAS
+
+_PROBE_SCRIPT = """
+return !!document.querySelector(arguments[0]) && !document.querySelector(arguments[1]);
+"""
+
+
+class ConnectionMonitor:
+    def __init__(self, submit_probe, on_change, interval=C.HEALTH_PROBE_SECONDS, measure=None):
+        # submit_probe() pede à thread do navegador que chame probe(); o
+        # monitor em si nunca toca no WebDriver.
+        # on_change(conectado, estado anterior) é chamado na thread que fez a
+        # leitura; o estado anterior é None na primeira leitura.
+        # measure() devolve o gerenciador de contexto que cronometra a leitura.
+        self._submit_probe = submit_probe
+        self._measure = measure or nullcontext
+        self._on_change = on_change
+        self._interval = interval
+        self._connected = None
+        self._last_ready = False
+        self._failures = 0
+        self._last_reading = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def connected(self):
+        """Último estado conhecido (None antes da primeira leitura)."""
+        return self._connected
+
+    @property
+    def last_ready(self):
+        """Resultado bruto da última leitura, sem a tolerância a falhas isoladas."""
+        return self._last_ready
+
+    def is_stale(self):
+        """True se a última leitura tem mais de um intervalo (ou ainda não houve leitura)."""
+        last = self._last_reading
+        return last is None or time.monotonic() - last >= self._interval
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ConnectionMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def probe(self, driver):
+        """Lê o estado da página agora. Só deve ser chamado na thread do navegador."""
+        try:
+            with self._measure():
+                ready = bool(driver and driver.execute_script(
+                    _PROBE_SCRIPT, MAIN_PANEL, QR_CODE_CANVAS))
+        except Exception:
+            ready = False
+        self._update(ready)
+        return ready
+
+    def _run(self):
+        while not self._stop.wait(self._interval):
+            if self.is_stale():
+                self._submit_probe()
+
+    def _update(self, ready):
+        with self._lock:
+            previous = self._connected
+            self._last_ready = ready
+            self._last_reading = time.monotonic()
+            if ready:
+                self._failures = 0
+                connected = True
+            else:
+                # Uma leitura isolada pode cair no meio do carregamento de uma
+                # conversa; só leituras seguidas mudam o estado anunciado (o
+                # laço da campanha age sobre a leitura bruta, em probe()).
+                self._failures += 1
+                connected = previous is True and self._failures < C.HEALTH_FAILURES_TO_DISCONNECT
+            self._connected = connected
+        if connected != previous:
+            self._on_change(connected, previous)
@@ -1,7 +1,7 @@
 # constants.py
 # Este arquivo centraliza as constantes e Enums do projeto.
 
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 # --- ENUMS ---
 
@@ -13,6 +13,17 @@ class SourceType(Enum):
     GROUP_LIST = auto()
 
 
+class PhoneIssue(IntEnum):
+    """Motivos de rejeição de um número na validação (OK = número válido)."""
+    OK = 0
+    EMPTY = auto()           # Nenhum dígito informado
+    INVALID_LENGTH = auto()  # Quantidade de dígitos incompatível com DDD + número
+    INVALID_DDD = auto()     # DDD inexistente
+    INVALID_MOBILE = auto()  # Celular (9 dígitos) que não começa com 9
+    MISSING_NINTH = auto()   # Celular sem o nono dígito
+    INVALID_LANDLINE = auto()  # Fixo (8 dígitos) com prefixo inválido
+
+
 class AudioState(Enum):
     """Define os estados possíveis para o controle de áudio."""
     IDLE = auto()      # Nenhum áudio gravado ou pronto
@@ -21,6 +32,15 @@ class AudioState(Enum):
     PLAYING = auto()   # Áudio gravado sendo reproduzido
 
 
+class JobKind(Enum):
+    """Trabalhos executados pela thread dona do navegador (ver campaign_queue)."""
+    CONNECT = auto()    # Conexão com o WhatsApp Web
+    MANUAL = auto()     # Campanha iniciada pela janela
+    RESUME = auto()     # Retomada da última campanha interrompida
+    SCHEDULED = auto()  # Cobrança disparada pelo agendador
+    PROBE = auto()      # Checagem de conexão pedida pelo monitor (fila ociosa)
+
+
 # --- GERAL ---
 APP_VERSION = "1.0.0"
 COMPANY_NAME = "MHC Softwares"
@@ -54,9 +74,97 @@ MASTER_KEY_FILENAME = "master.key"
 # --- CONFIGURAções DO BOT ---
 RECONNECT_ATTEMPTS = 20
 RECONNECT_WAIT_SECONDS = 15
+HEALTH_PROBE_SECONDS = 3  # Intervalo entre as leituras do monitor de conexão
+HEALTH_FAILURES_TO_DISCONNECT = 2  # Leituras seguidas sem o painel para considerar queda
 MIN_SEND_DELAY = 5
 MAX_SEND_DELAY = 10
 PHONE_COUNTRY_CODE = "55"
+# DDDs válidos no Brasil (Anatel)
+VALID_DDDS = frozenset((
+    11, 12, 13, 14, 15, 16, 17, 18, 19, 21, 22, 24, 27, 28,
+    31, 32, 33, 34, 35, 37, 38, 41, 42, 43, 44, 45, 46, 47, 48, 49,
+    51, 53, 54, 55, 61, 62, 63, 64, 65, 66, 67, 68, 69,
+    71, 73, 74, 75, 77, 79, 81, 82, 83, 84, 85, 86, 87, 88, 89,
+    91, 92, 93, 94, 95, 96, 97, 98, 99))
+MOBILE_NUMBER_LENGTH = 9    # Dígitos após o DDD em celulares
+LANDLINE_NUMBER_LENGTH = 8  # Dígitos após o DDD em telefones fixos
+PHONE_ISSUE_MESSAGES = {
+    PhoneIssue.OK: "Número válido.",
+    PhoneIssue.EMPTY: "Número vazio.",
+    PhoneIssue.INVALID_LENGTH: "Quantidade de dígitos inválida.",
+    PhoneIssue.INVALID_DDD: "DDD inexistente.",
+    PhoneIssue.INVALID_MOBILE: "Celular deve começar com 9.",
+    PhoneIssue.MISSING_NINTH: "Celular sem o nono dígito.",
+    PhoneIssue.INVALID_LANDLINE: "Telefone fixo com prefixo inválido.",
+}
+
+# --- LEITURA DE LISTAS DE CONTATOS ---
+CONTACT_LOAD_PROGRESS_STEP = 1000  # Linhas lidas entre cada aviso de progresso
+CONTACT_LOAD_BATCH_SIZE = 500  # Números normalizados de uma só vez
+# Cabeçalhos reconhecidos na primeira linha das planilhas (comparação em minúsculas)
+PHONE_HEADERS = ("telefone", "celular", "número", "numero",
+                 "whatsapp", "fone", "phone")
+NAME_HEADERS = ("nome", "cliente", "name")
+GROUP_HEADERS = ("grupo", "grupos", "group")
+
+# Cache das listas já processadas (dentro do diretório de configuração)
+CONTACT_CACHE_SUBDIR = "cache"
+CONTACT_CACHE_SUFFIX = ".zfc"
+CONTACT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Lista de exclusão (opt-out)
+OPTOUT_INDEX_FILENAME = "optout.idx"
+OPTOUT_LOG_FILENAME = "optout.log"
+OPTOUT_COMPACT_THRESHOLD = 5000  # Alterações no log antes de regravar o índice
+
+# Histórico de envios por destinatário
+HISTORY_DB_FILENAME = "history.db"
+HISTORY_QUERY_BATCH = 500  # Identificadores por consulta (limite de parâmetros do SQLite)
+MAX_CONTACT_COOLDOWN_HOURS = 24 * 30
+# Período mínimo mantido no histórico, mesmo sem intervalo configurado, para
+# que um intervalo ativado depois já encontre os envios recentes.
+HISTORY_RETENTION_HOURS = 24 * 7
+
+# Checkpoints das campanhas (retomada após falhas)
+CHECKPOINT_SUBDIR = "checkpoints"
+CHECKPOINT_SUFFIX = ".ckpt"
+CHECKPOINT_FSYNC_EVERY = 20  # Registros entre cada fsync
+CHECKPOINT_FSYNC_SECONDS = 5  # Intervalo máximo entre fsyncs
+CHECKPOINTS_TO_KEEP = 5
+
+# Banco de relatórios (resultados estruturados das campanhas)
+REPORTS_DB_FILENAME = "reports.db"
+REPORTS_DB_BATCH_SIZE = 20  # Destinatários acumulados antes de cada gravação
+REPORTS_PAGE_SIZE = 200  # Linhas buscadas por consulta na janela de relatórios
+REPORTS_CACHED_PAGES = 10  # Páginas mantidas em memória por lista
+REPORT_SEARCH_LIMIT = 1000  # Ocorrências retornadas por busca de destinatário
+CAMPAIGN_STATUS_RUNNING = "EM ANDAMENTO"
+CAMPAIGN_STATUS_COMPLETED = "CONCLUÍDA"
+CAMPAIGN_STATUS_INTERRUPTED = "INTERROMPIDA"
+CAMPAIGN_STATUS_ABORTED = "ABORTADA"
+# Exportação dos resultados para planilha
+RESULT_EXPORT_PREFIX = "Resultado_"
+EXPORT_SHEET_TITLE = "Resultados"
+EXPORT_NOT_PROCESSED = "NÃO PROCESSADO"
+WILDCARD_EXPORT = "Planilha do Excel (*.xlsx)|*.xlsx|CSV (*.csv)|*.csv"
+
+# Retenção: relatórios .txt mais antigos vão para arquivos mensais compactados
+REPORT_RETENTION_DAYS = 30
+REPORT_ARCHIVE_SUBDIR = "Arquivo"
+REPORT_ARCHIVE_PREFIX = "Relatorios_"
+REPORT_TEMP_PREFIX = "zapfacil_relatorio_"
+TEMP_ARTIFACT_MAX_AGE_HOURS = 24
+REPORT_MAINTENANCE_INTERVAL_HOURS = 24
+REPORT_MAINTENANCE_DELAY_MINUTES = 5  # Espera após a abertura do programa
+
+# Indicadores consolidados exibidos na janela de relatórios
+ANALYTICS_WINDOW_DAYS = 30
+ANALYTICS_TOP_REASONS = 3
+ANALYTICS_UNKNOWN_SOURCE = "Desconhecida"
+
+# Pré-validação: dias considerados ao procurar números que o WhatsApp já
+# recusou (desligável em Configurações > Pular Números Recusados Recentemente)
+PREFLIGHT_FAILURE_LOOKBACK_DAYS = 30
 
 # --- CONFIGURAÇÕES DE ÁUDIO ---
 AUDIO_SAMPLERATE = 44100
@@ -68,6 +176,69 @@ DEFAULT_CAMPAIGN_MSG = "Olá @Nome, tudo bem?\n\nEsta é uma mensagem de teste d
 DEFAULT_SCHEDULE_MSG = "Olá @Nome, tudo bem?\n\nIdentificamos um débito em aberto no valor de @Valor com vencimento em @Vencimento. Para regularizar, utilize o código de barras: @Codigo"
 REPORT_TITLE = f"RELATÓRIO DE CAMPANHA - {APP_NAME.upper()}"
 REPORT_DETAILS_HEADER = "DETALHES DO ENVIO"
+REPORT_METRICS_HEADER = "TEMPOS DO NAVEGADOR"
+REPORT_FILE_PREFIX = "Relatorio_"
+# Larguras reservadas no resumo do relatório (preenchido ao final da campanha)
+REPORT_DATE_WIDTH = 19
+REPORT_DURATION_WIDTH = 24
+REPORT_COUNT_WIDTH = 10
+REPORT_FLUSH_EVERY = 20  # Linhas entre cada descarga do relatório para o disco
+REPORT_FLUSH_SECONDS = 5
+STATUS_SUCCESS = "SUCESSO"
+STATUS_PARTIAL = "SUCESSO PARCIAL"
+STATUS_FAILURE = "FALHA"
+# Falha ao abrir a conversa (tempo esgotado, grupo não encontrado...): pode ser
+# passageira e não conta para a pré-validação das próximas campanhas.
+REPORT_CHAT_FAILED_REASON = "Não foi possível abrir a conversa."
+# Número recusado pelo próprio WhatsApp (aviso de número inválido na tela).
+REPORT_INVALID_NUMBER_REASON = "Número inválido segundo o WhatsApp."
+PARTIAL_REASON = "texto enviado, anexo falhou"
+REJECTED_FILE_PREFIX = "Rejeitados_"
+REJECTED_TITLE = f"CONTATOS REJEITADOS NA PRÉ-VALIDAÇÃO - {APP_NAME.upper()}"
+
+# Histórico de Eventos: buffer esvaziado pela janela em lotes e arquivo rotativo
+LOG_SUBDIR = "logs"
+LOG_FILENAME = "eventos.log"
+LOG_FILE_MAX_BYTES = 2 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+LOG_BUFFER_MAX_LINES = 5000  # Linhas aguardando a tela; acima disso as mais antigas ficam só no arquivo
+LOG_DRAIN_INTERVAL_MS = 150
+LOG_DRAIN_BATCH = 500  # Linhas levadas à tela por volta do timer
+LOG_SCREEN_MAX_LINES = 2000
+LOG_SCREEN_TRIM_LINES = 500  # Linhas removidas de uma vez ao passar do limite
+
+# Tempos das chamadas ao navegador (driver_metrics): fase -> rótulo exibido
+DRIVER_PHASES = {
+    "leitura_conexao": "Leitura rápida de conexão",
+    "conexao": "Checagem de conexão",
+    "abrir_conversa": "Abrir conversa (número)",
+    "abrir_grupo": "Abrir conversa (grupo)",
+    "nome_contato": "Ler nome do contato",
+    "digitar_texto": "Digitar texto",
+    "enviar_texto": "Enviar texto",
+    "anexo": "Enviar anexo",
+}
+DRIVER_LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+DRIVER_STATS_REFRESH_MS = 1000  # Atualização da janela de estatísticas ao vivo
+
+# Fila de trabalhos do navegador: menor número = executado primeiro
+JOB_PRIORITY = {
+    JobKind.CONNECT: 0,
+    JobKind.MANUAL: 10,
+    JobKind.RESUME: 10,
+    JobKind.SCHEDULED: 20,
+    JobKind.PROBE: 30,
+}
+
+# Execução sem interface (headless.py)
+HEADLESS_LOG_FILENAME = "servico.log"
+HEADLESS_RECONNECT_MINUTES = 10
+
+# Medição da abertura (startup_benchmark.py): com esta variável de ambiente
+# definida, o programa escreve o marcador assim que a primeira janela aparece
+# e encerra em seguida.
+STARTUP_PROBE_ENV = "ZAPFACIL_STARTUP_PROBE"
+STARTUP_PROBE_MARKER = "ZAPFACIL_JANELA_VISIVEL"
 
 # --- CONFIGURAÇÕES DA INTERFACE (UI) ---
 THEME_COLORS = {
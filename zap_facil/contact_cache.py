@@ -0,0 +1,203 @@
+# contact_cache.py
+# Cache em disco das listas de contatos já processadas.
+# Cada lista é gravada em um formato binário compacto, identificado pelo
+# caminho, tamanho, data de modificação e hash do conteúdo do arquivo original.
+# Listas inalteradas são relidas do cache sem passar novamente pelo openpyxl.
+
+import os
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+import constants as C
+import config_manager
+from contact_loader import Contact
+
+# --- CAMINHOS E FORMATO ---
+CACHE_DIR = config_manager.CONFIG_DIR / C.CONTACT_CACHE_SUBDIR
+
+_MAGIC = b"ZFC"
+_VERSION = 2
+# magic, versão, tamanho, mtime_ns, hash (32 bytes), tamanho do caminho
+_HEADER = struct.Struct("<3sBQq32sH")
+# linha de origem, tamanho do identificador, tamanho do nome, validação
+_RECORD = struct.Struct("<IHHB")
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CacheKey(NamedTuple):
+    """Identifica uma entrada do cache para um arquivo de lista."""
+    cache_path: Path
+    source_path: str
+    size: int
+    mtime_ns: int
+    digest: bytes
+
+
+def _ensure_cache_dir():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+
+def _file_digest(file_path):
+    """Calcula o hash do conteúdo do arquivo em blocos, sem carregá-lo inteiro."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def make_key(file_path, source_type):
+    """Monta a chave de cache (caminho + tamanho + mtime + hash) de uma lista."""
+    source_path = str(Path(file_path).resolve())
+    stat = os.stat(source_path)
+    name = hashlib.blake2b(
+        f"{source_path}|{source_type.name}".encode("utf-8"), digest_size=16).hexdigest()
+    return CacheKey(CACHE_DIR / f"{name}{C.CONTACT_CACHE_SUFFIX}", source_path,
+                    stat.st_size, stat.st_mtime_ns, _file_digest(source_path))
+
+
+def _read_header(f):
+    """Lê o cabeçalho de uma entrada. Retorna None se o formato for inválido."""
+    raw = f.read(_HEADER.size)
+    if len(raw) != _HEADER.size:
+        return None
+    magic, version, size, mtime_ns, digest, path_len = _HEADER.unpack(raw)
+    if magic != _MAGIC or version != _VERSION:
+        return None
+    source_path = f.read(path_len).decode("utf-8")
+    return source_path, size, mtime_ns, digest
+
+
+def _iter_records(f):
+    while True:
+        raw = f.read(_RECORD.size)
+        if len(raw) != _RECORD.size:
+            return
+        row, id_len, name_len, reason = _RECORD.unpack(raw)
+        data = f.read(id_len + name_len)
+        yield Contact(data[:id_len].decode("utf-8"), data[id_len:].decode("utf-8"), row, reason)
+
+
+def _read_entry(cache_path):
+    with open(cache_path, "rb") as f:
+        _read_header(f)
+        yield from _iter_records(f)
+
+
+def lookup(key):
+    """
+    Retorna um iterador com os contatos em cache, ou None se a entrada não
+    existir ou não corresponder mais ao arquivo original.
+    """
+    try:
+        with open(key.cache_path, "rb") as f:
+            header = _read_header(f)
+    except (OSError, UnicodeDecodeError, struct.error):
+        return None
+    if header != (key.source_path, key.size, key.mtime_ns, key.digest):
+        return None
+    try:
+        # Marca o uso recente para a política de descarte.
+        os.utime(key.cache_path)
+    except OSError:
+        pass
+    return _read_entry(key.cache_path)
+
+
+def store(key, contacts):
+    """
+    Repassa os contatos de 'contacts' gravando-os no cache ao mesmo tempo.
+    A entrada só é publicada se a lista for lida até o fim; leituras
+    interrompidas ou com erro de gravação não deixam resíduos.
+    """
+    tmp_path = key.cache_path.with_name(
+        f"{key.cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    out = None
+    completed = False
+    try:
+        _ensure_cache_dir()
+        out = open(tmp_path, "wb")
+        path_bytes = key.source_path.encode("utf-8")
+        out.write(_HEADER.pack(_MAGIC, _VERSION, key.size,
+                  key.mtime_ns, key.digest, len(path_bytes)))
+        out.write(path_bytes)
+    except OSError:
+        out = _discard(out, tmp_path)
+    try:
+        for contact in contacts:
+            if out:
+                try:
+                    id_bytes = contact.identifier.encode("utf-8")
+                    name_bytes = contact.name.encode("utf-8")
+                    out.write(_RECORD.pack(contact.row, len(id_bytes), len(
+                        name_bytes), contact.reason) + id_bytes + name_bytes)
+                except (OSError, struct.error):
+                    out = _discard(out, tmp_path)
+            yield contact
+        completed = True
+    finally:
+        if out:
+            out.close()
+            if completed:
+                try:
+                    os.replace(tmp_path, key.cache_path)
+                    evict()
+                except OSError:
+                    _discard(None, tmp_path)
+            else:
+                _discard(None, tmp_path)
+
+
+def _discard(out, tmp_path):
+    if out:
+        out.close()
+    try:
+        os.remove(tmp_path)
+    except OSError:
+        pass
+    return None
+
+
+def _is_stale(cache_path):
+    """Uma entrada é obsoleta quando o arquivo original sumiu ou mudou."""
+    try:
+        with open(cache_path, "rb") as f:
+            header = _read_header(f)
+        if header is None:
+            return True
+        source_path, size, mtime_ns, _ = header
+        stat = os.stat(source_path)
+        return (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns)
+    except (OSError, UnicodeDecodeError, struct.error):
+        return True
+
+
+def evict(max_bytes=C.CONTACT_CACHE_MAX_BYTES):
+    """
+    Remove entradas obsoletas e, se o cache ainda ultrapassar 'max_bytes',
+    descarta as menos usadas recentemente.
+    """
+    if not CACHE_DIR.exists():
+        return
+    entries = []
+    for cache_path in CACHE_DIR.glob(f"*{C.CONTACT_CACHE_SUFFIX}"):
+        try:
+            if _is_stale(cache_path):
+                os.remove(cache_path)
+                continue
+            stat = cache_path.stat()
+            entries.append((stat.st_mtime, stat.st_size, cache_path))
+        except OSError:
+            continue
+    total = sum(size for _, size, _ in entries)
+    for _, size, cache_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(cache_path)
+            total -= size
+        except OSError:
+            pass
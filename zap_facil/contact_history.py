@@ -0,0 +1,107 @@
+# contact_history.py
+# Histórico de envios por destinatário (SQLite no diretório de configuração).
+# Permite saber rapidamente quem já recebeu mensagem desde um instante T,
+# para que campanhas repetidas (como a cobrança diária) respeitem um
+# intervalo mínimo entre contatos com a mesma pessoa.
+
+import sqlite3
+import threading
+from datetime import datetime
+
+import constants as C
+import config_manager
+
+DB_PATH = config_manager.CONFIG_DIR / C.HISTORY_DB_FILENAME
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contact_history (
+    identifier TEXT NOT NULL,
+    campaign_id TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_identifier_time
+    ON contact_history (identifier, sent_at);
+"""
+
+
+class ContactHistory:
+    """Acesso ao histórico de envios; uma conexão por instância, protegida por lock."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def record(self, identifier, campaign_id, status, sent_at=None):
+        """Registra o resultado do envio para um destinatário."""
+        sent_at = (sent_at or datetime.now()).timestamp()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT INTO contact_history (identifier, campaign_id, sent_at, status) VALUES (?, ?, ?, ?)",
+                             (identifier, campaign_id, sent_at, status))
+
+    def contacted_since(self, identifiers, since):
+        """Retorna quais dos destinatários receberam mensagem com sucesso desde 'since'."""
+        identifiers = list(identifiers)
+        found = set()
+        with self._lock:
+            conn = self._connection()
+            # Consulta em blocos para respeitar o limite de parâmetros do SQLite.
+            for start in range(0, len(identifiers), C.HISTORY_QUERY_BATCH):
+                batch = identifiers[start:start + C.HISTORY_QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT DISTINCT identifier FROM contact_history WHERE identifier IN ({placeholders}) "
+                    f"AND sent_at >= ? AND status != ?",
+                    (*batch, since.timestamp(), C.STATUS_FAILURE))
+                found.update(row[0] for row in rows)
+        return found
+
+    def filter(self, contacts, since, on_skipped=None):
+        """Repassa apenas os contatos sem envio registrado desde 'since'."""
+        chunk = []
+        try:
+            for contact in contacts:
+                chunk.append(contact)
+                if len(chunk) >= C.CONTACT_LOAD_BATCH_SIZE:
+                    yield from self._filter_chunk(chunk, since, on_skipped)
+                    chunk = []
+            if chunk:
+                yield from self._filter_chunk(chunk, since, on_skipped)
+        finally:
+            if hasattr(contacts, "close"):
+                contacts.close()
+
+    def _filter_chunk(self, chunk, since, on_skipped):
+        recent = self.contacted_since(
+            (c.identifier for c in chunk), since)
+        for contact in chunk:
+            if contact.identifier not in recent:
+                yield contact
+            elif on_skipped:
+                on_skipped(contact)
+
+    def prune(self, before):
+        """Apaga os envios anteriores a 'before'. Retorna quantos foram apagados."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                return conn.execute("DELETE FROM contact_history WHERE sent_at < ?",
+                                    (before.timestamp(),)).rowcount
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,155 @@
+# contact_loader.py
+# Leitura em fluxo (streaming) das listas de contatos (.txt/.xlsx).
+# Os registros são produzidos sob demanda, sem carregar a planilha inteira
+# na memória, o que mantém o consumo constante mesmo em listas muito grandes.
+
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+import constants as C
+import phone_utils
+
+_COUNT_CHUNK_SIZE = 1024 * 1024
+
+
+class Contact(NamedTuple):
+    """Registro normalizado de um destinatário de campanha."""
+    identifier: str  # Número formatado (LIST/MANUAL_LIST) ou nome do grupo (GROUP_LIST)
+    name: str = ""   # Nome usado na tag @Nome, quando a lista o fornece
+    row: int = 0     # Linha de origem no arquivo (começando em 1)
+    reason: int = C.PhoneIssue.OK  # Resultado da validação do número
+
+
+def _cell_text(value):
+    """Converte o valor de uma célula em texto limpo."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _detect_columns(first_row, source_type):
+    """
+    Identifica as colunas de identificador e nome a partir do cabeçalho.
+    Retorna (coluna_identificador, coluna_nome, tem_cabecalho).
+    """
+    headers = [_cell_text(v).lower() for v in first_row]
+    id_headers = C.GROUP_HEADERS if source_type == C.SourceType.GROUP_LIST else C.PHONE_HEADERS
+    id_col = next((i for i, h in enumerate(headers) if h in id_headers), None)
+    name_col = next((i for i, h in enumerate(headers)
+                    if h in C.NAME_HEADERS and i != id_col), None)
+    if id_col is None:
+        return 0, None, False
+    return id_col, name_col, True
+
+
+def _normalize_chunk(chunk, source_type):
+    """Converte um bloco de (identificador, nome, linha) em registros Contact."""
+    if source_type == C.SourceType.GROUP_LIST:
+        return [Contact(identifier, name, row) for identifier, name, row in chunk]
+    batch = phone_utils.normalize_phones([identifier for identifier, _, _ in chunk])
+    return [Contact(number, name, row, int(reason)) for number, reason, (_, name, row)
+            in zip(batch.numbers, batch.reasons, chunk)]
+
+
+def _in_chunks(raw_rows, source_type):
+    """Agrupa as linhas lidas em blocos para a normalização vetorizada."""
+    chunk = []
+    try:
+        for raw_row in raw_rows:
+            chunk.append(raw_row)
+            if len(chunk) >= C.CONTACT_LOAD_BATCH_SIZE:
+                yield from _normalize_chunk(chunk, source_type)
+                chunk = []
+        if chunk:
+            yield from _normalize_chunk(chunk, source_type)
+    finally:
+        # Fecha o leitor (e a planilha) mesmo se a campanha parar no meio.
+        raw_rows.close()
+
+
+def contacts_from_pairs(pairs):
+    """Converte pares (nome, número) informados manualmente em registros Contact."""
+    return _in_chunks(((number, name, row) for row, (name, number) in enumerate(pairs, start=1)),
+                      C.SourceType.MANUAL_LIST)
+
+
+def _iter_txt(file_path, progress_callback):
+    total_bytes = os.path.getsize(file_path) or None
+    # Leitura binária para acompanhar o progresso pelo deslocamento no arquivo.
+    with open(file_path, "rb") as f:
+        for row, raw_line in enumerate(f, start=1):
+            line = raw_line.decode("utf-8-sig" if row == 1 else "utf-8").strip()
+            if line:
+                yield line, "", row
+            if progress_callback and row % C.CONTACT_LOAD_PROGRESS_STEP == 0:
+                progress_callback(row, f.tell(), total_bytes)
+
+
+def _iter_xlsx(file_path, source_type, progress_callback):
+    import openpyxl
+    # read_only=True percorre o XML da planilha em fluxo, linha a linha.
+    workbook = openpyxl.load_workbook(
+        file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        total_rows = sheet.max_row
+        id_col, name_col, skip_header = 0, None, False
+        for row, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+            if row == 1 and values:
+                id_col, name_col, skip_header = _detect_columns(
+                    values, source_type)
+            if not (row == 1 and skip_header) and values and len(values) > id_col:
+                identifier = _cell_text(values[id_col])
+                if identifier:
+                    name = _cell_text(values[name_col]) if name_col is not None and len(
+                        values) > name_col else ""
+                    yield identifier, name, row
+            if progress_callback and row % C.CONTACT_LOAD_PROGRESS_STEP == 0:
+                progress_callback(row, row, total_rows)
+    finally:
+        workbook.close()
+
+
+def estimate_rows(file_path):
+    """
+    Estimativa rápida do número de linhas da lista, sem interpretá-la: serve
+    de teto para a quantidade de contatos (cabeçalho e linhas vazias entram
+    na conta). Retorna None se não for possível estimar.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".txt":
+        lines, last = 0, b"\n"
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_COUNT_CHUNK_SIZE), b""):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+        return lines + (last != b"\n")
+    if suffix == ".xlsx":
+        import openpyxl
+        # Em modo read_only o total vem da dimensão gravada na planilha.
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            return workbook.active.max_row
+        finally:
+            workbook.close()
+    return None
+
+
+def iter_contacts(file_path, source_type, progress_callback=None):
+    """
+    Percorre uma lista de contatos (.txt ou .xlsx) produzindo um Contact por
+    linha válida. Os números são normalizados em blocos (grupos não são).
+    'progress_callback(linhas, posição, total)' é chamado periodicamente;
+    'total' pode ser None quando o tamanho não é conhecido.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".txt":
+        raw_rows = _iter_txt(file_path, progress_callback)
+    elif suffix == ".xlsx":
+        raw_rows = _iter_xlsx(file_path, source_type, progress_callback)
+    else:
+        raise ValueError(f"Formato de lista não suportado: '{suffix}'.")
+    return _in_chunks(raw_rows, source_type)
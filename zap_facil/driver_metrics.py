@@ -0,0 +1,126 @@
+# driver_metrics.py
+# Tempos das chamadas ao WebDriver, por fase da campanha (abrir conversa,
+# digitar, enviar, anexar, checar conexão...). Cada fase mantém um
+# histograma de faixas fixas de latência, além de contagem, soma, máximo,
+# timeouts e erros; registrar uma chamada custa poucas operações e nenhuma
+# lista cresce com o tamanho da campanha. Os números vão para o relatório
+# .txt no fim da campanha e podem ser acompanhados ao vivo pela janela.
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+import constants as C
+
+
+def _format_ms(ms):
+    return f"{ms / 1000:.2f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+class PhaseStats:
+    def __init__(self):
+        self.buckets = [0] * (len(C.DRIVER_LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+        self.errors = 0
+
+    def add(self, elapsed_ms, outcome):
+        self.buckets[bisect_left(C.DRIVER_LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        if outcome == "timeout":
+            self.timeouts += 1
+        elif outcome == "error":
+            self.errors += 1
+
+    def percentile(self, fraction):
+        """Limite superior da faixa que contém o percentil (aproximado pelo histograma)."""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                # A última faixa não tem limite; o máximo observado a representa.
+                if index < len(C.DRIVER_LATENCY_BUCKETS_MS):
+                    return min(C.DRIVER_LATENCY_BUCKETS_MS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def row(self, label):
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "phase": label,
+            "count": self.count,
+            "avg": _format_ms(self.total_ms / self.count),
+            "p50": f"≤{_format_ms(p50)}",
+            "p95": f"≤{_format_ms(p95)}",
+            "max": _format_ms(self.max_ms),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+class DriverMetrics:
+    """Estatísticas por fase, seguras para várias threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases = {}
+
+    @contextmanager
+    def measure(self, phase):
+        """Mede o bloco como uma chamada da fase; exceções são contadas e repassadas."""
+        outcome = "ok"
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            # O Selenium é importado sob demanda; o timeout é reconhecido pelo nome.
+            outcome = "timeout" if type(e).__name__ == "TimeoutException" else "error"
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                stats = self._phases.get(phase)
+                if stats is None:
+                    stats = self._phases[phase] = PhaseStats()
+                stats.add(elapsed_ms, outcome)
+
+    def reset(self):
+        with self._lock:
+            self._phases = {}
+
+    def rows(self):
+        """Uma linha (dict) por fase com chamadas registradas, na ordem de C.DRIVER_PHASES."""
+        with self._lock:
+            return [stats.row(label) for phase, label in C.DRIVER_PHASES.items()
+                    if (stats := self._phases.get(phase)) and stats.count]
+
+    def report_lines(self):
+        """Tabela e histogramas para o relatório .txt (vazia se nada foi medido)."""
+        with self._lock:
+            measured = [(label, self._phases[phase]) for phase, label in C.DRIVER_PHASES.items()
+                        if phase in self._phases and self._phases[phase].count]
+            if not measured:
+                return []
+            width = max(len(label) for label, _ in measured)
+            lines = [f"{'Fase'.ljust(width)}  Chamadas  Média     p50        p95        Máximo    Timeouts  Erros"]
+            for label, stats in measured:
+                row = stats.row(label)
+                lines.append(
+                    f"{label.ljust(width)}  {row['count']:<8}  {row['avg']:<8}  {row['p50']:<9}  "
+                    f"{row['p95']:<9}  {row['max']:<8}  {row['timeouts']:<8}  {row['errors']}")
+            limits = [f"≤{_format_ms(ms)}" for ms in C.DRIVER_LATENCY_BUCKETS_MS] + \
+                [f">{_format_ms(C.DRIVER_LATENCY_BUCKETS_MS[-1])}"]
+            lines.append("")
+            lines.append("Distribuição das chamadas por faixa de tempo:")
+            for label, stats in measured:
+                lines.append(f"{label.ljust(width)}  " + " | ".join(
+                    f"{limit}: {count}" for limit, count in zip(limits, stats.buckets)))
+            return lines
@@ -0,0 +1,116 @@
+# event_bus.py
+# Barramento de eventos entre o WhatsAppBot e quem o acompanha (janela,
+# arquivo de log, linha de comando...). O bot só publica eventos tipados:
+# a publicação põe o evento numa fila e retorna na hora, e uma thread
+# própria entrega os eventos, na ordem em que chegaram, aos assinantes do
+# tipo. Um assinante lento nunca segura a thread do bot, e um tipo de
+# evento sem assinantes nem chega a entrar na fila.
+
+import queue
+import logging
+import threading
+from dataclasses import dataclass
+
+_STOP = object()
+
+
+@dataclass(frozen=True, slots=True)
+class LogMessage:
+    message: str
+    color: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionReady:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionFailed:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectionStateChanged:
+    connected: bool     # Queda ou retorno detectado pelo monitor de conexão
+
+
+@dataclass(frozen=True, slots=True)
+class CampaignStateChanged:
+    running: bool
+
+
+@dataclass(frozen=True, slots=True)
+class PauseStateChanged:
+    paused: bool
+
+
+@dataclass(frozen=True, slots=True)
+class RecordingFailed:
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class PlaybackStateChanged:
+    playing: bool
+
+
+@dataclass(frozen=True, slots=True)
+class QueueChanged:
+    current: str        # Descrição do trabalho em execução (None se ocioso)
+    pending: tuple      # Descrições dos trabalhos aguardando, em ordem
+
+
+@dataclass(frozen=True, slots=True)
+class BotShutdown:
+    pass
+
+
+class EventBus:
+    """Fila de eventos com entrega assíncrona, por tipo, aos assinantes."""
+
+    def __init__(self):
+        # Tipo do evento -> tupla de handlers; a tupla é trocada (nunca
+        # alterada) a cada assinatura, então a entrega lê sem trava.
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._dispatch, name="EventBus", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, event_type, handler):
+        with self._lock:
+            self._handlers[event_type] = self._handlers.get(
+                event_type, ()) + (handler,)
+
+    def unsubscribe(self, event_type, handler):
+        with self._lock:
+            handlers = tuple(h for h in self._handlers.get(
+                event_type, ()) if h != handler)
+            if handlers:
+                self._handlers[event_type] = handlers
+            else:
+                self._handlers.pop(event_type, None)
+
+    def publish(self, event):
+        if type(event) in self._handlers:
+            self._queue.put(event)
+
+    def _dispatch(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+            for handler in self._handlers.get(type(event), ()):
+                try:
+                    handler(event)
+                except Exception:
+                    # Um assinante com defeito não impede a entrega aos demais.
+                    logging.getLogger(__name__).exception(
+                        "Falha ao entregar %s", type(event).__name__)
+
+    def close(self, timeout=None):
+        """Entrega os eventos já publicados e encerra a thread de entrega."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
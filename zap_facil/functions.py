@@ -5,38 +5,56 @@ import random
 import time
 import json
 import threading
-import re
-from datetime import datetime
+import itertools
+from datetime import datetime, timedelta
 from pathlib import Path
 
-import wx
-import openpyxl
-import numpy as np
-import sounddevice as sd
-import soundfile as sf
-import noisereduce as nr
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException, TimeoutException
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-
 from locators import *
 import constants as C
 import config_manager
+import settings
+import event_bus
+import campaign_queue
+import campaign_control
+import connection_monitor
+import driver_metrics
+import preflight as preflight_module
+import contact_history
+import campaign_checkpoint
+import report_writer
+import report_store
+import report_archive
+import result_export
+
+# As dependências pesadas (Selenium, APScheduler, numpy, a pilha de áudio e
+# os módulos que usam numpy) são importadas no primeiro uso, e não aqui: a
+# janela aparece antes, e o custo recai nas threads de conexão, do agendador
+# ou da gravação. O startup_benchmark.py acusa se alguma voltar para cá.
+
+
+def _load_selenium():
+    """Importa o Selenium na primeira conexão; os nomes ficam globais no módulo."""
+    global webdriver, By, Keys, EdgeService, ChromeService, WebDriverWait, EC, WebDriverException, TimeoutException
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.edge.service import Service as EdgeService
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import WebDriverException, TimeoutException
 
 
 class WhatsAppBot:
-    def __init__(self, ui):
-        self.ui = ui
+    def __init__(self, events=None):
+        # O bot não conhece a interface: só publica eventos no barramento.
+        self.events = events or event_bus.EventBus()
         self.driver = None
-        self.running = False
-        self.paused = False
+        self.control = campaign_control.CampaignController()
+        self.metrics = driver_metrics.DriverMetrics()
+        self.monitor = connection_monitor.ConnectionMonitor(
+            self._submit_connection_probe, self._on_connection_change,
+            measure=lambda: self.metrics.measure("leitura_conexao"))
         self.is_recording = False
         self.recorded_frames = []
         self.temp_audio_path = Path(
@@ -52,153 +70,400 @@ class WhatsAppBot:
 
         self.scheduler = None
         self.schedule_job = None
+        self._optout = None
+        self._optout_lock = threading.Lock()
+        self.history = contact_history.ContactHistory()
+        self.report_store = report_store.ReportStore()
+        # Tudo o que usa o navegador passa por esta fila (uma thread só).
+        self._queue_state = None
+        self.jobs = campaign_queue.JobQueue(
+            on_change=self._publish_queue_state, on_error=self._on_job_error)
+
+    @property
+    def optout(self):
+        # O índice de exclusão (e o numpy) só é carregado quando for usado.
+        with self._optout_lock:
+            if self._optout is None:
+                import optout
+                self._optout = optout.OptOutList()
+            return self._optout
+
+    def _log(self, message, color=None):
+        self.events.publish(event_bus.LogMessage(message, color))
+
+    def _publish_queue_state(self, current, pending):
+        # As checagens de conexão não aparecem na fila mostrada ao usuário.
+        state = (current.description if current and current.kind != C.JobKind.PROBE else None,
+                 tuple(job.description for job in pending if job.kind != C.JobKind.PROBE))
+        if state != self._queue_state:
+            self._queue_state = state
+            self.events.publish(event_bus.QueueChanged(*state))
+
+    def _submit_connection_probe(self):
+        # Com a fila ocupada (conexão ou campanha em curso) a leitura fica
+        # com quem está usando o navegador; não vale enfileirar outra.
+        if self.jobs.current is None and not self.jobs.pending():
+            self.jobs.submit(C.JobKind.PROBE, "Checagem de conexão",
+                             C.JOB_PRIORITY[C.JobKind.PROBE], self._probe_connection)
+
+    def _probe_connection(self):
+        self.monitor.probe(self.driver)
+
+    def _on_job_error(self, job, error):
+        self._log(
+            f"[ERRO] Falha inesperada em '{job.description}': {error}", "red")
+
+    def _submit_job(self, kind, description, target, *args):
+        job = self.jobs.submit(kind, description,
+                               C.JOB_PRIORITY[kind], target, *args)
+        if job is None:
+            return None
+        ahead = self.jobs.jobs_ahead(job)
+        if ahead:
+            self._log(
+                f"[FILA] '{description}' aguardando na fila ({ahead} trabalho(s) à frente).", "yellow")
+        return job
+
+    def connect(self):
+        return self._submit_job(C.JobKind.CONNECT, "Conexão com o WhatsApp", self.setup_driver)
+
+    def submit_campaign(self, campaign_config, kind=C.JobKind.MANUAL):
+        return self._submit_job(kind, self._describe_campaign(campaign_config, kind),
+                                self._run_campaign_job, campaign_config)
+
+    def cancel_queued_campaigns(self):
+        cancelled = self.jobs.cancel_pending()
+        if cancelled:
+            self._log(
+                f"[FILA] {cancelled} trabalho(s) pendente(s) cancelado(s).", "orange")
+        return cancelled
+
+    def _describe_campaign(self, campaign_config, kind):
+        if kind == C.JobKind.RESUME:
+            return "Retomada da última campanha"
+        if campaign_config.get("source_type") == C.SourceType.MANUAL_LIST:
+            source = f"{len(campaign_config.get('manual_contacts', []))} contato(s)"
+        else:
+            source = Path(campaign_config.get("contact_list_path") or "").name
+        label = "Cobrança agendada" if kind == C.JobKind.SCHEDULED else "Campanha"
+        return f"{label} ({source})"
+
+    def _run_campaign_job(self, campaign_config):
+        # A conexão é conferida na hora da execução, já na thread do navegador.
+        if not self.driver or not self.is_whatsapp_ready():
+            self._log(
+                "[FILA] WhatsApp não conectado. Campanha descartada.", "orange")
+            return
+        self.start_campaign(campaign_config)
 
     def initialize_scheduler(self):
-        self.ui.log_message(
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.interval import IntervalTrigger
+        # Iniciado aqui, e não no construtor, para que os avisos da indexação
+        # já encontrem os assinantes do barramento.
+        threading.Thread(target=self._sync_reports_index,
+                         daemon=True).start()
+        self._log(
             "[INFO] Inicializando o módulo de agendamento...", C.THEME_COLORS["accent_purple"])
         self.scheduler = BackgroundScheduler(
             daemon=True, timezone="America/Sao_Paulo")
         self.scheduler.start()
         self.load_and_reschedule_job()
+        self.scheduler.add_job(
+            self._run_report_maintenance,
+            trigger=IntervalTrigger(
+                hours=C.REPORT_MAINTENANCE_INTERVAL_HOURS),
+            next_run_time=datetime.now() + timedelta(minutes=C.REPORT_MAINTENANCE_DELAY_MINUTES),
+            id="report_maintenance", replace_existing=True)
+
+    def _run_report_maintenance(self):
+        # Indexa antes de arquivar, para que nada saia da pasta sem estar no banco.
+        self._sync_reports_index()
+        try:
+            retention_days = settings.current().general.report_retention_days
+            archived = report_archive.archive_old_reports(
+                self.report_store, self.reports_dir, retention_days)
+            if archived:
+                self._log(
+                    f"[RELATÓRIO] {archived} relatório(s) com mais de {retention_days} dias compactado(s) em '{C.REPORT_ARCHIVE_SUBDIR}'.", "purple")
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao arquivar relatórios antigos: {e}", "red")
+        try:
+            report_archive.clean_temp_artifacts()
+        except Exception as e:
+            self._log(
+                f"[AVISO] Falha ao limpar arquivos temporários: {e}", "orange")
 
-    def get_reports(self):
+    def _sync_reports_index(self):
         try:
-            if not os.path.exists(self.reports_dir):
-                return []
-            files = [f for f in os.listdir(
-                self.reports_dir) if f.endswith(".txt")]
-            return sorted(files, reverse=True)
+            imported = report_store.sync_reports_dir(
+                self.report_store, self.reports_dir)
+            if imported:
+                self._log(
+                    f"[RELATÓRIO] {imported} relatório(s) .txt indexado(s) no histórico de campanhas.", "purple")
         except Exception as e:
-            self.ui.log_message(
+            self._log(
+                f"[ERRO] Falha ao indexar os relatórios: {e}", "red")
+
+    def _normalize_search_term(self, term):
+        term = term.strip()
+        # Telefones são buscados já normalizados; o resto é tratado como nome de grupo.
+        if any(ch.isdigit() for ch in term) and all(ch.isdigit() or ch in " ()+-." for ch in term):
+            import phone_utils
+            return phone_utils.normalize_phone(term) or term
+        return term
+
+    def search_reports(self, term, status=None):
+        term = self._normalize_search_term(term)
+        if not term:
+            return []
+        self._sync_reports_index()
+        try:
+            return self.report_store.search_recipients(term, status)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao buscar nos relatórios: {e}", "red")
+            return []
+
+    def get_recipient_stats(self, term):
+        try:
+            return self.report_store.recipient_stats(self._normalize_search_term(term))
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao consultar os indicadores do destinatário: {e}", "red")
+            return None
+
+    def get_report_analytics(self):
+        try:
+            return self.report_store.analytics_summary()
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao consultar os indicadores das campanhas: {e}", "red")
+            return None
+
+    def count_campaigns(self):
+        try:
+            return self.report_store.count_campaigns()
+        except Exception as e:
+            self._log(
                 f"[ERRO] Falha ao listar relatórios: {e}", "red")
+            return 0
+
+    def get_campaigns(self, offset, limit):
+        try:
+            return self.report_store.list_campaigns(offset, limit)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao listar relatórios: {e}", "red")
+            return []
+
+    def count_campaign_recipients(self, campaign_id):
+        try:
+            return self.report_store.count_recipients(campaign_id)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao ler o relatório: {e}", "red")
+            return 0
+
+    def get_campaign_recipients(self, campaign_id, offset, limit):
+        try:
+            return self.report_store.get_recipients(campaign_id, offset, limit)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao ler o relatório: {e}", "red")
             return []
 
-    def get_report_content(self, filename):
+    def open_report_file(self, campaign_id, rejected=False):
+        """Abre o .txt da campanha (ou o de rejeitados), mesmo se já arquivado."""
+        import report_viewer
+        try:
+            campaign = self.report_store.get_campaign(campaign_id)
+            if not campaign:
+                return None
+            if rejected:
+                # O arquivo de rejeitados leva o horário de início da campanha.
+                file_name = f"{C.REJECTED_FILE_PREFIX}{datetime.fromtimestamp(campaign['started_at']).strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+            else:
+                file_name = campaign["report_file"]
+            if not file_name:
+                return None
+            report_path = self.reports_dir / file_name
+            if report_path.exists():
+                return report_viewer.ReportFile(report_path)
+            extracted = report_archive.extract_to_temp(
+                self.report_store, self.reports_dir, file_name)
+            return report_viewer.ReportFile(extracted, temporary=True) if extracted else None
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao abrir o relatório .txt: {e}", "red")
+            return None
+
+    def export_campaign_results(self, campaign_id, file_path):
+        try:
+            written = result_export.export_campaign(
+                self.report_store, campaign_id, file_path)
+            self._log(
+                f"[RELATÓRIO] Resultados de {written} linha(s) exportados para: {file_path}", "purple")
+            return True
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao exportar os resultados: {e}", "red")
+            return False
+
+    def export_campaign_txt(self, campaign_id, file_path):
         try:
-            with open(self.reports_dir / filename, "r", encoding="utf-8") as f:
-                return f.read()
+            report_store.export_txt(
+                self.report_store, campaign_id, Path(file_path))
+            self._log(
+                f"[RELATÓRIO] Exportado para: {file_path}", "purple")
+            return True
         except Exception as e:
-            self.ui.log_message(
-                f"[ERRO] Falha ao ler o relatório '{filename}': {e}", "red")
-            return "Não foi possível carregar o conteúdo do relatório."
+            self._log(
+                f"[ERRO] Falha ao exportar o relatório: {e}", "red")
+            return False
 
-    def delete_report(self, filename):
+    def delete_campaign(self, campaign_id):
         try:
-            os.remove(self.reports_dir / filename)
-            self.ui.log_message(
-                f"[RELATÓRIO] Arquivo '{filename}' excluído.", "lightgreen")
+            campaign = self.report_store.get_campaign(campaign_id)
+            self.report_store.delete_campaign(campaign_id)
+            if campaign and campaign["report_file"]:
+                report_path = self.reports_dir / campaign["report_file"]
+                if report_path.exists():
+                    os.remove(report_path)
+            self._log(
+                "[RELATÓRIO] Relatório excluído.", "lightgreen")
             return True
         except Exception as e:
-            self.ui.log_message(
-                f"[ERRO] Falha ao excluir o relatório '{filename}': {e}", "red")
+            self._log(
+                f"[ERRO] Falha ao excluir o relatório: {e}", "red")
             return False
 
     def _format_phone_number(self, phone):
-        if not phone:
-            return ""
-        phone_digits = re.sub(r"\D", "", str(phone))
-        if phone_digits.startswith(C.PHONE_COUNTRY_CODE) and len(phone_digits) > 11:
-            return phone_digits
-        return f"{C.PHONE_COUNTRY_CODE}{phone_digits}"
+        import phone_utils
+        return phone_utils.normalize_phone(phone)
 
     def _execute_scheduled_collection(self):
-        self.ui.log_message(
+        self._log(
             "[AGENDADOR] Disparando campanha de cobrança...", C.THEME_COLORS["accent_purple"])
-        settings = config_manager.get_section("schedule_collection")
-        if not self.driver or not self.is_whatsapp_ready():
-            self.ui.log_message(
+        schedule = settings.current().schedule
+        # A conexão não é testada aqui: o navegador só é usado pela thread da fila.
+        if not self.driver:
+            self._log(
                 "[AGENDADOR] WhatsApp não conectado. Tentando na próxima vez.", "orange")
             return
-        campaign_config = {"source_type": C.SourceType.LIST, "contact_list_path": settings.get(
-            "filepath"), "message": settings.get("message"), "image_pdf_path": settings.get("attachment"), "audio_path": None}
+        if self.jobs.has_pending(C.JobKind.SCHEDULED):
+            self._log(
+                "[AGENDADOR] A cobrança anterior ainda está na fila. Disparo ignorado.", "orange")
+            return
+        campaign_config = {"source_type": C.SourceType.LIST, "contact_list_path": schedule.filepath,
+                           "message": schedule.message, "image_pdf_path": schedule.attachment, "audio_path": None,
+                           "cooldown_hours": schedule.cooldown_hours, "export_results": schedule.export_results}
         if not campaign_config["contact_list_path"] or not os.path.exists(campaign_config["contact_list_path"]):
-            self.ui.log_message(
+            self._log(
                 "[AGENDADOR] Arquivo de cobrança não encontrado.", "red")
             return
-        threading.Thread(target=self.start_campaign, args=(
-            campaign_config,), daemon=True).start()
+        self.submit_campaign(campaign_config, C.JobKind.SCHEDULED)
 
     def load_and_reschedule_job(self):
         if not self.scheduler:
             return
-        settings = config_manager.get_section("schedule_collection")
-        if settings.get("enabled", "false").lower() == "true":
+        from apscheduler.triggers.cron import CronTrigger
+        schedule = settings.current().schedule
+        if schedule.enabled:
             if self.schedule_job:
                 self.schedule_job.remove()
             try:
-                hour, minute = map(int, settings.get(
-                    "time", "09:00").split(":"))
-                days_of_week = settings.get("days_of_week", "mon-fri")
                 self.schedule_job = self.scheduler.add_job(self._execute_scheduled_collection, trigger=CronTrigger(
-                    day_of_week=days_of_week, hour=hour, minute=minute))
-                self.ui.log_message(
-                    f"[AGENDADOR] Tarefa programada para {hour:02d}:{minute:02d} em '{days_of_week}'.", C.THEME_COLORS["accent_purple"])
+                    day_of_week=schedule.days_text, hour=schedule.hour, minute=schedule.minute))
+                self._log(
+                    f"[AGENDADOR] Tarefa programada para {schedule.hour:02d}:{schedule.minute:02d} em '{schedule.days_text}'.", C.THEME_COLORS["accent_purple"])
             except Exception as e:
-                self.ui.log_message(
+                self._log(
                     f"[AGENDADOR] Erro ao programar: {e}", "red")
 
     def save_schedule_settings(self, settings_dict):
-        for key, value in settings_dict.items():
-            config_manager.save_setting("schedule_collection", key, str(value))
+        with config_manager.batch():
+            for key, value in settings_dict.items():
+                config_manager.save_setting(
+                    "schedule_collection", key, str(value))
         self.load_and_reschedule_job()
-        if settings_dict.get("enabled", "false").lower() == "false" and self.schedule_job:
+        if not settings.current().schedule.enabled and self.schedule_job:
             self.schedule_job.remove()
             self.schedule_job = None
-            self.ui.log_message(
+            self._log(
                 "[AGENDADOR] Agendamento desativado.", "orange")
 
     def load_schedule_settings(self):
-        return config_manager.get_section("schedule_collection")
+        return settings.current().schedule
+
+    def get_driver_stats(self):
+        return self.metrics.rows()
 
     def is_whatsapp_ready(self):
         if not self.driver:
             return False
         try:
-            WebDriverWait(self.driver, 1).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, MAIN_PANEL)))
-            return not self.driver.find_elements(By.CSS_SELECTOR, QR_CODE_CANVAS)
+            with self.metrics.measure("conexao"):
+                WebDriverWait(self.driver, 1).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, MAIN_PANEL)))
+                return not self.driver.find_elements(By.CSS_SELECTOR, QR_CODE_CANVAS)
         except:
             return False
 
+    def _on_connection_change(self, connected, previous):
+        if previous is None:
+            return
+        self.events.publish(event_bus.ConnectionStateChanged(connected))
+        if connected:
+            self._log(
+                "[INFO] Conexão com o WhatsApp Web restabelecida.", "lightgreen")
+        else:
+            self._log(
+                "[ALERTA] O WhatsApp Web parece desconectado.", "orange")
+
     def shutdown(self):
-        self.ui.log_message("[INFO] Encerrando o agendador...", "orange")
+        self._log("[INFO] Encerrando o agendador...", "orange")
         if self.scheduler and self.scheduler.running:
             self.scheduler.shutdown()
+        self.jobs.close()
+        self.monitor.stop()
         self.stop()
         if self.driver:
             try:
                 self.driver.quit()
             except Exception as e:
-                self.ui.log_message(f"Erro ao fechar navegador: {e}", "orange")
+                self._log(f"Erro ao fechar navegador: {e}", "orange")
         self.discard_recorded_audio()
-        if self.ui and hasattr(self.ui, "on_bot_shutdown"):
-            wx.CallAfter(self.ui.on_bot_shutdown)
+        self.report_store.close()
+        self.events.publish(event_bus.BotShutdown())
 
     def _handle_disconnection(self):
-        self.ui.log_message(
+        self._log(
             "[ALERTA] Conexão com o WhatsApp perdida!", "orange")
-        self.ui.log_message(
+        self._log(
             "[INFO] Pausando e tentando reconectar...", "yellow")
         for i in range(C.RECONNECT_ATTEMPTS):
-            if not self.running:
-                return False
-            self.ui.log_message(
+            self._log(
                 f"[INFO] Tentativa {i + 1}/{C.RECONNECT_ATTEMPTS}. Aguardando {C.RECONNECT_WAIT_SECONDS}s...", "gray")
-            time.sleep(C.RECONNECT_WAIT_SECONDS)
-            if self.is_whatsapp_ready():
-                self.ui.log_message(
+            if not self.control.sleep(C.RECONNECT_WAIT_SECONDS):
+                return False
+            if self.monitor.probe(self.driver):
+                self._log(
                     "[SUCESSO] Conexão reestabelecida! Retomando...", "lightgreen")
                 return True
-        self.ui.log_message(
+        self._log(
             "[FALHA] Não foi possível reconectar. Abortando campanha.", "red")
         return False
 
     def _process_audio(self, audio_data):
-        self.ui.log_message("[ÁUDIO] Aplicando melhorias...", "lightblue")
+        import numpy as np
+        import noisereduce as nr
+        self._log("[ÁUDIO] Aplicando melhorias...", "lightblue")
         reduced_noise = nr.reduce_noise(y=audio_data, sr=self.samplerate)
         peak = np.max(np.abs(reduced_noise))
         normalized = reduced_noise / peak if peak > 0 else reduced_noise
-        self.ui.log_message(
+        self._log(
             "[ÁUDIO] Qualidade de áudio aprimorada!", "lightgreen")
         return normalized
 
@@ -207,101 +472,103 @@ class WhatsAppBot:
             return
         self.is_recording = True
         self.recorded_frames = []
-        self.ui.log_message("[ÁUDIO] Gravação iniciada...", "lightblue")
+        self._log("[ÁUDIO] Gravação iniciada...", "lightblue")
         threading.Thread(target=self._record_audio_thread, daemon=True).start()
 
     def _record_audio_thread(self):
         try:
+            # A pilha de áudio só é carregada na primeira gravação.
+            import sounddevice as sd
             with sd.InputStream(samplerate=self.samplerate, channels=self.channels, dtype=self.dtype, callback=self._audio_callback):
                 while self.is_recording:
                     sd.sleep(100)
         except Exception as e:
-            self.ui.log_message(f"[ERRO] Microfone indisponível: {e}", "red")
+            self._log(f"[ERRO] Microfone indisponível: {e}", "red")
             self.is_recording = False
-            if hasattr(self.ui, "on_recording_error"):
-                wx.CallAfter(self.ui.on_recording_error)
+            self.events.publish(event_bus.RecordingFailed())
 
     def _audio_callback(self, indata, frames, time, status):
         if status:
-            self.ui.log_message(f"[AVISO] Status do áudio: {status}", "orange")
+            self._log(f"[AVISO] Status do áudio: {status}", "orange")
         self.recorded_frames.append(indata.copy())
 
     def stop_recording(self):
         if not self.is_recording:
             return None
         self.is_recording = False
-        self.ui.log_message(
+        self._log(
             "[ÁUDIO] Gravação finalizada. Processando...", "lightblue")
         time.sleep(0.5)
         if not self.recorded_frames:
-            self.ui.log_message("[ERRO] Nenhuma amostra gravada.", "red")
+            self._log("[ERRO] Nenhuma amostra gravada.", "red")
             return None
         try:
+            import numpy as np
+            import soundfile as sf
             raw_recording = np.concatenate(self.recorded_frames, axis=0)
             processed_audio = self._process_audio(raw_recording.flatten())
             sf.write(self.temp_audio_path, processed_audio, self.samplerate)
-            self.ui.log_message(
+            self._log(
                 "[SUCESSO] Áudio processado e salvo.", "lightgreen")
             return str(self.temp_audio_path)
         except Exception as e:
-            self.ui.log_message(f"[ERRO] Falha ao processar áudio: {e}", "red")
+            self._log(f"[ERRO] Falha ao processar áudio: {e}", "red")
             return None
 
     def play_recorded_audio(self):
         if not self.temp_audio_path.exists():
-            self.ui.log_message("[ERRO] Nenhum áudio gravado.", "red")
+            self._log("[ERRO] Nenhum áudio gravado.", "red")
             return
         threading.Thread(target=self._play_audio_thread, daemon=True).start()
 
     def _play_audio_thread(self):
         try:
-            wx.CallAfter(self.ui.set_playback_buttons_state, True)
-            wx.CallAfter(self.ui.log_message,
-                         "[ÁUDIO] Reproduzindo...", "lightblue")
+            self.events.publish(event_bus.PlaybackStateChanged(True))
+            self._log("[ÁUDIO] Reproduzindo...", "lightblue")
+            import sounddevice as sd
+            import soundfile as sf
             data, fs = sf.read(self.temp_audio_path, dtype="float32")
             sd.play(data, fs)
             sd.wait()
-            wx.CallAfter(self.ui.log_message,
-                         "[ÁUDIO] Reprodução finalizada.", "lightblue")
+            self._log("[ÁUDIO] Reprodução finalizada.", "lightblue")
         except Exception as e:
-            wx.CallAfter(self.ui.log_message,
-                         f"[ERRO] Falha ao reproduzir: {e}", "red")
+            self._log(f"[ERRO] Falha ao reproduzir: {e}", "red")
         finally:
-            if hasattr(self.ui, "set_playback_buttons_state"):
-                wx.CallAfter(self.ui.set_playback_buttons_state, False)
+            self.events.publish(event_bus.PlaybackStateChanged(False))
 
     def discard_recorded_audio(self):
         self.recorded_frames = []
         if self.temp_audio_path.exists():
             try:
                 os.remove(self.temp_audio_path)
-                self.ui.log_message(
+                self._log(
                     "[INFO] Gravação temporária descartada.", "orange")
                 return True
             except OSError as e:
-                self.ui.log_message(
+                self._log(
                     f"[ERRO] Falha ao apagar áudio: {e}", "red")
                 return False
         return True
 
     def _open_chat_by_name(self, name):
         try:
-            self.ui.log_message(f"[INFO] Procurando por: '{name}'...")
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, CHAT_SEARCH_INPUT)))
-            search_box.clear()
-            search_box.send_keys(name)
-            result_selector = CHAT_SEARCH_RESULT_BY_TITLE.format(name=name)
-            target_chat = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, result_selector)))
-            self.driver.execute_script("arguments[0].click();", target_chat)
-            WebDriverWait(self.driver, 5).until(
-                lambda driver: self.get_open_contact_name() == name)
-            self.ui.log_message(
+            self._log(f"[INFO] Procurando por: '{name}'...")
+            with self.metrics.measure("abrir_grupo"):
+                search_box = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, CHAT_SEARCH_INPUT)))
+                search_box.clear()
+                search_box.send_keys(name)
+                result_selector = CHAT_SEARCH_RESULT_BY_TITLE.format(name=name)
+                target_chat = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, result_selector)))
+                self.driver.execute_script("arguments[0].click();", target_chat)
+                WebDriverWait(self.driver, 5).until(
+                    lambda driver: self.get_open_contact_name() == name)
+            self._log(
                 f"[INFO] Conversa '{name}' aberta.", "lightgreen")
             return True
         except TimeoutException:
-            self.ui.log_message(
+            self._log(
                 f"[AVISO] Conversa '{name}' não encontrada.", "orange")
             try:
                 self.driver.find_element(
@@ -310,57 +577,286 @@ class WhatsAppBot:
                 pass
             return False
         except Exception as e:
-            self.ui.log_message(
+            self._log(
                 f"[ERRO] Falha ao abrir a conversa '{name}': {e}", "red")
             return False
 
-    def _load_contact_list_from_file(self, file_path):
+    def _load_contact_list_from_file(self, file_path, source_type=C.SourceType.LIST):
         if not file_path or not os.path.exists(file_path):
-            self.ui.log_message(
+            self._log(
                 "[ERRO] Arquivo de lista não encontrado.", "red")
-            return []
-        contacts = []
-        try:
-            if Path(file_path).suffix.lower() == ".txt":
-                with open(file_path, "r", encoding="utf-8") as f:
-                    contacts = [self._format_phone_number(
-                        line.strip()) for line in f if line.strip()]
-            elif Path(file_path).suffix.lower() == ".xlsx":
-                sheet = openpyxl.load_workbook(file_path).active
-                for row in sheet.iter_rows(min_row=1, values_only=True):
-                    if row and row[0]:
-                        contacts.append(self._format_phone_number(row[0]))
-            self.ui.log_message(
-                f"[INFO] {len(contacts)} contatos carregados de '{Path(file_path).name}'.")
-            return contacts
-        except Exception as e:
-            self.ui.log_message(
+            return iter(())
+        return self._stream_contact_list(file_path, source_type)
+
+    def _stream_contact_list(self, file_path, source_type):
+        file_name = Path(file_path).name
+        count = 0
+
+        def report_progress(rows, position, total):
+            if total:
+                self._log(
+                    f"[INFO] Lendo '{file_name}': {rows} linhas ({position / total:.0%}).", "gray")
+            else:
+                self._log(
+                    f"[INFO] Lendo '{file_name}': {rows} linhas.", "gray")
+
+        try:
+            import contact_loader
+            import contact_cache
+            cache_key = contact_cache.make_key(file_path, source_type)
+            contacts = contact_cache.lookup(cache_key)
+            if contacts is not None:
+                self._log(
+                    f"[INFO] Lista '{file_name}' inalterada. Usando cache.", "gray")
+            else:
+                contacts = contact_cache.store(cache_key, contact_loader.iter_contacts(
+                    file_path, source_type, report_progress))
+            for contact in contacts:
+                count += 1
+                yield contact
+        except Exception as e:
+            self._log(
                 f"[ERRO] Falha ao ler o arquivo de lista: {e}", "red")
-            return []
+            return
+        self._log(
+            f"[INFO] {count} contatos carregados de '{file_name}'.")
+
+    def _estimate_contact_count(self, file_path):
+        import contact_loader
+        try:
+            return contact_loader.estimate_rows(file_path)
+        except Exception:
+            # Só serve para o progresso no log; a leitura relata os próprios erros.
+            return None
+
+    def _load_campaign_contacts(self, campaign_config):
+        """Retorna (contatos sob demanda, estimativa do total ou None)."""
+        source_type = campaign_config.get("source_type")
+        if source_type in [C.SourceType.LIST, C.SourceType.GROUP_LIST]:
+            file_path = campaign_config.get("contact_list_path")
+            contacts = self._load_contact_list_from_file(
+                file_path, source_type)
+            expected = self._estimate_contact_count(
+                file_path) if file_path and os.path.exists(file_path) else None
+        elif source_type == C.SourceType.MANUAL_LIST:
+            import contact_loader
+            manual_contacts = campaign_config.get("manual_contacts", [])
+            contacts = contact_loader.contacts_from_pairs(manual_contacts)
+            expected = len(manual_contacts)
+        else:
+            # Gerador vazio: quem consome a lista sempre pode chamar close().
+            return (contact for contact in ()), None
+        contacts = self._skip_opted_out(contacts)
+        cooldown_hours = float(campaign_config.get("cooldown_hours") or 0)
+        if cooldown_hours > 0:
+            contacts = self._skip_recently_contacted(contacts, cooldown_hours)
+        return contacts, expected
+
+    def _skip_opted_out(self, contacts):
+        excluded = 0
+
+        def count_excluded(contact):
+            nonlocal excluded
+            excluded += 1
+
+        yield from self.optout.filter(contacts, count_excluded)
+        if excluded:
+            self._log(
+                f"[EXCLUSÃO] {excluded} destinatário(s) ignorado(s) por estar(em) na lista de exclusão.", "orange")
+
+    def _skip_recently_contacted(self, contacts, cooldown_hours):
+        since = datetime.now() - timedelta(hours=cooldown_hours)
+        skipped = 0
+
+        def count_skipped(contact):
+            nonlocal skipped
+            skipped += 1
+
+        try:
+            yield from self.history.filter(contacts, since, count_skipped)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao consultar o histórico de envios: {e}", "red")
+            return
+        if skipped:
+            self._log(
+                f"[HISTÓRICO] {skipped} destinatário(s) ignorado(s): já contatado(s) nas últimas {cooldown_hours:g}h.", "orange")
+
+    def _prune_history(self):
+        # Guarda o maior intervalo configurado (campanhas manuais e
+        # agendadas), e nunca menos que o período mínimo de retenção.
+        current = settings.current()
+        keep_hours = max(C.HISTORY_RETENTION_HOURS,
+                         current.general.contact_cooldown_hours,
+                         current.schedule.cooldown_hours)
+        try:
+            self.history.prune(datetime.now() - timedelta(hours=keep_hours))
+        except Exception as e:
+            self._log(
+                f"[AVISO] Falha ao limpar o histórico de envios: {e}", "orange")
+
+    def _skip_already_done(self, contacts, already_done):
+        try:
+            for contact in contacts:
+                if contact.identifier not in already_done:
+                    yield contact
+        finally:
+            if hasattr(contacts, "close"):
+                contacts.close()
+
+    def _open_checkpoint(self, run, campaign_config, start_time, resume):
+        report = run["report"]
+        try:
+            return campaign_checkpoint.CheckpointWriter(
+                campaign_config, run["campaign_id"], start_time, run["store_id"],
+                report.path if report else None, resume)
+        except Exception as e:
+            self._log(
+                f"[AVISO] Não foi possível criar o ponto de retomada da campanha: {e}", "orange")
+            return None
+
+    def _close_checkpoint(self, checkpoint, completed):
+        if not checkpoint:
+            return
+        try:
+            checkpoint.close(completed)
+        except Exception as e:
+            self._log(
+                f"[AVISO] Falha ao finalizar o ponto de retomada: {e}", "orange")
+        if not completed:
+            self._log(
+                "[INFO] Campanha incompleta. Use 'Arquivo > Retomar Última Campanha' para continuar de onde parou.", "yellow")
+
+    def _record_contact_result(self, run, seq, contact, status, reason, started):
+        identifier = contact.identifier
+        self._write_report_line(run["report"], report_store.format_detail_line(
+            identifier, status, reason))
+        if run["store_id"] is not None:
+            try:
+                self.report_store.add_recipient(
+                    run["store_id"], seq, contact, status, reason,
+                    duration_ms=int((time.monotonic() - started) * 1000))
+            except Exception as e:
+                self._log(
+                    f"[ERRO] Falha ao registrar '{identifier}' no histórico de relatórios: {e}", "red")
+        if run["checkpoint"]:
+            try:
+                run["checkpoint"].record(seq, identifier, status)
+            except Exception as e:
+                self._log(
+                    f"[AVISO] Falha ao gravar o progresso de '{identifier}': {e}", "orange")
+        try:
+            self.history.record(identifier, run["campaign_id"], status)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao registrar histórico de '{identifier}': {e}", "red")
+
+    def has_resumable_campaign(self):
+        return campaign_checkpoint.load_latest() is not None
+
+    def resume_last_campaign(self):
+        # O checkpoint é lido só na execução: uma campanha em andamento na
+        # fila pode gravar um checkpoint mais recente até lá.
+        return self._submit_job(C.JobKind.RESUME, self._describe_campaign({}, C.JobKind.RESUME),
+                                self._resume_last_campaign)
+
+    def _resume_last_campaign(self):
+        checkpoint = campaign_checkpoint.load_latest()
+        if not checkpoint:
+            self._log(
+                "[INFO] Nenhuma campanha interrompida para retomar.", "orange")
+            return
+        campaign_config, campaign_id, progress = checkpoint
+        campaign_config["campaign_id"] = campaign_id
+        campaign_config["resume"] = progress
+        self._log(
+            f"[CAMPANHA] Retomando a campanha de {campaign_id}: {len(progress['done'])} destinatário(s) já concluído(s) serão ignorados.", "yellow")
+        self._run_campaign_job(campaign_config)
+
+    def get_optout_count(self):
+        try:
+            return len(self.optout)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao ler a lista de exclusão: {e}", "red")
+            return 0
+
+    def add_to_optout(self, identifiers):
+        try:
+            added = self.optout.add(identifiers)
+            self._log(
+                f"[EXCLUSÃO] {added} destinatário(s) adicionado(s) à lista de exclusão.", "lightgreen")
+            return added
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao atualizar a lista de exclusão: {e}", "red")
+            return 0
+
+    def remove_from_optout(self, identifiers):
+        try:
+            removed = self.optout.remove(identifiers)
+            self._log(
+                f"[EXCLUSÃO] {removed} destinatário(s) removido(s) da lista de exclusão.", "lightgreen")
+            return removed
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao atualizar a lista de exclusão: {e}", "red")
+            return 0
+
+    def import_optout_file(self, file_path):
+        try:
+            import contact_loader
+            identifiers = [contact.identifier for contact in contact_loader.iter_contacts(
+                file_path, C.SourceType.LIST) if contact.identifier]
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao ler o arquivo de exclusão: {e}", "red")
+            return 0
+        return self.add_to_optout(identifiers)
+
+    def _create_preflight(self, source_type, start_time):
+        if not settings.current().general.skip_known_failures:
+            return preflight_module.Preflight(self.reports_dir, source_type, start_time)
+        try:
+            known_failures = self.report_store.failed_identifiers(
+                start_time - timedelta(days=C.PREFLIGHT_FAILURE_LOOKBACK_DAYS))
+        except Exception as e:
+            self._log(
+                f"[AVISO] Falha ao consultar falhas de campanhas anteriores: {e}", "orange")
+            known_failures = set()
+        return preflight_module.Preflight(self.reports_dir, source_type, start_time, known_failures)
+
+    def _log_preflight_summary(self, preflight):
+        if preflight.rejected:
+            self._log(
+                f"[PRÉ-VALIDAÇÃO] {preflight.rejected} destinatário(s) rejeitado(s) antes do envio. Detalhes em: {preflight.rejected_path}", "orange")
 
     def _attach_file(self, file_path):
         if not file_path or not os.path.exists(file_path):
             return True
         try:
-            attach_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ATTACH_CLIP_BUTTON)))
-            self.driver.execute_script("arguments[0].click();", attach_button)
-            is_image_video = Path(file_path).suffix.lower() in [
-                ".jpg", ".jpeg", ".png", ".gif", ".mp4", ".webp"]
-            input_selector = ATTACH_IMAGE_INPUT if is_image_video else ATTACH_DOCUMENT_INPUT
-            attach_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, input_selector)))
-            attach_input.send_keys(os.path.abspath(file_path))
-            send_button = WebDriverWait(self.driver, 30).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, SEND_ATTACHMENT_BUTTON)))
-            self.driver.execute_script("arguments[0].click();", send_button)
-            WebDriverWait(self.driver, 30).until_not(
-                EC.presence_of_element_located((By.CSS_SELECTOR, SEND_ATTACHMENT_BUTTON)))
-            self.ui.log_message(
+            with self.metrics.measure("anexo"):
+                attach_button = WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, ATTACH_CLIP_BUTTON)))
+                self.driver.execute_script(
+                    "arguments[0].click();", attach_button)
+                is_image_video = Path(file_path).suffix.lower() in [
+                    ".jpg", ".jpeg", ".png", ".gif", ".mp4", ".webp"]
+                input_selector = ATTACH_IMAGE_INPUT if is_image_video else ATTACH_DOCUMENT_INPUT
+                attach_input = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, input_selector)))
+                attach_input.send_keys(os.path.abspath(file_path))
+                send_button = WebDriverWait(self.driver, 30).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, SEND_ATTACHMENT_BUTTON)))
+                self.driver.execute_script(
+                    "arguments[0].click();", send_button)
+                WebDriverWait(self.driver, 30).until_not(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, SEND_ATTACHMENT_BUTTON)))
+            self._log(
                 f"[INFO] Anexo '{Path(file_path).name}' enviado.", "lightgreen")
             return True
         except Exception as e:
-            self.ui.log_message(f"[ERRO] Falha ao anexar arquivo: {e}", "red")
+            self._log(f"[ERRO] Falha ao anexar arquivo: {e}", "red")
             try:
                 self.driver.find_element(
                     By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
@@ -372,159 +868,273 @@ class WhatsAppBot:
         if not message or not message.strip():
             return True
         try:
-            text_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, MAIN_TEXT_BOX))
-            )
-            # 1. Clica na caixa de texto para garantir o foco
-            text_box.click()
-            time.sleep(0.5)
-
-            # 2. Digita a mensagem caractere por caractere
-            for char in message:
-                if char == '\n':
-                    # Simula Shift+Enter para quebra de linha
-                    text_box.send_keys(Keys.SHIFT, Keys.ENTER)
-                else:
-                    text_box.send_keys(char)
-                # Pausa aleatória minúscula entre as teclas para simular digitação
-                time.sleep(random.uniform(0.05, 0.15))
+            with self.metrics.measure("digitar_texto"):
+                text_box = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, MAIN_TEXT_BOX))
+                )
+                # 1. Clica na caixa de texto para garantir o foco
+                text_box.click()
+                time.sleep(0.5)
+
+                # 2. Digita a mensagem caractere por caractere
+                for char in message:
+                    if char == '\n':
+                        # Simula Shift+Enter para quebra de linha
+                        text_box.send_keys(Keys.SHIFT, Keys.ENTER)
+                    else:
+                        text_box.send_keys(char)
+                    # Pausa aleatória minúscula entre as teclas para simular digitação
+                    time.sleep(random.uniform(0.05, 0.15))
 
             # 3. Aguarda e clica no botão de enviar
-            send_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, SEND_MESSAGE_BUTTON))
-            )
-            send_button.click()
+            with self.metrics.measure("enviar_texto"):
+                send_button = WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable(
+                        (By.CSS_SELECTOR, SEND_MESSAGE_BUTTON))
+                )
+                send_button.click()
 
-            self.ui.log_message(
+            self._log(
                 "[INFO] Mensagem de texto enviada.", "lightgreen")
             return True
 
         except Exception as e:
-            self.ui.log_message(f"[ERRO] Falha ao enviar texto: {e}", "red")
+            self._log(f"[ERRO] Falha ao enviar texto: {e}", "red")
             return False
 
     def start_campaign(self, campaign_config):
-        self.running = True
-        self.ui.update_buttons_for_running(True)
-        self.ui.log_message("[CAMPANHA] MODO CAMPANHA ATIVADO.", "yellow")
-        report_data = []
-        start_time = datetime.now()
+        _load_selenium()
+        self.control.start()
+        # As estatísticas do navegador valem por campanha.
+        self.metrics.reset()
+        self.events.publish(event_bus.CampaignStateChanged(True))
+        self._log("[CAMPANHA] MODO CAMPANHA ATIVADO.", "yellow")
+        try:
+            self._run_campaign(campaign_config)
+        finally:
+            # Mesmo que um erro inesperado escape, a campanha sai do estado
+            # "rodando" e a interface volta ao normal.
+            self.stop()
+
+    def _run_campaign(self, campaign_config):
+        # Uma campanha retomada continua a original: mesmo início, mesma
+        # campanha no banco, mesmo relatório e a numeração de onde parou.
+        resume = campaign_config.get("resume")
+        start_time = resume and resume["started_at"] or datetime.now()
+        campaign_id = campaign_config.get(
+            "campaign_id") or start_time.strftime('%Y-%m-%d_%H-%M-%S')
+        already_done = resume["done"] if resume else set()
         source_type = campaign_config.get("source_type")
         message = campaign_config.get("message", "")
         image_pdf_path = campaign_config.get("image_pdf_path")
         audio_path = campaign_config.get("audio_path")
-        contacts_to_process = []
-        if source_type in [C.SourceType.LIST, C.SourceType.GROUP_LIST]:
-            contacts_to_process = self._load_contact_list_from_file(
-                campaign_config.get("contact_list_path"))
-        elif source_type == C.SourceType.MANUAL_LIST:
-            manual_contacts = campaign_config.get("manual_contacts", [])
-            contacts_to_process = [(name, self._format_phone_number(
-                number)) for name, number in manual_contacts]
-        if not contacts_to_process:
-            self.ui.log_message("[ERRO] Lista de contatos vazia.", "red")
-            self.stop()
+        contacts_to_process, expected = self._load_campaign_contacts(
+            campaign_config)
+        if expected is not None:
+            # Estimativa (teto): exclusões e rejeições só são conhecidas na leitura.
+            expected = max(expected - len(already_done), 0)
+        if already_done:
+            contacts_to_process = self._skip_already_done(
+                contacts_to_process, already_done)
+        preflight = self._create_preflight(source_type, start_time)
+        contacts_to_process = preflight.filter(contacts_to_process)
+        # A lista é consumida sob demanda; basta espiar o primeiro registro.
+        first_contact = next(contacts_to_process, None)
+        if first_contact is None:
+            self._log_preflight_summary(preflight)
+            self._log(
+                "[ERRO] Lista de contatos vazia ou sem contatos válidos.", "red")
             return
-        total = len(contacts_to_process)
-        success_count = 0
-        fail_count = 0
-        for i, contact_info in enumerate(contacts_to_process):
-            if not self.running:
-                report_data.append("\nCampanha interrompida.")
-                break
-            while self.paused:
-                time.sleep(1)
-            if not self.is_whatsapp_ready() and not self._handle_disconnection():
-                report_data.append("\nCampanha abortada por falha de conexão.")
-                break
-            identifier, manual_name = (
-                contact_info[1], contact_info[0]) if source_type == C.SourceType.MANUAL_LIST else (contact_info, "")
-            self.ui.log_message(
-                f"--- Processando {i + 1}/{total}: {identifier} ---", "lightblue")
-            try:
-                chat_opened, contact_name_for_msg = False, ""
-                if source_type in [C.SourceType.LIST, C.SourceType.MANUAL_LIST]:
-                    # Passa a mensagem aqui
-                    if self.send_message_to_contact(identifier, message):
-                        chat_opened = True
-                        time.sleep(1)
-                        contact_name_for_msg = manual_name or self.get_open_contact_name()
-                elif source_type == C.SourceType.GROUP_LIST:
-                    chat_opened = self._open_chat_by_name(identifier)
-                    contact_name_for_msg = identifier
-
-                if not chat_opened:
-                    self.ui.log_message(
-                        f"[FALHA] Não foi possível abrir conversa com '{identifier}'.", "red")
+        run = {
+            "campaign_id": campaign_id,
+            "report": self._open_report(start_time, resume),
+        }
+        run["store_id"] = self._open_store_campaign(
+            run, campaign_config, start_time, resume)
+        run["checkpoint"] = self._open_checkpoint(
+            run, campaign_config, start_time, resume=bool(resume))
+        end_status = C.CAMPAIGN_STATUS_COMPLETED
+        total = resume["last_seq"] if resume else 0
+        success_count = resume["success"] if resume else 0
+        fail_count = resume["fail"] if resume else 0
+        try:
+            for i, contact in enumerate(itertools.chain([first_contact], contacts_to_process)):
+                # O intervalo entre envios acontece antes de cada contato (exceto o
+                # primeiro), pois o tamanho da lista só é conhecido ao final da leitura.
+                if i > 0 and self.control.running:
+                    delay = random.uniform(C.MIN_SEND_DELAY, C.MAX_SEND_DELAY)
+                    self._log(f"Aguardando {delay:.1f}s...", "gray")
+                    self.control.sleep(delay)
+                # Pausada, a thread fica parada aqui até retomar ou parar.
+                if not self.control.wait_while_paused():
+                    self._write_report_line(
+                        run["report"], "\nCampanha interrompida.")
+                    end_status = C.CAMPAIGN_STATUS_INTERRUPTED
+                    break
+                # Uma leitura recente (do monitor ou de uma reconexão) é
+                # reaproveitada; senão a página é lida agora, com um único
+                # script. Vale a leitura bruta, sem a tolerância do monitor:
+                # uma falha já leva à checagem completa antes do envio.
+                ready = self.monitor.last_ready if not self.monitor.is_stale() \
+                    else self.monitor.probe(self.driver)
+                if not ready and not self.is_whatsapp_ready() and not self._handle_disconnection():
+                    self._write_report_line(
+                        run["report"], "\nCampanha abortada por falha de conexão.")
+                    end_status = C.CAMPAIGN_STATUS_ABORTED
+                    break
+                total += 1
+                contact_started = time.monotonic()
+                identifier, manual_name = contact.identifier, contact.name
+                self._log(
+                    f"--- Processando {i + 1}/{expected or '?'}: {identifier} ---", "lightblue")
+                try:
+                    chat_opened, contact_name_for_msg = False, ""
+                    if source_type in [C.SourceType.LIST, C.SourceType.MANUAL_LIST]:
+                        # Passa a mensagem aqui
+                        if self.send_message_to_contact(identifier, message):
+                            chat_opened = True
+                            time.sleep(1)
+                            contact_name_for_msg = manual_name or self.get_open_contact_name()
+                    elif source_type == C.SourceType.GROUP_LIST:
+                        chat_opened = self._open_chat_by_name(identifier)
+                        contact_name_for_msg = identifier
+
+                    if not chat_opened:
+                        self._log(
+                            f"[FALHA] Não foi possível abrir conversa com '{identifier}'.", "red")
+                        fail_count += 1
+                        # Só a recusa explícita do WhatsApp marca o número como
+                        # inválido; as demais falhas podem ser passageiras.
+                        reason = C.REPORT_INVALID_NUMBER_REASON if source_type != C.SourceType.GROUP_LIST \
+                            and self._invalid_number_shown() else C.REPORT_CHAT_FAILED_REASON
+                        self._record_contact_result(
+                            run, total, contact, C.STATUS_FAILURE, reason, contact_started)
+                        continue
+
+                    # O envio do texto agora é feito dentro de send_message_to_contact
+                    # Apenas os anexos são enviados depois
+                    final_message = message.replace("@Nome", contact_name_for_msg.split(",")[
+                                                    0]) if "@Nome" in message and contact_name_for_msg else message.replace("@Nome,", "").replace("@Nome", "")
+
+                    # A lógica de envio de texto foi movida para send_message_to_contact, então o reenvio aqui foi removido
+                    # e o resultado é determinado pela abertura da conversa.
+                    image_success = self._attach_file(image_pdf_path)
+                    audio_success = self._attach_file(audio_path)
+
+                    if image_success and audio_success:
+                        self._log(
+                            f"[SUCESSO] Enviado para {identifier}", "lightgreen")
+                        success_count += 1
+                        self._record_contact_result(
+                            run, total, contact, C.STATUS_SUCCESS, "", contact_started)
+                    else:
+                        self._log(
+                            f"[AVISO] Mensagem de texto enviada, mas falha ao enviar anexo para {identifier}.", "orange")
+                        # Consideramos sucesso se o texto foi, mas o anexo não. Pode ser ajustado.
+                        success_count += 1
+                        self._record_contact_result(
+                            run, total, contact, C.STATUS_PARTIAL, C.PARTIAL_REASON, contact_started)
+
+                except Exception as e:
+                    self._log(
+                        f"[FALHA] Erro crítico com {identifier}: {e}", "red")
                     fail_count += 1
-                    report_data.append(
-                        f"Destinatário: {identifier}\tStatus: FALHA\tMotivo: Contato/Grupo inválido.")
-                    continue
-
-                # O envio do texto agora é feito dentro de send_message_to_contact
-                # Apenas os anexos são enviados depois
-                final_message = message.replace("@Nome", contact_name_for_msg.split(",")[
-                                                0]) if "@Nome" in message and contact_name_for_msg else message.replace("@Nome,", "").replace("@Nome", "")
-
-                # A lógica de envio de texto foi movida para send_message_to_contact, então o reenvio aqui foi removido
-                # e o resultado é determinado pela abertura da conversa.
-                image_success = self._attach_file(image_pdf_path)
-                audio_success = self._attach_file(audio_path)
-
-                if image_success and audio_success:
-                    self.ui.log_message(
-                        f"[SUCESSO] Enviado para {identifier}", "lightgreen")
-                    success_count += 1
-                    report_data.append(
-                        f"Destinatário: {identifier}\tStatus: SUCESSO")
-                else:
-                    self.ui.log_message(
-                        f"[AVISO] Mensagem de texto enviada, mas falha ao enviar anexo para {identifier}.", "orange")
-                    # Consideramos sucesso se o texto foi, mas o anexo não. Pode ser ajustado.
-                    success_count += 1
-                    report_data.append(
-                        f"Destinatário: {identifier}\tStatus: SUCESSO PARCIAL (texto enviado, anexo falhou)")
+                    self._record_contact_result(
+                        run, total, contact, C.STATUS_FAILURE, str(e), contact_started)
+        except Exception:
+            self._write_report_line(
+                run["report"], "\nCampanha abortada por erro inesperado.")
+            end_status = C.CAMPAIGN_STATUS_ABORTED
+            raise
+        finally:
+            # Relatório, ponto de retomada e banco são fechados mesmo se a
+            # campanha for abortada por uma exceção.
+            contacts_to_process.close()
+            self._close_checkpoint(
+                run["checkpoint"], end_status == C.CAMPAIGN_STATUS_COMPLETED)
+            self._log_preflight_summary(preflight)
+            self._log("[CAMPANHA] CAMPANHA FINALIZADA.", "yellow")
+            self._close_report(run, end_status, total, success_count,
+                               fail_count, preflight.rejected)
+            self._prune_history()
+        if campaign_config.get("export_results") and run["store_id"] is not None:
+            self.export_campaign_results(
+                run["store_id"], self.reports_dir / f"{C.RESULT_EXPORT_PREFIX}{campaign_id}.xlsx")
 
+    def _open_report(self, start_time, resume=None):
+        if not settings.current().general.txt_reports:
+            return None
+        report_filename = self.reports_dir / \
+            f"{C.REPORT_FILE_PREFIX}{start_time.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+        if resume and resume["report_path"] and resume["report_path"].exists():
+            try:
+                report = report_writer.CampaignReport(
+                    resume["report_path"], start_time, resume=True)
+                self._write_report_line(
+                    report, f"\nCampanha retomada em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}.\n")
+                return report
             except Exception as e:
-                self.ui.log_message(
-                    f"[FALHA] Erro crítico com {identifier}: {e}", "red")
-                fail_count += 1
-                report_data.append(
-                    f"Destinatário: {identifier}\tStatus: FALHA\tMotivo: {e}")
-            if i < total - 1 and self.running:
-                delay = random.uniform(C.MIN_SEND_DELAY, C.MAX_SEND_DELAY)
-                self.ui.log_message(f"Aguardando {delay:.1f}s...", "gray")
-                time.sleep(delay)
-        self.ui.log_message("[CAMPANHA] CAMPANHA FINALIZADA.", "yellow")
+                self._log(
+                    f"[AVISO] Não foi possível reabrir o relatório da campanha: {e}", "orange")
+        try:
+            return report_writer.CampaignReport(report_filename, start_time)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao criar relatório: {e}", "red")
+            return None
+
+    def _open_store_campaign(self, run, campaign_config, start_time, resume=None):
+        report = run["report"]
+        source_type = campaign_config.get("source_type")
+        try:
+            if resume and resume["store_id"] is not None \
+                    and self.report_store.resume_campaign(resume["store_id"]):
+                return resume["store_id"]
+            return self.report_store.start_campaign(
+                run["campaign_id"], start_time, source_type.name if source_type else None,
+                campaign_config.get("contact_list_path"), report.path.name if report else None)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao registrar a campanha no histórico de relatórios: {e}", "red")
+            return None
+
+    def _write_report_line(self, report, line):
+        if not report:
+            return
+        try:
+            report.write(line)
+        except Exception as e:
+            self._log(
+                f"[ERRO] Falha ao gravar no relatório: {e}", "red")
+
+    def _close_report(self, run, end_status, total, success_count, fail_count, rejected_count):
         end_time = datetime.now()
-        report_filename = self.reports_dir / \
-            f"Relatorio_{start_time.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
-        try:
-            with open(report_filename, "w", encoding="utf-8") as f:
-                f.write("=" * 50 + "\n")
-                f.write(f"{C.REPORT_TITLE}\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(
-                    f"Início: {start_time.strftime('%d/%m/%Y %H:%M:%S')}\n")
-                f.write(f"Fim: {end_time.strftime('%d/%m/%Y %H:%M:%S')}\n")
-                f.write(f"Duração: {end_time - start_time}\n\n")
-                f.write(
-                    f"Resumo:\n  - Total: {total}\n  - Sucessos: {success_count}\n  - Falhas: {fail_count}\n\n")
-                f.write("=" * 50 + "\n")
-                f.write(f"{C.REPORT_DETAILS_HEADER}\n")
-                f.write("=" * 50 + "\n\n")
-                f.write("\n".join(report_data))
-            self.ui.log_message(
-                f"[RELATÓRIO] Salvo em: {report_filename}", "purple")
-        except Exception as e:
-            self.ui.log_message(
+        if run["store_id"] is not None:
+            try:
+                self.report_store.finish_campaign(
+                    run["store_id"], end_time, end_status, total, success_count, fail_count, rejected_count)
+            except Exception as e:
+                self._log(
+                    f"[ERRO] Falha ao salvar a campanha no histórico de relatórios: {e}", "red")
+        report = run["report"]
+        if not report:
+            return
+        try:
+            metrics_lines = self.metrics.report_lines()
+            if metrics_lines:
+                report.write_section(C.REPORT_METRICS_HEADER, metrics_lines)
+            report.close(end_time, total, success_count,
+                         fail_count, rejected_count)
+            self._log(
+                f"[RELATÓRIO] Salvo em: {report.path}", "purple")
+        except Exception as e:
+            self._log(
                 f"[ERRO] Falha ao salvar relatório: {e}", "red")
-        self.stop()
 
     def setup_driver(self):
         try:
+            _load_selenium()
             base_path = sys._MEIPASS if getattr(
                 sys, "frozen", False) else Path(__file__).parent.resolve()
             drivers_path = Path(base_path) / C.DRIVERS_DIR
@@ -539,17 +1149,17 @@ class WhatsAppBot:
                 browser, user_data, options, driver_exe, ServiceClass = "Chrome", chrome_profile_path, webdriver.ChromeOptions(
                 ), C.CHROME_DRIVER_EXE, ChromeService
             else:
-                self.ui.log_message(
+                self._log(
                     "[ERRO] Perfil do Chrome ou Edge não encontrado.", "red")
-                wx.CallAfter(self.ui.on_connection_failed)
+                self.events.publish(event_bus.ConnectionFailed())
                 return False
             driver_path = str(drivers_path / driver_exe)
             if not os.path.exists(driver_path):
-                self.ui.log_message(
+                self._log(
                     f"[ERRO] Driver não encontrado em: {driver_path}", "red")
-                wx.CallAfter(self.ui.on_connection_failed)
+                self.events.publish(event_bus.ConnectionFailed())
                 return False
-            self.ui.log_message(f"[INFO] Usando {browser} com perfil local.")
+            self._log(f"[INFO] Usando {browser} com perfil local.")
             options.add_argument(f"--user-data-dir={user_data}")
             options.add_argument("--profile-directory=Default")
             options.add_argument("--start-maximized")
@@ -559,32 +1169,44 @@ class WhatsAppBot:
             service = ServiceClass(executable_path=driver_path)
             self.driver = webdriver.Edge(service=service, options=options) if browser == "Edge" else webdriver.Chrome(
                 service=service, options=options)
-            self.ui.log_message(f"[INFO] Abrindo WhatsApp Web no {browser}...")
+            self._log(f"[INFO] Abrindo WhatsApp Web no {browser}...")
             self.driver.get("https://web.whatsapp.com")
-            self.ui.log_message("[INFO] Aguardando conexão do WhatsApp...")
+            self._log("[INFO] Aguardando conexão do WhatsApp...")
             WebDriverWait(self.driver, 180).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, MAIN_PANEL)))
-            self.ui.enable_buttons()
+            self.events.publish(event_bus.ConnectionReady())
+            self.monitor.start()
+            if self.has_resumable_campaign():
+                self._log(
+                    "[INFO] Existe uma campanha interrompida. Use 'Arquivo > Retomar Última Campanha' para continuar.", "yellow")
             return True
         except Exception as e:
-            self.ui.log_message(
+            self._log(
                 f"[ERRO CRÍTICO] Falha ao iniciar navegador: {e}", "red")
-            if self.ui:
-                wx.CallAfter(self.ui.on_connection_failed)
+            self.events.publish(event_bus.ConnectionFailed())
             return False
 
     def get_open_contact_name(self):
         try:
-            return WebDriverWait(self.driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, CHAT_HEADER_TITLE))).text
+            with self.metrics.measure("nome_contato"):
+                return WebDriverWait(self.driver, 5).until(EC.presence_of_element_located((By.CSS_SELECTOR, CHAT_HEADER_TITLE))).text
         except:
             return ""
 
     def send_message_to_contact(self, phone, message):
         try:
-            self.driver.get(f"https://web.whatsapp.com/send?phone={phone}")
-            # Espera a caixa de texto aparecer para garantir que a página carregou
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, MAIN_TEXT_BOX)))
+            with self.metrics.measure("abrir_conversa"):
+                self.driver.get(
+                    f"https://web.whatsapp.com/send?phone={phone}")
+                # Espera a caixa de texto (página carregada) ou o aviso de número inválido
+                WebDriverWait(self.driver, 20).until(EC.any_of(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, MAIN_TEXT_BOX)),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, POPUP_MODAL))))
+            if self._invalid_number_shown():
+                self._log(
+                    f"[AVISO] O WhatsApp informou que o número {phone} é inválido.", "orange")
+                return False
 
             # Se uma mensagem foi fornecida, envia ela aqui
             if message:
@@ -594,20 +1216,35 @@ class WhatsAppBot:
 
             return True  # Retorna sucesso se abriu a conversa mas não tinha mensagem para enviar
         except (TimeoutException, Exception) as e:
-            self.ui.log_message(
+            self._log(
                 f"[ERRO] Não foi possível carregar a conversa com {phone}: {e}", "red")
             return False
 
+    def _invalid_number_shown(self):
+        try:
+            return any(keyword in popup.text.lower()
+                       for popup in self.driver.find_elements(By.CSS_SELECTOR, POPUP_MODAL)
+                       for keyword in POPUP_INVALID_NUMBER_TEXTS)
+        except Exception:
+            return False
+
+    @property
+    def running(self):
+        return self.control.running
+
+    @property
+    def paused(self):
+        return self.control.paused
+
     def stop(self):
-        if self.running:
-            self.running = False
-            if self.paused:
-                self.paused = False
-                self.ui.update_pause_button(False)
-            self.ui.update_buttons_for_running(False)
+        was_running, was_paused = self.control.stop()
+        if was_running:
+            if was_paused:
+                self.events.publish(event_bus.PauseStateChanged(False))
+            self.events.publish(event_bus.CampaignStateChanged(False))
 
     def toggle_pause(self):
-        self.paused = not self.paused
-        self.ui.log_message(
-            f"[INFO] Campanha {'pausada' if self.paused else 'retomada'}.", "yellow")
-        self.ui.update_pause_button(self.paused)
+        paused = self.control.toggle_pause()
+        self._log(
+            f"[INFO] Campanha {'pausada' if paused else 'retomada'}.", "yellow")
+        self.events.publish(event_bus.PauseStateChanged(paused))
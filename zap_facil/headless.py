@@ -0,0 +1,110 @@
+# headless.py
+# Execução sem interface (serviço em segundo plano) para as campanhas
+# agendadas de cobrança. Conecta ao WhatsApp Web, inicia o agendador com as
+# mesmas configurações do config.ini usadas pela janela e registra os
+# eventos do bot em arquivo (ou na saída padrão). Não importa o wxPython.
+# Uso: python headless.py [--stdout] [--log ARQUIVO]
+# Não rode junto com a janela com o agendamento ativo: as duas instâncias
+# disparariam a mesma campanha.
+
+import sys
+import signal
+import logging
+import argparse
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import constants as C
+import config_manager
+import settings
+import event_bus
+from functions import WhatsAppBot
+
+DEFAULT_LOG_PATH = config_manager.CONFIG_DIR / C.LOG_SUBDIR / C.HEADLESS_LOG_FILENAME
+
+
+def _create_logger(to_stdout, log_path):
+    logger = logging.Logger("zap_facil.servico")
+    if to_stdout and sys.stdout is not None:
+        handler = logging.StreamHandler(sys.stdout)
+    else:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(log_path, maxBytes=C.LOG_FILE_MAX_BYTES,
+                                      backupCount=C.LOG_FILE_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(message)s", datefmt="%d/%m/%Y %H:%M:%S"))
+    logger.addHandler(handler)
+    return logger
+
+
+def _connect(bot, logger, stop_requested):
+    job = bot.connect()
+    if job is None:
+        return False
+    while not job.wait(1):
+        if stop_requested.is_set():
+            return False
+    if job.result is True:
+        return True
+    # Um navegador aberto sem sessão prenderia o perfil na próxima tentativa.
+    if bot.driver:
+        try:
+            bot.driver.quit()
+        except Exception:
+            pass
+        bot.driver = None
+    logger.info(
+        f"[AVISO] Nova tentativa de conexão em {C.HEADLESS_RECONNECT_MINUTES} minuto(s).")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Executa as campanhas agendadas do Zap Fácil sem a interface.")
+    parser.add_argument("--stdout", action="store_true",
+                        help="Escreve os eventos na saída padrão em vez do arquivo de log.")
+    parser.add_argument("--log", type=Path, default=DEFAULT_LOG_PATH,
+                        help=f"Arquivo de log (padrão: {DEFAULT_LOG_PATH}).")
+    args = parser.parse_args()
+    logger = _create_logger(args.stdout, args.log)
+
+    if not config_manager.is_disclaimer_accepted():
+        logger.info(
+            "[ERRO] O termo de uso ainda não foi aceito. Abra o Zap Fácil uma vez e aceite-o.")
+        return 1
+    if not settings.current().schedule.enabled:
+        logger.info(
+            "[AVISO] Nenhum agendamento ativo. Configure-o em 'Agendamentos > Agendar Cobranças' na janela.")
+
+    events = event_bus.EventBus()
+    events.subscribe(event_bus.LogMessage,
+                     lambda ev: logger.info(ev.message))
+    bot = WhatsAppBot(events)
+
+    stop_requested = threading.Event()
+
+    def request_stop(signum, frame):
+        stop_requested.set()
+    for name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), request_stop)
+
+    logger.info(f"[INFO] {C.APP_NAME} v{C.APP_VERSION} iniciado sem interface.")
+    bot.initialize_scheduler()
+    next_attempt = 0
+    # Esperas curtas mantêm o Ctrl+C/encerramento do serviço responsivo.
+    while not stop_requested.wait(1):
+        if bot.driver is None and time.monotonic() >= next_attempt:
+            if not _connect(bot, logger, stop_requested):
+                next_attempt = time.monotonic() + C.HEADLESS_RECONNECT_MINUTES * 60
+
+    logger.info("[INFO] Encerrando o serviço...")
+    bot.shutdown()
+    events.close(timeout=5)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
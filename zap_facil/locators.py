@@ -35,6 +35,13 @@ CHAT_HEADER_TITLE = "header span[data-testid='conversation-info-header-chat-titl
 CHAT_SEARCH_RESULT_BY_TITLE = "span[title='{}']"
 
 
+# Janela que o WhatsApp abre quando o número do link não tem conta.
+# O texto é conferido junto (POPUP_INVALID_NUMBER_TEXTS), pois outras janelas
+# usam o mesmo contêiner.
+POPUP_MODAL = "div[data-animate-modal-popup='true']"
+POPUP_INVALID_NUMBER_TEXTS = ("inválido", "invalid")
+
+
 # --- COMPOSIÇÃO E ENVIO DE MENSAGENS ---
 # Seletores para a caixa de texto e botões de envio.
 
@@ -0,0 +1,76 @@
+# log_buffer.py
+# Fila do Histórico de Eventos.
+# As threads do bot só acrescentam linhas a um buffer circular, sem acionar
+# a interface; a janela esvazia o buffer em lotes, num timer, e junta as
+# linhas consecutivas da mesma cor em um único trecho de texto.
+# Toda linha também vai para um arquivo de log rotativo no diretório de
+# configuração: o painel mostra só as linhas recentes sem que nada se perca.
+
+import logging
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+import constants as C
+import config_manager
+
+LOG_PATH = config_manager.CONFIG_DIR / C.LOG_SUBDIR / C.LOG_FILENAME
+
+
+def _create_file_logger(path):
+    logger = logging.Logger("zap_facil.eventos")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=C.LOG_FILE_MAX_BYTES,
+                                      backupCount=C.LOG_FILE_BACKUPS, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(message)s", datefmt="%d/%m/%Y %H:%M:%S"))
+    except OSError:
+        # Sem acesso à pasta: o painel continua funcionando, só sem o arquivo.
+        handler = logging.NullHandler()
+    logger.addHandler(handler)
+    return logger
+
+
+class LogBuffer:
+    """Buffer circular de linhas (mensagem, cor), seguro para várias threads."""
+
+    def __init__(self, log_path=LOG_PATH, max_lines=C.LOG_BUFFER_MAX_LINES):
+        self._lines = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._file_logger = _create_file_logger(log_path)
+
+    def push(self, message, color):
+        self._file_logger.info(message)
+        with self._lock:
+            # Se a tela não acompanhar, as linhas mais antigas ficam só no arquivo.
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append((message, color))
+
+    def drain(self, limit=C.LOG_DRAIN_BATCH):
+        """
+        Retira até 'limit' linhas, na ordem de chegada. Retorna (linhas,
+        quantas foram descartadas do buffer desde a última retirada).
+        """
+        with self._lock:
+            count = min(limit, len(self._lines))
+            lines = [self._lines.popleft() for _ in range(count)]
+            dropped, self._dropped = self._dropped, 0
+        return lines, dropped
+
+    def close(self):
+        for handler in self._file_logger.handlers:
+            handler.close()
+
+
+def coalesce(lines):
+    """Agrupa linhas consecutivas da mesma cor: [(cor, texto com as quebras)]."""
+    runs = []
+    for message, color in lines:
+        if runs and runs[-1][0] == color:
+            runs[-1][1].append(message)
+        else:
+            runs.append((color, [message]))
+    return [(color, "\n".join(messages) + "\n") for color, messages in runs]
@@ -0,0 +1,213 @@
+# optout.py
+# Lista de exclusão (opt-out): destinatários que pediram para não receber
+# mensagens. O índice fica no diretório de configuração em dois arquivos:
+#   - optout.idx: vetor ordenado de chaves uint64 (busca binária, O(log n));
+#   - optout.log: registro de inclusões/remoções feitas desde a última
+#     compactação, o que torna cada alteração um simples append.
+# Números viram a própria chave numérica; nomes de grupo usam um hash de
+# 63 bits com o bit mais alto ligado, para não colidir com telefones.
+
+import os
+import re
+import hashlib
+import threading
+
+import numpy as np
+
+import constants as C
+import config_manager
+import phone_utils
+
+INDEX_PATH = config_manager.CONFIG_DIR / C.OPTOUT_INDEX_FILENAME
+LOG_PATH = config_manager.CONFIG_DIR / C.OPTOUT_LOG_FILENAME
+
+_PHONE_PATTERN = re.compile(r"[\d\s()+\-.]+")
+_NAME_FLAG = 1 << 63
+# Só números com o tamanho de um telefone (país + DDD + fixo/celular) viram
+# chave numérica; qualquer outra sequência de dígitos estouraria os 64 bits
+# ou invadiria a faixa reservada aos nomes.
+_PHONE_KEY_LENGTHS = frozenset(
+    len(C.PHONE_COUNTRY_CODE) + 2 + length
+    for length in (C.LANDLINE_NUMBER_LENGTH, C.MOBILE_NUMBER_LENGTH))
+
+
+def _name_key(text):
+    digest = hashlib.blake2b(text.casefold().encode(
+        "utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | _NAME_FLAG
+
+
+def _phone_key(number):
+    """Chave numérica do telefone, ou None se não tiver formato de telefone."""
+    if number.isdigit() and len(number) in _PHONE_KEY_LENGTHS:
+        return int(number)
+    return None
+
+
+def keys_for(identifiers, normalized=False):
+    """
+    Converte números ou nomes de grupo nas chaves usadas pelo índice.
+    Com 'normalized=True' os números já estão no formato final (como os
+    produzidos pelo contact_loader) e a normalização em lote é dispensada.
+    """
+    texts = [str(i).strip() for i in identifiers]
+    keys = np.zeros(len(texts), dtype=np.uint64)
+    phone_positions = []
+    for position, text in enumerate(texts):
+        if normalized:
+            key = _phone_key(text)
+            keys[position] = _name_key(text) if key is None else key
+        elif text and _PHONE_PATTERN.fullmatch(text):
+            phone_positions.append(position)
+        else:
+            keys[position] = _name_key(text)
+    if phone_positions:
+        batch = phone_utils.normalize_phones(
+            [texts[p] for p in phone_positions])
+        for position, number in zip(phone_positions, batch.numbers):
+            key = _phone_key(number)
+            keys[position] = _name_key(texts[position]) if key is None else key
+    return keys
+
+
+class OptOutList:
+    """Índice persistente da lista de exclusão, seguro para várias threads."""
+
+    def __init__(self, index_path=INDEX_PATH, log_path=LOG_PATH):
+        self.index_path = index_path
+        self.log_path = log_path
+        self._keys = np.zeros(0, dtype=np.uint64)
+        self._log_entries = 0
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        """Tamanho e mtime dos arquivos, para recarregar se outro processo alterá-los."""
+        signature = []
+        for path in (self.index_path, self.log_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _ensure_loaded(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        keys = np.zeros(0, dtype=np.uint64)
+        if self.index_path.exists():
+            keys = np.fromfile(self.index_path, dtype="<u8").astype(np.uint64)
+        last_operation = {}
+        self._log_entries = 0
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if len(line) < 2:
+                        continue
+                    self._log_entries += 1
+                    # O log é aplicado em ordem: vale a última operação de cada chave.
+                    last_operation[int(line[1:])] = line[0]
+        added = [key for key, sign in last_operation.items() if sign == "+"]
+        removed = [key for key, sign in last_operation.items() if sign == "-"]
+        keys = np.union1d(keys, np.array(added, dtype=np.uint64))
+        if removed:
+            keys = np.setdiff1d(keys, np.array(removed, dtype=np.uint64))
+        self._keys = keys
+        self._signature = signature
+
+    def _append_log(self, sign, keys):
+        config_manager.CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{sign}{key}\n" for key in keys)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_entries += len(keys)
+        if self._log_entries >= C.OPTOUT_COMPACT_THRESHOLD:
+            self._compact()
+        self._signature = self._file_signature()
+
+    def _compact(self):
+        """Regrava o índice ordenado e zera o log (escrita atômica)."""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        self._keys.astype("<u8").tofile(tmp_path)
+        os.replace(tmp_path, self.index_path)
+        open(self.log_path, "w").close()
+        self._log_entries = 0
+
+    def add(self, identifiers):
+        """Inclui destinatários na lista. Retorna quantos eram novos."""
+        with self._lock:
+            self._ensure_loaded()
+            keys = np.unique(
+                keys_for([i for i in identifiers if str(i).strip()]))
+            new_keys = keys[~self._contains_keys(keys)]
+            if len(new_keys):
+                self._keys = np.union1d(self._keys, new_keys)
+                self._append_log("+", new_keys.tolist())
+            return len(new_keys)
+
+    def remove(self, identifiers):
+        """Retira destinatários da lista. Retorna quantos foram removidos."""
+        with self._lock:
+            self._ensure_loaded()
+            keys = np.unique(
+                keys_for([i for i in identifiers if str(i).strip()]))
+            existing = keys[self._contains_keys(keys)]
+            if len(existing):
+                self._keys = np.setdiff1d(self._keys, existing)
+                self._append_log("-", existing.tolist())
+            return len(existing)
+
+    def _contains_keys(self, keys):
+        if not len(self._keys):
+            return np.zeros(len(keys), dtype=bool)
+        positions = np.searchsorted(self._keys, keys)
+        positions[positions == len(self._keys)] = 0
+        return self._keys[positions] == keys
+
+    def contains_many(self, identifiers, normalized=False):
+        """Retorna uma máscara indicando quais destinatários estão na lista."""
+        keys = keys_for(identifiers, normalized)
+        with self._lock:
+            self._ensure_loaded()
+            return self._contains_keys(keys)
+
+    def __contains__(self, identifier):
+        return bool(self.contains_many([identifier])[0])
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._keys)
+
+    def filter(self, contacts, on_excluded=None):
+        """Repassa apenas os contatos fora da lista, verificando-os em blocos."""
+        chunk = []
+        try:
+            for contact in contacts:
+                chunk.append(contact)
+                if len(chunk) >= C.CONTACT_LOAD_BATCH_SIZE:
+                    yield from self._filter_chunk(chunk, on_excluded)
+                    chunk = []
+            if chunk:
+                yield from self._filter_chunk(chunk, on_excluded)
+        finally:
+            if hasattr(contacts, "close"):
+                contacts.close()
+
+    def _filter_chunk(self, chunk, on_excluded):
+        # Números inválidos seguem adiante sem consulta: a rejeição (e o
+        # registro no relatório) fica com a validação do pré-envio.
+        checked = [i for i, c in enumerate(chunk) if c.reason == C.PhoneIssue.OK]
+        excluded = np.zeros(len(chunk), dtype=bool)
+        if checked:
+            excluded[checked] = self.contains_many(
+                [chunk[i].identifier for i in checked], normalized=True)
+        for contact, is_excluded in zip(chunk, excluded):
+            if not is_excluded:
+                yield contact
+            elif on_excluded:
+                on_excluded(contact)
@@ -0,0 +1,105 @@
+# phone_utils.py
+# Normalização e validação de números de telefone em lote.
+# Uma coluna inteira é tratada de uma só vez com operações vetorizadas do
+# NumPy: os caracteres são vistos como uma matriz de códigos Unicode, o que
+# evita um re.sub e várias verificações de string por contato.
+
+from typing import NamedTuple
+
+import numpy as np
+
+import constants as C
+
+_ZERO = ord("0")
+_NINE = ord("9")
+_COUNTRY_CODE = np.array([ord(ch) for ch in C.PHONE_COUNTRY_CODE], dtype=np.uint32)
+_CC_LEN = len(C.PHONE_COUNTRY_CODE)
+
+# Tabela de consulta: _DDD_TABLE[ddd] é True para os DDDs existentes.
+_DDD_TABLE = np.zeros(100, dtype=bool)
+_DDD_TABLE[list(C.VALID_DDDS)] = True
+
+
+class PhoneBatch(NamedTuple):
+    """Resultado da normalização de uma coluna de números."""
+    numbers: list        # Números normalizados (com código do país)
+    reasons: np.ndarray  # Um C.PhoneIssue por número (0 = válido)
+    duplicates: np.ndarray  # True para repetições de um número já visto no lote
+
+
+def _as_text(value):
+    """Converte o valor bruto (texto, inteiro ou float do Excel) em texto."""
+    if not value:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def normalize_phones(values):
+    """
+    Normaliza e valida uma sequência de números em uma única passada.
+    Mantém a regra histórica de formatação: apenas dígitos, prefixados com
+    C.PHONE_COUNTRY_CODE quando ainda não o possuem.
+    """
+    texts = np.array([_as_text(v) for v in values], dtype=str)
+    count = len(texts)
+    if count == 0:
+        return PhoneBatch([], np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=bool))
+    width = max(texts.dtype.itemsize // 4, 1)
+    codes = np.zeros((count, width), dtype=np.uint32)
+    if texts.dtype.itemsize:
+        codes[:] = texts.view(np.uint32).reshape(count, width)
+
+    # Compacta os dígitos à esquerda de cada linha, descartando o resto.
+    is_digit = (codes >= _ZERO) & (codes <= _NINE)
+    rows, cols = np.nonzero(is_digit)
+    positions = np.cumsum(is_digit, axis=1)[rows, cols] - 1
+    digits = np.zeros_like(codes)
+    digits[rows, positions] = codes[rows, cols]
+    lengths = is_digit.sum(axis=1)
+
+    has_cc = (lengths > 11) & np.all(digits[:, :_CC_LEN] == _COUNTRY_CODE, axis=1) \
+        if width >= _CC_LEN else np.zeros(count, dtype=bool)
+    needs_cc = ~has_cc & (lengths > 0)
+    normalized = np.zeros((count, width + _CC_LEN), dtype=np.uint32)
+    normalized[has_cc, :width] = digits[has_cc]
+    normalized[needs_cc, :_CC_LEN] = _COUNTRY_CODE
+    normalized[needs_cc, _CC_LEN:] = digits[needs_cc]
+    total_lengths = lengths + np.where(needs_cc, _CC_LEN, 0)
+
+    # Validação da parte nacional: DDD (2 dígitos) + número.
+    national = normalized[:, _CC_LEN:].astype(np.int64) - _ZERO
+    if national.shape[1] < 3:
+        national = np.pad(national, ((0, 0), (0, 3 - national.shape[1])))
+    national_len = total_lengths - _CC_LEN
+    ddd = np.clip(national[:, 0] * 10 + national[:, 1], 0, 99)
+    first = national[:, 2]
+    is_mobile = national_len == 2 + C.MOBILE_NUMBER_LENGTH
+    is_landline = national_len == 2 + C.LANDLINE_NUMBER_LENGTH
+
+    # A ordem das regras define a prioridade: a última aplicada prevalece.
+    reasons = np.full(count, C.PhoneIssue.OK, dtype=np.uint8)
+    reasons[is_landline & (first >= 6)] = C.PhoneIssue.MISSING_NINTH
+    reasons[is_landline & (first < 2)] = C.PhoneIssue.INVALID_LANDLINE
+    reasons[is_mobile & (first != 9)] = C.PhoneIssue.INVALID_MOBILE
+    reasons[~_DDD_TABLE[ddd]] = C.PhoneIssue.INVALID_DDD
+    reasons[~(is_mobile | is_landline)] = C.PhoneIssue.INVALID_LENGTH
+    reasons[lengths == 0] = C.PhoneIssue.EMPTY
+
+    numbers = normalized.view(f"<U{width + _CC_LEN}").ravel()
+    duplicates = np.ones(count, dtype=bool)
+    duplicates[np.unique(numbers, return_index=True)[1]] = False
+    duplicates[lengths == 0] = False
+    return PhoneBatch(numbers.tolist(), reasons, duplicates)
+
+
+def normalize_phone(phone):
+    """Normaliza um único número (atalho para normalize_phones)."""
+    return normalize_phones([phone]).numbers[0]
+
+
+def validate_phone(phone):
+    """Retorna o número normalizado e o C.PhoneIssue correspondente."""
+    batch = normalize_phones([phone])
+    return batch.numbers[0], C.PhoneIssue(int(batch.reasons[0]))
@@ -0,0 +1,67 @@
+# preflight.py
+# Pré-validação offline dos destinatários, executada antes de o navegador
+# ser usado. Números inválidos, repetidos ou que já falharam em campanhas
+# recentes são separados em um arquivo de rejeitados, evitando a espera de
+# vários segundos por contato inválido no WhatsApp Web.
+
+from datetime import datetime
+
+import constants as C
+
+
+class Preflight:
+    """
+    Filtro em fluxo dos contatos de uma campanha. Os rejeitados são gravados
+    em 'Rejeitados_<data>.txt' no diretório de relatórios (o arquivo só é
+    criado se houver rejeição).
+    """
+
+    def __init__(self, reports_dir, source_type, started_at, known_failures=()):
+        self.rejected_path = reports_dir / \
+            f"{C.REJECTED_FILE_PREFIX}{started_at.strftime('%Y-%m-%d_%H-%M-%S')}.txt"
+        self.check_phone = source_type != C.SourceType.GROUP_LIST
+        self.known_failures = known_failures
+        self.accepted = 0
+        self.rejected = 0
+        self._seen = set()
+        self._rejected_file = None
+
+    def _reject(self, contact, reason):
+        self.rejected += 1
+        if self._rejected_file is None:
+            self._rejected_file = open(
+                self.rejected_path, "w", encoding="utf-8")
+            self._rejected_file.write(
+                f"{C.REJECTED_TITLE}\nGerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n")
+        self._rejected_file.write(
+            f"Linha: {contact.row}\tDestinatário: {contact.identifier}\tMotivo: {reason}\n")
+
+    def _rejection_reason(self, contact):
+        if self.check_phone and contact.reason != C.PhoneIssue.OK:
+            return C.PHONE_ISSUE_MESSAGES[C.PhoneIssue(contact.reason)]
+        if contact.identifier in self._seen:
+            return "Destinatário repetido na lista."
+        if contact.identifier in self.known_failures:
+            return "Recusado pelo WhatsApp como inválido em uma campanha recente."
+        return None
+
+    def filter(self, contacts):
+        """Repassa apenas os contatos aprovados, registrando os demais."""
+        try:
+            for contact in contacts:
+                reason = self._rejection_reason(contact)
+                if reason:
+                    self._reject(contact, reason)
+                    continue
+                self._seen.add(contact.identifier)
+                self.accepted += 1
+                yield contact
+        finally:
+            if hasattr(contacts, "close"):
+                contacts.close()
+            self.close()
+
+    def close(self):
+        if self._rejected_file:
+            self._rejected_file.close()
+            self._rejected_file = None
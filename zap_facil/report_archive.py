@@ -0,0 +1,132 @@
+# report_archive.py
+# Retenção dos relatórios .txt.
+# Relatórios mais antigos que o prazo de retenção saem da pasta de
+# relatórios e vão para arquivos mensais compactados (um membro gzip por
+# relatório, concatenados). A posição de cada membro fica registrada no
+# banco de relatórios, o que permite abrir um relatório arquivado sem
+# descompactar o mês inteiro. Os resultados continuam pesquisáveis pelo
+# banco, que já os indexou antes do arquivamento.
+
+import os
+import gzip
+import time
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import constants as C
+import config_manager
+
+_REPORT_PREFIXES = (C.REPORT_FILE_PREFIX, C.REJECTED_FILE_PREFIX)
+
+
+class _MemberReader:
+    """Leitura limitada a um único membro dentro do arquivo mensal."""
+
+    def __init__(self, archive, length):
+        self._archive = archive
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._archive.read(size)
+        self._remaining -= len(data)
+        return data
+
+
+def _archive_name(mtime):
+    return f"{C.REPORT_ARCHIVE_PREFIX}{datetime.fromtimestamp(mtime).strftime('%Y-%m')}.gz"
+
+
+def archive_old_reports(store, reports_dir, max_age_days):
+    """
+    Move para os arquivos mensais os relatórios modificados há mais de
+    'max_age_days' dias. Retorna quantos relatórios foram arquivados.
+    """
+    if not reports_dir.exists():
+        return 0
+    archive_dir = reports_dir / C.REPORT_ARCHIVE_SUBDIR
+    oldest = time.time() - max_age_days * 86400
+    archived = 0
+    for entry in sorted(os.scandir(reports_dir), key=lambda e: e.name):
+        if not (entry.is_file() and entry.name.startswith(_REPORT_PREFIXES) and entry.name.endswith(".txt")):
+            continue
+        stat = entry.stat()
+        if stat.st_mtime >= oldest:
+            continue
+        archive_dir.mkdir(exist_ok=True)
+        archive_name = _archive_name(stat.st_mtime)
+        # O membro é gravado e sincronizado antes de o original ser removido;
+        # uma queda no meio do caminho deixa no máximo bytes sem uso no arquivo.
+        with open(archive_dir / archive_name, "ab") as archive:
+            offset = archive.seek(0, os.SEEK_END)
+            with open(entry.path, "rb") as f, gzip.GzipFile(
+                    filename="", mode="wb", fileobj=archive, mtime=int(stat.st_mtime)) as member:
+                shutil.copyfileobj(f, member)
+            length = archive.tell() - offset
+            archive.flush()
+            os.fsync(archive.fileno())
+        store.mark_archived(entry.name, archive_name, offset, length)
+        os.remove(entry.path)
+        archived += 1
+    return archived
+
+
+def read_archived(store, reports_dir, name, destination):
+    """
+    Descompacta um relatório arquivado para o arquivo binário 'destination',
+    em blocos, sem carregar o relatório na memória. Retorna False se ele não
+    estiver arquivado.
+    """
+    entry = store.archive_entry(name)
+    if entry is None:
+        return False
+    archive_name, offset, length = entry
+    with open(reports_dir / C.REPORT_ARCHIVE_SUBDIR / archive_name, "rb") as archive:
+        archive.seek(offset)
+        with gzip.GzipFile(fileobj=_MemberReader(archive, length), mode="rb") as member:
+            shutil.copyfileobj(member, destination)
+    return True
+
+
+def extract_to_temp(store, reports_dir, name):
+    """Descompacta um relatório arquivado para um arquivo temporário e retorna o caminho."""
+    if store.archive_entry(name) is None:
+        return None
+    fd, path = tempfile.mkstemp(
+        prefix=C.REPORT_TEMP_PREFIX, suffix=".txt")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            read_archived(store, reports_dir, name, f)
+    except Exception:
+        os.remove(path)
+        raise
+    return Path(path)
+
+
+def clean_temp_artifacts(max_age_hours=C.TEMP_ARTIFACT_MAX_AGE_HOURS):
+    """
+    Remove sobras de gravações interrompidas (arquivos .tmp do cache e da
+    lista de exclusão) e relatórios extraídos para visualização.
+    Retorna quantos arquivos foram removidos.
+    """
+    oldest = time.time() - max_age_hours * 3600
+    candidates = []
+    cache_dir = config_manager.CONFIG_DIR / C.CONTACT_CACHE_SUBDIR
+    if cache_dir.exists():
+        candidates.extend(cache_dir.glob("*.tmp"))
+    if config_manager.CONFIG_DIR.exists():
+        candidates.extend(config_manager.CONFIG_DIR.glob("*.tmp"))
+    candidates.extend(Path(tempfile.gettempdir()).glob(
+        f"{C.REPORT_TEMP_PREFIX}*.txt"))
+    removed = 0
+    for path in candidates:
+        try:
+            if path.stat().st_mtime < oldest:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
@@ -0,0 +1,480 @@
+# report_store.py
+# Armazenamento estruturado dos resultados das campanhas (SQLite).
+# Uma tabela de campanhas, indexada pela data, e uma tabela com uma linha por
+# destinatário. A janela de relatórios consulta apenas a página visível, de
+# modo que um histórico com milhares de campanhas abre instantaneamente.
+# O relatório .txt tradicional passa a ser uma exportação opcional.
+# Os arquivos .txt do diretório de relatórios são indexados de forma
+# incremental (apenas os novos ou alterados), o que permite localizar em
+# milissegundos todas as campanhas em que um destinatário apareceu.
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import constants as C
+import config_manager
+import report_writer
+import analytics
+
+DB_PATH = config_manager.CONFIG_DIR / C.REPORTS_DB_FILENAME
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    campaign_key TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    source_type TEXT,
+    source_path TEXT,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    fail INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    report_file TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_started ON campaigns (started_at);
+CREATE INDEX IF NOT EXISTS idx_campaigns_report_file ON campaigns (report_file);
+CREATE TABLE IF NOT EXISTS recipients (
+    campaign_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    identifier TEXT NOT NULL,
+    name TEXT,
+    source_row INTEGER,
+    status TEXT NOT NULL,
+    reason TEXT,
+    processed_at REAL,
+    duration_ms INTEGER,
+    PRIMARY KEY (campaign_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_recipients_identifier ON recipients (identifier COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_recipients_status ON recipients (campaign_id, status);
+CREATE INDEX IF NOT EXISTS idx_recipients_row ON recipients (campaign_id, source_row, seq);
+CREATE TABLE IF NOT EXISTS report_files (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    campaign_id INTEGER,
+    imported INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_archive (
+    name TEXT PRIMARY KEY,
+    archive TEXT NOT NULL,
+    member_offset INTEGER NOT NULL,
+    member_length INTEGER NOT NULL
+);
+"""
+
+# Versão do banco a partir da qual os rollups de analytics são mantidos.
+_ANALYTICS_VERSION = 1
+
+_CAMPAIGN_COLUMNS = "id, campaign_key, started_at, finished_at, source_type, source_path, status, total, success, fail, rejected, report_file"
+_RECIPIENT_COLUMNS = "seq, identifier, name, source_row, status, reason, processed_at, duration_ms"
+
+
+class ReportStore:
+    """Acesso ao banco de relatórios; uma conexão compartilhada, protegida por lock."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.RLock()
+        self._pending = {}
+
+    def _connection(self):
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.db_path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.executescript(analytics.SCHEMA)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < _ANALYTICS_VERSION:
+                with self._conn:
+                    analytics.backfill(self._conn)
+                    self._conn.execute(
+                        f"PRAGMA user_version = {_ANALYTICS_VERSION}")
+            self._close_leftover_campaigns()
+        return self._conn
+
+    def _close_leftover_campaigns(self):
+        """
+        Campanhas que ficaram "em andamento" são de uma execução que caiu
+        antes de finalizá-las; passam a interrompidas, com os totais tirados
+        dos destinatários já gravados.
+        """
+        conn = self._conn
+        with conn:
+            leftover = conn.execute(
+                "SELECT id FROM campaigns WHERE status = ?", (C.CAMPAIGN_STATUS_RUNNING,)).fetchall()
+            for (campaign_id,) in leftover:
+                conn.execute(
+                    "UPDATE campaigns SET status = ?, "
+                    "finished_at = COALESCE((SELECT MAX(processed_at) FROM recipients WHERE campaign_id = campaigns.id), started_at), "
+                    "total = (SELECT COUNT(*) FROM recipients WHERE campaign_id = campaigns.id), "
+                    "success = (SELECT COUNT(*) FROM recipients WHERE campaign_id = campaigns.id AND status != ?), "
+                    "fail = (SELECT COUNT(*) FROM recipients WHERE campaign_id = campaigns.id AND status = ?) "
+                    "WHERE id = ?",
+                    (C.CAMPAIGN_STATUS_INTERRUPTED, C.STATUS_FAILURE, C.STATUS_FAILURE, campaign_id))
+                analytics.apply_campaign(conn, campaign_id)
+
+    # --- GRAVAÇÃO ---
+
+    def start_campaign(self, campaign_key, started_at, source_type, source_path, report_file):
+        """Registra o início de uma campanha e retorna o seu id."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO campaigns (campaign_key, started_at, source_type, source_path, status, report_file) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (campaign_key, started_at.timestamp(), source_type, source_path,
+                     C.CAMPAIGN_STATUS_RUNNING, report_file))
+            self._pending[cursor.lastrowid] = []
+            return cursor.lastrowid
+
+    def resume_campaign(self, campaign_id):
+        """
+        Reabre uma campanha interrompida para continuar gravando nela.
+        Retorna False se ela não existe mais (por exemplo, foi excluída).
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                row = conn.execute(
+                    "SELECT status FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+                if row is None:
+                    return False
+                # Os rollups voltam a receber a campanha inteira no fechamento.
+                if row[0] != C.CAMPAIGN_STATUS_RUNNING:
+                    analytics.apply_campaign(conn, campaign_id, sign=-1)
+                conn.execute(
+                    "UPDATE campaigns SET status = ?, finished_at = NULL WHERE id = ?",
+                    (C.CAMPAIGN_STATUS_RUNNING, campaign_id))
+            self._pending.setdefault(campaign_id, [])
+            return True
+
+    def add_recipient(self, campaign_id, seq, contact, status, reason="", processed_at=None, duration_ms=None):
+        """Acrescenta o resultado de um destinatário (gravado em lotes)."""
+        processed_at = (processed_at or datetime.now()).timestamp()
+        with self._lock:
+            pending = self._pending.setdefault(campaign_id, [])
+            pending.append((campaign_id, seq, contact.identifier, contact.name, contact.row,
+                            status, reason, processed_at, duration_ms))
+            if len(pending) >= C.REPORTS_DB_BATCH_SIZE:
+                self._flush(campaign_id)
+
+    def _flush(self, campaign_id):
+        pending = self._pending.get(campaign_id)
+        if not pending:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO recipients (campaign_id, {_RECIPIENT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", pending)
+        pending.clear()
+
+    def finish_campaign(self, campaign_id, finished_at, status, total, success, fail, rejected):
+        """Grava os totais e o estado final de uma campanha."""
+        with self._lock:
+            self._flush(campaign_id)
+            self._pending.pop(campaign_id, None)
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "UPDATE campaigns SET finished_at = ?, status = ?, total = ?, success = ?, fail = ?, rejected = ? WHERE id = ?",
+                    (finished_at.timestamp(), status, total, success, fail, rejected, campaign_id))
+                analytics.apply_campaign(conn, campaign_id)
+
+    def delete_campaign(self, campaign_id):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                status = conn.execute(
+                    "SELECT status FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+                if status and status[0] != C.CAMPAIGN_STATUS_RUNNING:
+                    analytics.apply_campaign(conn, campaign_id, sign=-1)
+                conn.execute(
+                    "DELETE FROM report_archive WHERE name = (SELECT report_file FROM campaigns WHERE id = ?)", (campaign_id,))
+                conn.execute(
+                    "DELETE FROM report_files WHERE campaign_id = ?", (campaign_id,))
+                conn.execute(
+                    "DELETE FROM recipients WHERE campaign_id = ?", (campaign_id,))
+                conn.execute("DELETE FROM campaigns WHERE id = ?",
+                             (campaign_id,))
+
+    # --- CONSULTA ---
+
+    def count_campaigns(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM campaigns").fetchone()[0]
+
+    def list_campaigns(self, offset=0, limit=C.REPORTS_PAGE_SIZE):
+        """Campanhas da mais recente para a mais antiga, uma página por vez."""
+        with self._lock:
+            return self._connection().execute(
+                f"SELECT {_CAMPAIGN_COLUMNS} FROM campaigns ORDER BY started_at DESC, id DESC LIMIT ? OFFSET ?",
+                (limit, offset)).fetchall()
+
+    def get_campaign(self, campaign_id):
+        with self._lock:
+            return self._connection().execute(
+                f"SELECT {_CAMPAIGN_COLUMNS} FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+
+    def count_recipients(self, campaign_id):
+        with self._lock:
+            self._flush(campaign_id)
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM recipients WHERE campaign_id = ?", (campaign_id,)).fetchone()[0]
+
+    def get_recipients(self, campaign_id, offset=0, limit=C.REPORTS_PAGE_SIZE):
+        with self._lock:
+            self._flush(campaign_id)
+            return self._connection().execute(
+                f"SELECT {_RECIPIENT_COLUMNS} FROM recipients WHERE campaign_id = ? ORDER BY seq LIMIT ? OFFSET ?",
+                (campaign_id, limit, offset)).fetchall()
+
+    def iter_recipients(self, campaign_id):
+        """Percorre todos os destinatários de uma campanha em páginas."""
+        offset = 0
+        while True:
+            page = self.get_recipients(campaign_id, offset)
+            if not page:
+                return
+            yield from page
+            offset += len(page)
+
+    def iter_recipients_by_row(self, campaign_id):
+        """Percorre os destinatários na ordem das linhas da lista de origem."""
+        last = (-1, -1)
+        while True:
+            with self._lock:
+                self._flush(campaign_id)
+                page = self._connection().execute(
+                    f"SELECT {_RECIPIENT_COLUMNS} FROM recipients WHERE campaign_id = ? "
+                    "AND (source_row, seq) > (?, ?) ORDER BY source_row, seq LIMIT ?",
+                    (campaign_id, *last, C.REPORTS_PAGE_SIZE)).fetchall()
+            if not page:
+                return
+            yield from page
+            last = (page[-1]["source_row"], page[-1]["seq"])
+
+    def failed_identifiers(self, since):
+        """Destinatários que o WhatsApp recusou como número inválido desde 'since'."""
+        with self._lock:
+            return {row[0] for row in self._connection().execute(
+                "SELECT DISTINCT identifier FROM recipients WHERE status = ? AND reason = ? AND processed_at >= ?",
+                (C.STATUS_FAILURE, C.REPORT_INVALID_NUMBER_REASON, since.timestamp()))}
+
+    def search_recipients(self, identifier, status=None, limit=C.REPORT_SEARCH_LIMIT):
+        """
+        Todas as passagens de um destinatário (telefone ou nome de grupo, sem
+        diferenciar maiúsculas) pelas campanhas, da mais recente para a mais antiga.
+        """
+        query = ("SELECT r.campaign_id, c.started_at, r.identifier, r.name, r.status, r.reason, r.processed_at "
+                 "FROM recipients r JOIN campaigns c ON c.id = r.campaign_id "
+                 "WHERE r.identifier = ? COLLATE NOCASE")
+        params = [identifier]
+        if status:
+            query += " AND r.status = ?"
+            params.append(status)
+        query += " ORDER BY r.processed_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            for campaign_id in list(self._pending):
+                self._flush(campaign_id)
+            return self._connection().execute(query, params).fetchall()
+
+    def analytics_summary(self, days=C.ANALYTICS_WINDOW_DAYS):
+        with self._lock:
+            return analytics.summary(self._connection(), days)
+
+    def recipient_stats(self, identifier):
+        with self._lock:
+            return analytics.recipient_stats(self._connection(), identifier)
+
+    def mark_archived(self, name, archive, offset, length):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO report_archive (name, archive, member_offset, member_length) VALUES (?, ?, ?, ?)",
+                             (name, archive, offset, length))
+
+    def archive_entry(self, name):
+        """(arquivo mensal, posição, tamanho) de um relatório arquivado, ou None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT archive, member_offset, member_length FROM report_archive WHERE name = ?", (name,)).fetchone()
+        return tuple(row) if row else None
+
+    def indexed_report_files(self):
+        """Arquivos .txt já indexados: nome -> (tamanho, mtime, id da campanha, importado)."""
+        with self._lock:
+            return {row[0]: tuple(row[1:]) for row in self._connection().execute(
+                "SELECT name, size, mtime_ns, campaign_id, imported FROM report_files")}
+
+    def live_report_files(self):
+        """Arquivos .txt gravados pelas próprias campanhas: nome -> id da campanha."""
+        with self._lock:
+            return {row[0]: row[1] for row in self._connection().execute(
+                "SELECT report_file, id FROM campaigns WHERE report_file IS NOT NULL")}
+
+    def mark_report_file(self, name, size, mtime_ns, campaign_id, imported):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO report_files (name, size, mtime_ns, campaign_id, imported) "
+                             "VALUES (?, ?, ?, ?, ?)", (name, size, mtime_ns, campaign_id, int(imported)))
+
+    def close(self):
+        with self._lock:
+            for campaign_id in list(self._pending):
+                self._flush(campaign_id)
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# --- RELATÓRIOS .TXT ---
+
+_DATE_PATTERN = re.compile(r"(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})")
+_COUNT_FIELDS = {"Total": "total", "Sucessos": "success",
+                 "Falhas": "fail", "Rejeitados na pré-validação": "rejected"}
+
+
+def parse_detail_line(line):
+    """
+    Interpreta uma linha 'Destinatário: X\\tStatus: S\\tMotivo: M' do relatório.
+    Retorna (identificador, status, motivo) ou None.
+    """
+    if not line.startswith("Destinatário: "):
+        return None
+    parts = line.rstrip("\n").split("\t")
+    identifier = parts[0][len("Destinatário: "):]
+    status, reason = "", ""
+    for part in parts[1:]:
+        if part.startswith("Status: "):
+            status = part[len("Status: "):]
+        elif part.startswith("Motivo: "):
+            reason = part[len("Motivo: "):]
+    if status.startswith(C.STATUS_PARTIAL):
+        reason = reason or status[len(C.STATUS_PARTIAL):].strip(" ()")
+        status = C.STATUS_PARTIAL
+    return identifier, status, reason
+
+
+def format_detail_line(identifier, status, reason=""):
+    """Monta a linha de detalhe no formato do relatório .txt."""
+    if status == C.STATUS_PARTIAL:
+        return f"Destinatário: {identifier}\tStatus: {status} ({reason or C.PARTIAL_REASON})"
+    if reason:
+        return f"Destinatário: {identifier}\tStatus: {status}\tMotivo: {reason}"
+    return f"Destinatário: {identifier}\tStatus: {status}"
+
+
+def export_txt(store, campaign_id, path):
+    """Gera o relatório .txt de uma campanha a partir do banco."""
+    campaign = store.get_campaign(campaign_id)
+    report = report_writer.CampaignReport(
+        path, datetime.fromtimestamp(campaign["started_at"]))
+    for recipient in store.iter_recipients(campaign_id):
+        report.write(format_detail_line(
+            recipient["identifier"], recipient["status"], recipient["reason"]))
+    if campaign["status"] == C.CAMPAIGN_STATUS_INTERRUPTED:
+        report.write("\nCampanha interrompida.")
+    elif campaign["status"] == C.CAMPAIGN_STATUS_ABORTED:
+        report.write("\nCampanha abortada por falha de conexão.")
+    report.close(datetime.fromtimestamp(campaign["finished_at"] or campaign["started_at"]),
+                 campaign["total"], campaign["success"], campaign["fail"], campaign["rejected"])
+
+
+def import_report_file(store, path):
+    """Importa um relatório .txt (formato legado) para o banco, em fluxo."""
+    from contact_loader import Contact
+    started_at, finished_at, counts = None, None, {}
+    campaign_id, seq = None, 0
+    status = C.CAMPAIGN_STATUS_COMPLETED
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if campaign_id is None:
+                if line.startswith(("Início:", "Fim:")):
+                    match = _DATE_PATTERN.search(line)
+                    value = datetime.strptime(
+                        match.group(1), "%d/%m/%Y %H:%M:%S") if match else None
+                    if line.startswith("Início:"):
+                        started_at = value
+                    else:
+                        finished_at = value
+                elif line.strip().startswith("- "):
+                    label, _, value = line.strip()[2:].partition(":")
+                    if label in _COUNT_FIELDS and value.strip().isdigit():
+                        counts[_COUNT_FIELDS[label]] = int(value)
+                elif line.startswith(C.REPORT_DETAILS_HEADER):
+                    started_at = started_at or datetime.fromtimestamp(
+                        path.stat().st_mtime)
+                    campaign_id = store.start_campaign(
+                        started_at.strftime("%Y-%m-%d_%H-%M-%S"), started_at, None, None, path.name)
+                continue
+            parsed = parse_detail_line(line)
+            if parsed:
+                seq += 1
+                identifier, recipient_status, reason = parsed
+                store.add_recipient(campaign_id, seq, Contact(identifier), recipient_status, reason,
+                                    processed_at=finished_at or started_at)
+            elif line.startswith("Campanha interrompida"):
+                status = C.CAMPAIGN_STATUS_INTERRUPTED
+            elif line.startswith("Campanha abortada"):
+                status = C.CAMPAIGN_STATUS_ABORTED
+    if campaign_id is None:
+        return None
+    if finished_at is None:
+        status = C.CAMPAIGN_STATUS_INTERRUPTED
+    store.finish_campaign(campaign_id, finished_at or started_at, status,
+                          counts.get("total", seq), counts.get("success", 0),
+                          counts.get("fail", 0), counts.get("rejected", 0))
+    return campaign_id
+
+
+_sync_lock = threading.Lock()
+
+
+def sync_reports_dir(store, reports_dir):
+    """
+    Indexa os relatórios .txt novos ou alterados desde a última passagem
+    (comparando tamanho e mtime). Retorna quantos arquivos foram importados.
+    """
+    if not reports_dir.exists():
+        return 0
+    imported = 0
+    with _sync_lock:
+        indexed = store.indexed_report_files()
+        live = store.live_report_files()
+        for entry in os.scandir(reports_dir):
+            if not (entry.name.startswith(C.REPORT_FILE_PREFIX) and entry.name.endswith(".txt")):
+                continue
+            stat = entry.stat()
+            known = indexed.get(entry.name)
+            if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+                continue
+            # Relatórios gravados por uma campanha já têm os resultados no banco.
+            if (known and not known[3]) or (not known and entry.name in live):
+                campaign_id = known[2] if known else live[entry.name]
+                store.mark_report_file(
+                    entry.name, stat.st_size, stat.st_mtime_ns, campaign_id, False)
+                continue
+            if known and known[2] is not None:
+                store.delete_campaign(known[2])
+            try:
+                campaign_id = import_report_file(store, Path(entry.path))
+            except (OSError, UnicodeDecodeError, ValueError):
+                campaign_id = None
+            store.mark_report_file(
+                entry.name, stat.st_size, stat.st_mtime_ns, campaign_id, True)
+            if campaign_id is not None:
+                imported += 1
+    return imported
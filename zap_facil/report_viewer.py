@@ -0,0 +1,85 @@
+# report_viewer.py
+# Leitura sob demanda dos relatórios .txt.
+# O arquivo é mapeado em memória (mmap) e um índice com o início de cada
+# linha é montado uma única vez; a interface pede apenas as linhas visíveis.
+# O filtro por status procura o marcador diretamente nos bytes mapeados,
+# sem carregar o relatório inteiro como texto.
+
+import os
+import mmap
+
+import numpy as np
+
+import constants as C
+
+_INDEX_CHUNK = 16 * 1024 * 1024  # Bytes examinados por vez ao indexar as quebras de linha
+
+
+class ReportFile:
+    """Relatório .txt aberto para leitura aleatória por número de linha."""
+
+    def __init__(self, path, temporary=False):
+        self.path = path
+        self.temporary = temporary
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_READ) if size else None
+        self._starts = self._index_lines(size)
+        self._size = size
+
+    def _index_lines(self, size):
+        if not size:
+            return np.zeros(0, dtype=np.int64)
+        starts = [np.zeros(1, dtype=np.int64)]
+        for offset in range(0, size, _INDEX_CHUNK):
+            count = min(_INDEX_CHUNK, size - offset)
+            chunk = np.frombuffer(self._map, dtype=np.uint8,
+                                  count=count, offset=offset)
+            starts.append(np.flatnonzero(chunk == 10) + offset + 1)
+            del chunk  # Libera a referência ao mmap antes de um eventual close().
+        starts = np.concatenate(starts)
+        # Uma quebra no último byte não inicia uma nova linha.
+        return starts[starts < size]
+
+    def __len__(self):
+        return len(self._starts)
+
+    def line(self, index):
+        start = int(self._starts[index])
+        end = int(self._starts[index + 1]) - \
+            1 if index + 1 < len(self._starts) else self._size
+        return self._map[start:end].rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+    def lines(self, offset, limit, selection=None):
+        """Linhas [offset, offset + limit) do arquivo ou da seleção informada."""
+        indexes = range(len(self))[offset:offset + limit] if selection is None \
+            else selection[offset:offset + limit]
+        return [self.line(int(index)) for index in indexes]
+
+    def find_status(self, status):
+        """Índices das linhas de detalhe com o status informado."""
+        if self._map is None:
+            return np.zeros(0, dtype=np.int64)
+        marker = f"\tStatus: {status}".encode("utf-8")
+        positions = []
+        position = self._map.find(marker)
+        while position != -1:
+            # "SUCESSO" também aparece dentro de "SUCESSO PARCIAL"; exige o fim do campo.
+            following = self._map[position + len(marker):position + len(marker) + 1]
+            if status != C.STATUS_SUCCESS or following in (b"", b"\t", b"\r", b"\n"):
+                positions.append(position)
+            position = self._map.find(marker, position + len(marker))
+        return np.searchsorted(self._starts, np.array(positions, dtype=np.int64), side="right") - 1
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        # Relatórios extraídos de um arquivo mensal são descartados ao fechar.
+        if self.temporary:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
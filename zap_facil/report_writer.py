@@ -0,0 +1,91 @@
+# report_writer.py
+# Gravação incremental do relatório de campanha.
+# O arquivo é aberto no início da campanha e recebe uma linha por
+# destinatário, com descarga periódica para o disco; assim o relatório pode
+# ser lido enquanto a campanha roda e não se perde se ela for abortada.
+# O resumo do cabeçalho é reservado com largura fixa e preenchido no final.
+
+import time
+
+import constants as C
+
+_SEPARATOR = "=" * 50
+_PENDING = "em andamento"
+
+
+def _summary_lines(end_time, duration, total, success, fail, rejected):
+    """Linhas do resumo, com largura fixa para poderem ser regravadas no lugar."""
+    def field(value, width):
+        return str(value)[:width].ljust(width)
+    return [
+        f"Fim: {field(end_time, C.REPORT_DATE_WIDTH)}",
+        f"Duração: {field(duration, C.REPORT_DURATION_WIDTH)}",
+        "",
+        "Resumo:",
+        f"  - Total: {field(total, C.REPORT_COUNT_WIDTH)}",
+        f"  - Sucessos: {field(success, C.REPORT_COUNT_WIDTH)}",
+        f"  - Falhas: {field(fail, C.REPORT_COUNT_WIDTH)}",
+        f"  - Rejeitados na pré-validação: {field(rejected, C.REPORT_COUNT_WIDTH)}",
+    ]
+
+
+class CampaignReport:
+    """Relatório de campanha gravado em fluxo, com cabeçalho atualizado no fechamento."""
+
+    def __init__(self, path, start_time, resume=False):
+        # resume=True reabre o relatório de uma campanha interrompida e
+        # continua o detalhamento no final do arquivo.
+        self.path = path
+        self.start_time = start_time
+        self._pending_lines = 0
+        self._last_flush = time.monotonic()
+        title = (f"{_SEPARATOR}\n{C.REPORT_TITLE}\n{_SEPARATOR}\n\n"
+                 f"Início: {start_time.strftime('%d/%m/%Y %H:%M:%S')}\n")
+        if resume:
+            self._file = open(path, "r+b")
+            self._summary_offset = len(title.encode("utf-8"))
+            self._file.seek(0, 2)
+            return
+        self._file = open(path, "w+b")
+        self._write_text(title)
+        self._summary_offset = self._file.tell()
+        self._write_text("\n".join(_summary_lines(
+            _PENDING, _PENDING, 0, 0, 0, 0)) + "\n\n")
+        self._write_text(
+            f"{_SEPARATOR}\n{C.REPORT_DETAILS_HEADER}\n{_SEPARATOR}\n\n")
+        self._file.flush()
+
+    def _write_text(self, text):
+        self._file.write(text.encode("utf-8"))
+
+    def write(self, line):
+        """Acrescenta uma linha ao detalhamento."""
+        self._write_text(f"{line}\n")
+        self._pending_lines += 1
+        if (self._pending_lines >= C.REPORT_FLUSH_EVERY
+                or time.monotonic() - self._last_flush >= C.REPORT_FLUSH_SECONDS):
+            self.flush()
+
+    def write_section(self, title, lines):
+        """Acrescenta, após o detalhamento, uma seção com título e linhas."""
+        self._write_text(f"\n{_SEPARATOR}\n{title}\n{_SEPARATOR}\n\n")
+        self._write_text("".join(f"{line}\n" for line in lines))
+        self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._pending_lines = 0
+        self._last_flush = time.monotonic()
+
+    def close(self, end_time, total, success, fail, rejected):
+        """Preenche o resumo do cabeçalho e fecha o arquivo."""
+        if self._file.closed:
+            return
+        self._file.flush()
+        end_offset = self._file.seek(0, 2)
+        self._file.seek(self._summary_offset)
+        self._write_text("\n".join(_summary_lines(
+            end_time.strftime('%d/%m/%Y %H:%M:%S'), end_time - self.start_time,
+            total, success, fail, rejected)))
+        self._file.seek(end_offset)
+        self._file.close()
@@ -0,0 +1,133 @@
+# result_export.py
+# Exportação dos resultados de uma campanha para planilha (.xlsx) ou .csv,
+# ligados às linhas da lista original (por exemplo, o arquivo de cobrança).
+# A lista de origem e os resultados do banco são percorridos juntos, ambos
+# em ordem de linha (merge join), e gravados em fluxo; o consumo de memória
+# não depende do tamanho da campanha.
+
+import csv
+from datetime import datetime
+from pathlib import Path
+
+import constants as C
+
+_RESULT_HEADERS = ["Status", "Motivo", "Processado em"]
+
+
+def _format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M:%S") if timestamp else ""
+
+
+def _result_cells(recipient):
+    if recipient is None:
+        return [C.EXPORT_NOT_PROCESSED, "", ""]
+    return [recipient["status"], recipient["reason"] or "", _format_time(recipient["processed_at"])]
+
+
+class _CsvSink:
+    def __init__(self, path):
+        # utf-8-sig e ';' para o Excel em português abrir o arquivo corretamente.
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file, delimiter=";")
+
+    def append(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class _XlsxSink:
+    def __init__(self, path):
+        import openpyxl
+        self.path = path
+        # write_only=True grava as linhas em fluxo, sem manter a planilha na memória.
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(C.EXPORT_SHEET_TITLE)
+
+    def append(self, row):
+        self._sheet.append(row)
+
+    def close(self):
+        self._workbook.save(self.path)
+        self._workbook.close()
+
+
+def _iter_source_rows(source_path):
+    """Linhas da lista original como (número da linha, valores), começando em 1."""
+    suffix = Path(source_path).suffix.lower()
+    if suffix == ".txt":
+        with open(source_path, "r", encoding="utf-8-sig") as f:
+            for row, line in enumerate(f, start=1):
+                yield row, [line.rstrip("\r\n")]
+    elif suffix == ".xlsx":
+        import openpyxl
+        workbook = openpyxl.load_workbook(
+            source_path, read_only=True, data_only=True)
+        try:
+            for row, values in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+                yield row, list(values)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Formato de lista não suportado: '{suffix}'.")
+
+
+def export_campaign(store, campaign_id, path):
+    """
+    Grava os resultados da campanha em 'path' (.xlsx ou .csv). Se a lista de
+    origem ainda existir, cada linha dela recebe as colunas de resultado;
+    caso contrário, são exportados apenas os destinatários processados.
+    Retorna o número de linhas de resultado gravadas.
+    """
+    path = Path(path)
+    campaign = store.get_campaign(campaign_id)
+    if campaign is None:
+        raise ValueError("Campanha não encontrada.")
+    sink = _XlsxSink(path) if path.suffix.lower() == ".xlsx" else _CsvSink(path)
+    try:
+        source_path = campaign["source_path"]
+        if source_path and Path(source_path).exists():
+            return _export_joined(store, campaign_id, source_path, sink)
+        return _export_recipients(store, campaign_id, sink)
+    finally:
+        sink.close()
+
+
+def _export_joined(store, campaign_id, source_path, sink):
+    recipients = store.iter_recipients_by_row(campaign_id)
+    current = next(recipients, None)
+    written = 0
+    width = 0
+    for row, values in _iter_source_rows(source_path):
+        width = max(width, len(values))
+        values = values + [None] * (width - len(values))
+        if row == 1 and _looks_like_header(values):
+            sink.append(values + _RESULT_HEADERS)
+            continue
+        # Avança os resultados até a linha atual (duas listas em ordem crescente).
+        while current is not None and current["source_row"] < row:
+            current = next(recipients, None)
+        match = None
+        while current is not None and current["source_row"] == row:
+            match = current
+            current = next(recipients, None)
+        sink.append(values + _result_cells(match))
+        written += 1
+    recipients.close()
+    return written
+
+
+def _looks_like_header(values):
+    headers = {str(v).strip().lower() for v in values if v is not None}
+    return bool(headers & set(C.PHONE_HEADERS + C.NAME_HEADERS + C.GROUP_HEADERS))
+
+
+def _export_recipients(store, campaign_id, sink):
+    sink.append(["Linha", "Destinatário", "Nome"] + _RESULT_HEADERS)
+    written = 0
+    for recipient in store.iter_recipients_by_row(campaign_id):
+        sink.append([recipient["source_row"], recipient["identifier"], recipient["name"] or ""]
+                    + _result_cells(recipient))
+        written += 1
+    return written
@@ -0,0 +1,131 @@
+# settings.py
+# Retrato tipado e imutável das configurações do config.ini.
+# Os textos do arquivo são convertidos e validados uma única vez; o mesmo
+# objeto é compartilhado (somente leitura) pelas threads da campanha, do
+# agendador e da interface, e só é reconstruído quando o config.ini muda.
+
+import threading
+from dataclasses import dataclass
+
+import constants as C
+import config_manager
+
+_WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _parse_bool(value, default):
+    if value is None:
+        return default
+    return str(value).strip().lower() in ("true", "1", "yes", "sim")
+
+
+def _parse_number(value, default, kind, minimum, maximum):
+    try:
+        number = kind(float(value))
+    except (TypeError, ValueError):
+        return default
+    return min(max(number, minimum), maximum)
+
+
+def _parse_time(value, default):
+    try:
+        hour, minute = map(int, str(value).split(":"))
+    except (TypeError, ValueError):
+        return default
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour, minute
+    return default
+
+
+def _parse_weekdays(value, default):
+    if not value:
+        return default
+    days = tuple(day for day in _WEEKDAYS if day in str(value).lower().split(","))
+    return days or default
+
+
+@dataclass(frozen=True, slots=True)
+class GeneralSettings:
+    start_on_boot: bool = False
+    disclaimer_accepted: bool = False
+    contact_cooldown_hours: float = 0.0
+    txt_reports: bool = True
+    skip_known_failures: bool = True
+    report_retention_days: int = C.REPORT_RETENTION_DAYS
+
+    @classmethod
+    def from_section(cls, section):
+        return cls(
+            start_on_boot=_parse_bool(section.get("start_on_boot"), False),
+            disclaimer_accepted=_parse_bool(
+                section.get("disclaimer_accepted"), False),
+            contact_cooldown_hours=_parse_number(
+                section.get("contact_cooldown_hours"), 0.0, float, 0, C.MAX_CONTACT_COOLDOWN_HOURS),
+            txt_reports=_parse_bool(section.get("txt_reports"), True),
+            skip_known_failures=_parse_bool(
+                section.get("skip_known_failures"), True),
+            report_retention_days=_parse_number(
+                section.get("report_retention_days"), C.REPORT_RETENTION_DAYS, int, 1, 3650),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ScheduleSettings:
+    enabled: bool = False
+    hour: int = 9
+    minute: int = 0
+    days_of_week: tuple = _WEEKDAYS[:5]
+    filepath: str = ""
+    message: str = C.DEFAULT_SCHEDULE_MSG
+    attachment: str = ""
+    cooldown_hours: float = 0.0
+    export_results: bool = True
+
+    @property
+    def days_text(self):
+        """Dias no formato aceito pelo CronTrigger (ex.: 'mon,tue,wed')."""
+        return ",".join(self.days_of_week)
+
+    @classmethod
+    def from_section(cls, section):
+        hour, minute = _parse_time(section.get("time"), (9, 0))
+        return cls(
+            enabled=_parse_bool(section.get("enabled"), False),
+            hour=hour,
+            minute=minute,
+            days_of_week=_parse_weekdays(
+                section.get("days_of_week"), _WEEKDAYS[:5]),
+            filepath=section.get("filepath", ""),
+            message=section.get("message", C.DEFAULT_SCHEDULE_MSG),
+            attachment=section.get("attachment", ""),
+            cooldown_hours=_parse_number(
+                section.get("cooldown_hours"), 0.0, float, 0, C.MAX_CONTACT_COOLDOWN_HOURS),
+            export_results=_parse_bool(section.get("export_results"), True),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    general: GeneralSettings
+    schedule: ScheduleSettings
+
+
+_lock = threading.Lock()
+_snapshot = None
+_snapshot_version = None
+
+
+def current():
+    """Retorna o retrato atual das configurações, reconstruído só se o config.ini mudou."""
+    global _snapshot, _snapshot_version
+    with _lock:
+        version = config_manager.get_config_version()
+        if _snapshot is None or version != _snapshot_version:
+            _snapshot = Settings(
+                general=GeneralSettings.from_section(
+                    config_manager.get_section("General")),
+                schedule=ScheduleSettings.from_section(
+                    config_manager.get_section("schedule_collection")),
+            )
+            _snapshot_version = version
+        return _snapshot
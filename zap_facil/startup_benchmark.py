@@ -0,0 +1,152 @@
+# startup_benchmark.py
+# Mede o custo da abertura do Zap Fácil e acusa regressões.
+#  - Importações: roda 'python -X importtime' sobre os módulos carregados
+#    antes da janela principal e monta um relatório com os mais caros.
+#    Falha se o total passar do limite ou se uma dependência pesada
+#    (Selenium, numpy, áudio, openpyxl, APScheduler...) voltar a ser
+#    importada na abertura.
+#  - Janela visível: abre o programa com C.STARTUP_PROBE_ENV definido e mede
+#    o tempo até a primeira janela aparecer.
+# Uso: python startup_benchmark.py [--rodadas 5] [--limite-importacao-ms 700]
+#                                  [--limite-janela-ms 3000] [--sem-janela]
+# Sai com código 1 se algum limite for excedido e 2 se a medição falhar.
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+import constants as C
+
+APP_DIR = Path(__file__).parent.resolve()
+APP_SCRIPT = APP_DIR / "Zap_Fácil.pyw"
+
+# O que o Zap_Fácil.pyw importa antes de mostrar a primeira janela.
+STARTUP_MODULES = ("wx", "config_manager", "disclaimer_ui", "ui", "functions")
+
+# Dependências que devem ser carregadas apenas no primeiro uso.
+HEAVY_MODULES = ("selenium", "numpy", "noisereduce", "sounddevice", "soundfile",
+                 "openpyxl", "apscheduler", "cryptography", "scipy")
+
+DEFAULT_RUNS = 5
+DEFAULT_IMPORT_BUDGET_MS = 700
+DEFAULT_WINDOW_BUDGET_MS = 3000
+WINDOW_TIMEOUT_SECONDS = 60
+REPORT_TOP = 15
+
+
+def parse_importtime(output):
+    """
+    Converte a saída de '-X importtime' em uma lista de
+    (módulo, tempo próprio em µs, tempo acumulado em µs, nível).
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Cabeçalho da tabela
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        level = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, int(fields[0]), int(fields[1]), level))
+    return entries
+
+
+def measure_imports(modules):
+    """Importa os módulos em um interpretador novo e retorna as entradas do importtime."""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=APP_DIR, capture_output=True, text=True, encoding="utf-8")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def measure_window():
+    """Abre o programa em modo de medição; retorna os ms até a primeira janela."""
+    env = dict(os.environ, **{C.STARTUP_PROBE_ENV: "1"})
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, str(APP_SCRIPT)], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True, encoding="utf-8",
+                            timeout=WINDOW_TIMEOUT_SECONDS)
+    elapsed = (time.perf_counter() - start) * 1000
+    if C.STARTUP_PROBE_MARKER not in result.stdout:
+        raise RuntimeError(
+            "O programa encerrou sem abrir a janela: " + (result.stderr.strip() or "sem detalhes"))
+    return elapsed
+
+
+def heavy_imports(entries):
+    """Dependências pesadas presentes nas entradas (só o pacote de topo)."""
+    found = {name.split(".")[0] for name, _, _, _ in entries}
+    return sorted(found.intersection(HEAVY_MODULES))
+
+
+def print_report(runs, entries):
+    totals = [sum(cumulative for _, _, cumulative, level in run if level == 0) / 1000
+              for run in runs]
+    print(f"Importações da abertura ({len(runs)} rodada(s)):")
+    print(f"  mediana {statistics.median(totals):.1f} ms | "
+          f"mínimo {min(totals):.1f} ms | máximo {max(totals):.1f} ms")
+    print(f"\n  {'acumulado (ms)':>15} {'próprio (ms)':>13}  módulo")
+    for name, own, cumulative, level in sorted(entries, key=lambda e: e[2], reverse=True)[:REPORT_TOP]:
+        print(f"  {cumulative / 1000:>15.1f} {own / 1000:>13.1f}  {'  ' * level}{name}")
+    return statistics.median(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o tempo de abertura do Zap Fácil.")
+    parser.add_argument("--rodadas", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--limite-importacao-ms", type=float,
+                        default=DEFAULT_IMPORT_BUDGET_MS)
+    parser.add_argument("--limite-janela-ms", type=float,
+                        default=DEFAULT_WINDOW_BUDGET_MS)
+    parser.add_argument("--sem-janela", action="store_true",
+                        help="Mede apenas as importações (sem abrir a interface).")
+    parser.add_argument("--modulos", default=",".join(STARTUP_MODULES),
+                        help="Módulos importados na abertura, separados por vírgula.")
+    args = parser.parse_args()
+    modules = [m.strip() for m in args.modulos.split(",") if m.strip()]
+    problems = []
+
+    # A primeira rodada compila os .pyc e não entra na conta.
+    measure_imports(modules)
+    runs = [measure_imports(modules) for _ in range(max(1, args.rodadas))]
+    import_ms = print_report(runs, runs[-1])
+    if import_ms > args.limite_importacao_ms:
+        problems.append(
+            f"Importações levaram {import_ms:.1f} ms (limite {args.limite_importacao_ms:.0f} ms).")
+    heavy = heavy_imports(runs[-1])
+    if heavy:
+        problems.append(
+            f"Dependências pesadas importadas na abertura: {', '.join(heavy)}.")
+
+    if not args.sem_janela:
+        measure_window()
+        window_times = [measure_window() for _ in range(max(1, args.rodadas))]
+        window_ms = statistics.median(window_times)
+        print(f"\nJanela visível: mediana {window_ms:.0f} ms | "
+              f"mínimo {min(window_times):.0f} ms | máximo {max(window_times):.0f} ms")
+        if window_ms > args.limite_janela_ms:
+            problems.append(
+                f"Janela levou {window_ms:.0f} ms para aparecer (limite {args.limite_janela_ms:.0f} ms).")
+
+    if problems:
+        print("\n[FALHA] " + "\n[FALHA] ".join(problems))
+        return 1
+    print("\n[OK] Abertura dentro dos limites.")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"[ERRO] Não foi possível medir a abertura: {e}")
+        sys.exit(2)
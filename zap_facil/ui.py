@@ -4,11 +4,15 @@ import wx.adv
 import threading
 import sys
 import os
+from datetime import datetime
 from pathlib import Path
 
 # --- Módulos do Projeto ---
 import system_utils
 import config_manager
+import settings
+import log_buffer
+import event_bus
 import constants as C
 
 # --- Funções Auxiliares ---
@@ -33,12 +37,12 @@ def get_icon_path(filename):
         return icon_path
     return None
 
-# --- Classes de Diálogo (ScheduleDialog, ReportsDialog) ---
+# --- Classes de Diálogo (ScheduleDialog, ReportsDialog, OptOutDialog) ---
 
 class ScheduleDialog(wx.Dialog):
     def __init__(self, parent, bot):
         super(ScheduleDialog, self).__init__(
-            parent, title="Agendamento de Cobranças", size=(600, 550))
+            parent, title="Agendamento de Cobranças", size=(600, 640))
         self.bot = bot
         self.SetBackgroundColour(C.THEME_COLORS["panel"])
         self.SetForegroundColour(C.THEME_COLORS["text"])
@@ -79,6 +83,16 @@ class ScheduleDialog(wx.Dialog):
         self.schedule_msg = wx.TextCtrl(panel, style=wx.TE_MULTILINE)
         self.schedule_msg.SetValue(C.DEFAULT_SCHEDULE_MSG)
         gbs.Add(self.schedule_msg, pos=(5, 0), span=(1, 4), flag=wx.EXPAND)
+        gbs.Add(wx.StaticText(panel, label="Não reenviar ao mesmo contato por (horas):"),
+                pos=(6, 0), span=(1, 2), flag=wx.ALIGN_CENTER_VERTICAL)
+        self.schedule_cooldown = wx.SpinCtrl(
+            panel, min=0, max=C.MAX_CONTACT_COOLDOWN_HOURS, initial=0)
+        gbs.Add(self.schedule_cooldown, pos=(6, 2),
+                flag=wx.ALIGN_CENTER_VERTICAL)
+        self.schedule_export = wx.CheckBox(
+            panel, label="Exportar planilha de resultados ao final de cada execução")
+        self.schedule_export.SetValue(True)
+        gbs.Add(self.schedule_export, pos=(7, 0), span=(1, 4))
         gbs.AddGrowableRow(5)
         gbs.AddGrowableCol(2)
         panel.SetSizer(gbs)
@@ -103,27 +117,21 @@ class ScheduleDialog(wx.Dialog):
             wx.EVT_BUTTON, lambda evt: self.EndModal(wx.ID_CANCEL))
 
     def _load_schedule_settings(self):
-        settings = self.bot.load_schedule_settings()
-        self.schedule_enable_check.SetValue(
-            settings.get('enabled', 'false').lower() == 'true')
-        try:
-            hour, minute = map(int, settings.get('time', '09:00').split(':'))
-            self.schedule_time_picker.SetValue(
-                wx.DateTime().Set(hour=hour, minute=minute, second=0))
-        except:
-            pass
-        days_of_week = settings.get(
-            'days_of_week', 'mon,tue,wed,thu,fri').split(',')
+        schedule = self.bot.load_schedule_settings()
+        self.schedule_enable_check.SetValue(schedule.enabled)
+        self.schedule_time_picker.SetValue(
+            wx.DateTime().Set(hour=schedule.hour, minute=schedule.minute, second=0))
         for code, chk in self.day_checks.items():
-            chk.SetValue(code in days_of_week)
-        self.schedule_file_path.SetValue(settings.get('filepath', ''))
-        self.schedule_msg.SetValue(settings.get(
-            'message', C.DEFAULT_SCHEDULE_MSG))
+            chk.SetValue(code in schedule.days_of_week)
+        self.schedule_file_path.SetValue(schedule.filepath)
+        self.schedule_msg.SetValue(schedule.message)
+        self.schedule_cooldown.SetValue(int(schedule.cooldown_hours))
+        self.schedule_export.SetValue(schedule.export_results)
         self.OnToggleScheduleControls(None)
 
     def OnToggleScheduleControls(self, event):
         is_enabled = self.schedule_enable_check.GetValue()
-        for ctrl in [self.schedule_time_picker, self.schedule_file_path, self.schedule_browse_btn, self.schedule_msg, *self.day_checks.values()]:
+        for ctrl in [self.schedule_time_picker, self.schedule_file_path, self.schedule_browse_btn, self.schedule_msg, self.schedule_cooldown, self.schedule_export, *self.day_checks.values()]:
             ctrl.Enable(is_enabled)
 
     def OnBrowseScheduleFile(self, event):
@@ -142,81 +150,482 @@ class ScheduleDialog(wx.Dialog):
                               "Erro", wx.OK | wx.ICON_ERROR)
                 return
         dt = self.schedule_time_picker.GetValue()
-        settings = {'enabled': self.schedule_enable_check.GetValue(), 'time': f"{dt.GetHour():02d}:{dt.GetMinute():02d}", 'days_of_week': ",".join(
-            [code for code, chk in self.day_checks.items() if chk.IsChecked()]), 'filepath': self.schedule_file_path.GetValue(), 'message': self.schedule_msg.GetValue(), 'attachment': ''}
-        self.bot.save_schedule_settings(settings)
+        schedule_settings = {'enabled': self.schedule_enable_check.GetValue(), 'time': f"{dt.GetHour():02d}:{dt.GetMinute():02d}", 'days_of_week': ",".join(
+            [code for code, chk in self.day_checks.items() if chk.IsChecked()]), 'filepath': self.schedule_file_path.GetValue(), 'message': self.schedule_msg.GetValue(), 'attachment': '', 'cooldown_hours': self.schedule_cooldown.GetValue(), 'export_results': self.schedule_export.GetValue()}
+        self.bot.save_schedule_settings(schedule_settings)
         self.GetParent().log_message(
             "[AGENDADOR] Configurações salvas!", C.THEME_COLORS["accent_purple"])
         self.EndModal(wx.ID_OK)
 
 
+def _format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M:%S') if timestamp else "-"
+
+
+class PagedListCtrl(wx.ListCtrl):
+    """Lista virtual: as linhas são buscadas em páginas, apenas quando exibidas."""
+
+    def __init__(self, parent, columns, fetch_page, format_row):
+        super(PagedListCtrl, self).__init__(
+            parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+        for index, (label, width) in enumerate(columns):
+            self.InsertColumn(index, label, width=width)
+        self.fetch_page = fetch_page
+        self.format_row = format_row
+        self._pages = {}
+
+    def Reset(self, count):
+        self._pages.clear()
+        self.SetItemCount(count)
+        self.Refresh()
+
+    def GetRow(self, index):
+        page, position = divmod(index, C.REPORTS_PAGE_SIZE)
+        if page not in self._pages:
+            if len(self._pages) >= C.REPORTS_CACHED_PAGES:
+                self._pages.clear()
+            self._pages[page] = self.fetch_page(
+                page * C.REPORTS_PAGE_SIZE, C.REPORTS_PAGE_SIZE)
+        rows = self._pages[page]
+        return rows[position] if position < len(rows) else None
+
+    def OnGetItemText(self, item, column):
+        row = self.GetRow(item)
+        return self.format_row(row)[column] if row else ""
+
+
 class ReportsDialog(wx.Dialog):
     def __init__(self, parent, bot):
         super(ReportsDialog, self).__init__(
-            parent, title="Relatórios de Campanha", size=(800, 600))
+            parent, title="Relatórios de Campanha", size=(1000, 650))
         self.bot = bot
+        self.campaign_id = None
         self.SetBackgroundColour(C.THEME_COLORS["panel"])
         self.SetForegroundColour(C.THEME_COLORS["text"])
         main_sizer = wx.BoxSizer(wx.HORIZONTAL)
         left_panel = wx.Panel(self)
         left_sizer = wx.BoxSizer(wx.VERTICAL)
-        self.report_list = wx.ListBox(left_panel)
+        self.campaign_list = PagedListCtrl(
+            left_panel,
+            [("Início", 140), ("Situação", 100), ("Total", 55),
+             ("Sucessos", 65), ("Falhas", 55)],
+            self.bot.get_campaigns, self._format_campaign)
+        self.analytics_label = wx.StaticText(left_panel, label="")
+        self.analytics_label.SetForegroundColour(C.THEME_COLORS["primary"])
+        left_sizer.Add(self.analytics_label, 0, wx.EXPAND | wx.ALL, 5)
         left_sizer.Add(wx.StaticText(
-            left_panel, label="Relatórios Gerados:"), 0, wx.ALL, 5)
-        left_sizer.Add(self.report_list, 1, wx.EXPAND | wx.ALL, 5)
+            left_panel, label="Campanhas:"), 0, wx.ALL, 5)
+        left_sizer.Add(self.campaign_list, 1, wx.EXPAND | wx.ALL, 5)
         left_panel.SetSizer(left_sizer)
         right_panel = wx.Panel(self)
         right_sizer = wx.BoxSizer(wx.VERTICAL)
-        self.report_content = wx.TextCtrl(
-            right_panel, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2)
-        self.report_content.SetBackgroundColour(C.THEME_COLORS["background"])
-        self.report_content.SetForegroundColour(C.THEME_COLORS["text"])
+        self.summary = wx.StaticText(right_panel, label="")
+        self.recipient_list = PagedListCtrl(
+            right_panel,
+            [("#", 50), ("Destinatário", 150), ("Nome", 120),
+             ("Status", 120), ("Motivo", 200)],
+            self._fetch_recipients, self._format_recipient)
         button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.view_txt_btn = wx.Button(right_panel, label="Ver .txt")
+        self.view_rejected_btn = wx.Button(
+            right_panel, label="Ver Rejeitados")
+        self.export_btn = wx.Button(right_panel, label="Exportar .txt...")
+        self.export_results_btn = wx.Button(
+            right_panel, label="Exportar Planilha...")
         self.delete_btn = wx.Button(right_panel, label="Excluir")
         self.close_btn = wx.Button(right_panel, label="Fechar")
+        button_sizer.Add(self.view_txt_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.view_rejected_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.export_btn, 0, wx.ALL, 5)
+        button_sizer.Add(self.export_results_btn, 0, wx.ALL, 5)
         button_sizer.Add(self.delete_btn, 0, wx.ALL, 5)
         button_sizer.AddStretchSpacer()
         button_sizer.Add(self.close_btn, 0, wx.ALL, 5)
         right_sizer.Add(wx.StaticText(
-            right_panel, label="Conteúdo do Relatório:"), 0, wx.ALL, 5)
-        right_sizer.Add(self.report_content, 1, wx.EXPAND | wx.ALL, 5)
+            right_panel, label="Detalhes da Campanha:"), 0, wx.ALL, 5)
+        right_sizer.Add(self.summary, 0, wx.EXPAND | wx.ALL, 5)
+        right_sizer.Add(self.recipient_list, 1, wx.EXPAND | wx.ALL, 5)
         right_sizer.Add(button_sizer, 0, wx.EXPAND | wx.ALL, 5)
         right_panel.SetSizer(right_sizer)
-        main_sizer.Add(left_panel, 1, wx.EXPAND | wx.ALL, 10)
-        main_sizer.Add(right_panel, 2, wx.EXPAND | wx.ALL, 10)
+        main_sizer.Add(left_panel, 2, wx.EXPAND | wx.ALL, 10)
+        main_sizer.Add(right_panel, 3, wx.EXPAND | wx.ALL, 10)
         self.SetSizer(main_sizer)
         self.BindEvents()
         self.RefreshReportList()
 
     def BindEvents(self):
-        self.report_list.Bind(wx.EVT_LISTBOX, self.OnReportSelected)
+        self.campaign_list.Bind(wx.EVT_LIST_ITEM_SELECTED,
+                                self.OnReportSelected)
+        self.view_txt_btn.Bind(wx.EVT_BUTTON, self.OnViewReportFile)
+        self.view_rejected_btn.Bind(wx.EVT_BUTTON, self.OnViewRejectedFile)
+        self.export_btn.Bind(wx.EVT_BUTTON, self.OnExportReport)
+        self.export_results_btn.Bind(wx.EVT_BUTTON, self.OnExportResults)
         self.delete_btn.Bind(wx.EVT_BUTTON, self.OnDeleteReport)
         self.close_btn.Bind(wx.EVT_BUTTON, lambda e: self.Close())
 
+    def _format_campaign(self, campaign):
+        return (_format_timestamp(campaign["started_at"]), campaign["status"],
+                str(campaign["total"]), str(campaign["success"]), str(campaign["fail"]))
+
+    def _format_recipient(self, recipient):
+        return (str(recipient["seq"]), recipient["identifier"], recipient["name"] or "",
+                recipient["status"], recipient["reason"] or "")
+
+    def _fetch_recipients(self, offset, limit):
+        if self.campaign_id is None:
+            return []
+        return self.bot.get_campaign_recipients(self.campaign_id, offset, limit)
+
+    def RefreshAnalytics(self):
+        stats = self.bot.get_report_analytics()
+        if not stats or not stats["total"]:
+            self.analytics_label.SetLabel(
+                "Sem envios registrados nos últimos dias.")
+            return
+        lines = [f"Últimos {stats['days']} dias: {stats['campaigns']} campanha(s), {stats['total']} destinatário(s)",
+                 f"Taxa de sucesso: {stats['success_rate']:.1%}"]
+        if stats["avg_duration_ms"] is not None:
+            lines[-1] += f"    Tempo médio por destinatário: {stats['avg_duration_ms'] / 1000:.1f}s"
+        if stats["top_reasons"]:
+            lines.append("Principais falhas: " + "; ".join(
+                f"{reason} ({count})" for reason, count in stats["top_reasons"]))
+        self.analytics_label.SetLabel("\n".join(lines))
+        self.Layout()
+
     def RefreshReportList(self):
-        self.report_list.Clear()
-        reports = self.bot.get_reports()
-        if reports:
-            self.report_list.InsertItems(reports, 0)
-        self.report_content.Clear()
+        self.campaign_id = None
+        self.RefreshAnalytics()
+        self.campaign_list.Reset(self.bot.count_campaigns())
+        self.recipient_list.Reset(0)
+        self.summary.SetLabel("")
+        self.view_txt_btn.Disable()
+        self.view_rejected_btn.Disable()
+        self.export_btn.Disable()
+        self.export_results_btn.Disable()
         self.delete_btn.Disable()
 
     def OnReportSelected(self, e):
-        sel = self.report_list.GetStringSelection()
-        if sel:
-            self.report_content.SetValue(self.bot.get_report_content(sel))
-            self.delete_btn.Enable()
+        campaign = self.campaign_list.GetRow(e.GetIndex())
+        if not campaign:
+            return
+        self.campaign_id = campaign["id"]
+        self.summary.SetLabel(
+            f"Início: {_format_timestamp(campaign['started_at'])}    "
+            f"Fim: {_format_timestamp(campaign['finished_at'])}\n"
+            f"Origem: {campaign['source_path'] or '-'}\n"
+            f"Total: {campaign['total']}    Sucessos: {campaign['success']}    "
+            f"Falhas: {campaign['fail']}    Rejeitados na pré-validação: {campaign['rejected']}")
+        self.recipient_list.Reset(
+            self.bot.count_campaign_recipients(self.campaign_id))
+        self.view_txt_btn.Enable(bool(campaign["report_file"]))
+        self.view_rejected_btn.Enable(bool(campaign["rejected"]))
+        self.export_btn.Enable()
+        self.export_results_btn.Enable()
+        self.delete_btn.Enable()
+        self.Layout()
+
+    def OnViewReportFile(self, e):
+        self._show_report_file(rejected=False)
+
+    def OnViewRejectedFile(self, e):
+        self._show_report_file(rejected=True)
+
+    def _show_report_file(self, rejected):
+        if self.campaign_id is None:
+            return
+        report_file = self.bot.open_report_file(self.campaign_id, rejected)
+        if not report_file:
+            wx.MessageBox(f"O arquivo {'de rejeitados' if rejected else '.txt'} desta campanha não foi encontrado.",
+                          "Aviso", wx.OK | wx.ICON_WARNING)
+            return
+        try:
+            with ReportFileDialog(self, report_file) as dialog:
+                dialog.ShowModal()
+        finally:
+            report_file.close()
+
+    def OnExportReport(self, e):
+        if self.campaign_id is None:
+            return
+        with wx.FileDialog(self, "Exportar Relatório", wildcard="Texto (*.txt)|*.txt",
+                           defaultFile=f"{C.REPORT_FILE_PREFIX}{self.campaign_id}.txt",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dialog:
+            if dialog.ShowModal() == wx.ID_OK and self.bot.export_campaign_txt(self.campaign_id, dialog.GetPath()):
+                wx.MessageBox("Relatório exportado.", "Sucesso",
+                              wx.OK | wx.ICON_INFORMATION)
+
+    def OnExportResults(self, e):
+        if self.campaign_id is None:
+            return
+        with wx.FileDialog(self, "Exportar Resultados", wildcard=C.WILDCARD_EXPORT,
+                           defaultFile=f"{C.RESULT_EXPORT_PREFIX}{self.campaign_id}.xlsx",
+                           style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dialog:
+            if dialog.ShowModal() != wx.ID_OK:
+                return
+            path = dialog.GetPath()
+        # Planilhas grandes levam tempo para gravar; a janela segue livre e o
+        # resultado chega pela thread da interface.
+        self.export_results_btn.Disable()
+        campaign_id = self.campaign_id
+        threading.Thread(target=lambda: wx.CallAfter(
+            self._on_results_exported, self.bot.export_campaign_results(campaign_id, path)),
+            daemon=True).start()
+
+    def _on_results_exported(self, exported):
+        if not self:
+            # A janela foi fechada durante a exportação; o log já registrou o resultado.
+            return
+        self.export_results_btn.Enable(self.campaign_id is not None)
+        if exported:
+            wx.MessageBox("Resultados exportados.", "Sucesso",
+                          wx.OK | wx.ICON_INFORMATION, self)
 
     def OnDeleteReport(self, e):
-        sel = self.report_list.GetStringSelection()
-        if not sel:
+        if self.campaign_id is None:
             return
-        if wx.MessageDialog(self, f"Excluir o relatório '{sel}'?", "Confirmar", wx.YES_NO | wx.ICON_WARNING).ShowModal() == wx.ID_YES:
-            if self.bot.delete_report(sel):
+        if wx.MessageDialog(self, "Excluir o relatório desta campanha?", "Confirmar", wx.YES_NO | wx.ICON_WARNING).ShowModal() == wx.ID_YES:
+            if self.bot.delete_campaign(self.campaign_id):
                 wx.MessageBox("Relatório excluído.", "Sucesso",
                               wx.OK | wx.ICON_INFORMATION)
                 self.RefreshReportList()
 
+
+class ReportFileDialog(wx.Dialog):
+    FILTER_CHOICES = ["Todas as linhas", C.STATUS_FAILURE, C.STATUS_PARTIAL]
+
+    def __init__(self, parent, report_file):
+        super(ReportFileDialog, self).__init__(
+            parent, title=report_file.path.name, size=(900, 600),
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        self.report_file = report_file
+        self.selection = None
+        self.SetBackgroundColour(C.THEME_COLORS["panel"])
+        self.SetForegroundColour(C.THEME_COLORS["text"])
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+        filter_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.filter_choice = wx.Choice(self, choices=self.FILTER_CHOICES)
+        self.filter_choice.SetSelection(0)
+        self.count_label = wx.StaticText(self, label="")
+        filter_sizer.Add(wx.StaticText(self, label="Exibir:"),
+                         0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
+        filter_sizer.Add(self.filter_choice, 0, wx.RIGHT, 10)
+        filter_sizer.Add(self.count_label, 0, wx.ALIGN_CENTER_VERTICAL)
+        main_sizer.Add(filter_sizer, 0, wx.ALL, 10)
+        self.lines = PagedListCtrl(
+            self, [("Conteúdo", 860)], self._fetch_lines, lambda line: (line,))
+        self.lines.SetFont(wx.Font(9, wx.FONTFAMILY_TELETYPE,
+                                   wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+        main_sizer.Add(self.lines, 1, wx.EXPAND |
+                       wx.LEFT | wx.RIGHT, 10)
+        self.close_btn = wx.Button(self, label="Fechar")
+        main_sizer.Add(self.close_btn, 0, wx.ALIGN_RIGHT | wx.ALL, 10)
+        self.SetSizer(main_sizer)
+        self.BindEvents()
+        self.ApplyFilter()
+
+    def BindEvents(self):
+        self.filter_choice.Bind(wx.EVT_CHOICE, lambda e: self.ApplyFilter())
+        self.close_btn.Bind(wx.EVT_BUTTON, lambda e: self.Close())
+
+    def _fetch_lines(self, offset, limit):
+        return self.report_file.lines(offset, limit, self.selection)
+
+    def ApplyFilter(self):
+        choice = self.filter_choice.GetSelection()
+        self.selection = None if choice == 0 else self.report_file.find_status(
+            self.FILTER_CHOICES[choice])
+        count = len(self.report_file) if self.selection is None else len(
+            self.selection)
+        self.lines.Reset(count)
+        self.count_label.SetLabel(f"{count} linha(s)")
+
+
+class ReportSearchDialog(wx.Dialog):
+    STATUS_CHOICES = ["Todos", C.STATUS_SUCCESS,
+                      C.STATUS_PARTIAL, C.STATUS_FAILURE]
+
+    def __init__(self, parent, bot):
+        super(ReportSearchDialog, self).__init__(
+            parent, title="Buscar Destinatário nos Relatórios", size=(800, 500))
+        self.bot = bot
+        self.SetBackgroundColour(C.THEME_COLORS["panel"])
+        self.SetForegroundColour(C.THEME_COLORS["text"])
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+        search_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.term = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER)
+        self.term.SetHint("Telefone ou nome do grupo")
+        self.status_choice = wx.Choice(self, choices=self.STATUS_CHOICES)
+        self.status_choice.SetSelection(0)
+        self.search_btn = wx.Button(self, label="Buscar")
+        search_sizer.Add(self.term, 1, wx.RIGHT, 5)
+        search_sizer.Add(self.status_choice, 0, wx.RIGHT, 5)
+        search_sizer.Add(self.search_btn, 0)
+        main_sizer.Add(search_sizer, 0, wx.EXPAND | wx.ALL, 10)
+        self.result_label = wx.StaticText(self, label="")
+        main_sizer.Add(self.result_label, 0, wx.LEFT | wx.RIGHT, 10)
+        self.results = wx.ListCtrl(self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
+        for index, (label, width) in enumerate([("Campanha", 140), ("Enviado em", 140), ("Destinatário", 150),
+                                                ("Status", 120), ("Motivo", 200)]):
+            self.results.InsertColumn(index, label, width=width)
+        main_sizer.Add(self.results, 1, wx.EXPAND | wx.ALL, 10)
+        self.close_btn = wx.Button(self, label="Fechar")
+        main_sizer.Add(self.close_btn, 0, wx.ALIGN_RIGHT |
+                       wx.RIGHT | wx.BOTTOM, 10)
+        self.SetSizer(main_sizer)
+        self.BindEvents()
+
+    def BindEvents(self):
+        self.search_btn.Bind(wx.EVT_BUTTON, self.OnSearch)
+        self.term.Bind(wx.EVT_TEXT_ENTER, self.OnSearch)
+        self.close_btn.Bind(wx.EVT_BUTTON, lambda e: self.Close())
+
+    def OnSearch(self, e):
+        term = self.term.GetValue().strip()
+        if not term:
+            return
+        status = self.status_choice.GetStringSelection()
+        rows = self.bot.search_reports(
+            term, None if status == "Todos" else status)
+        self.results.DeleteAllItems()
+        for row in rows:
+            index = self.results.InsertItem(
+                self.results.GetItemCount(), _format_timestamp(row["started_at"]))
+            self.results.SetItem(
+                index, 1, _format_timestamp(row["processed_at"]))
+            self.results.SetItem(index, 2, row["identifier"])
+            self.results.SetItem(index, 3, row["status"])
+            self.results.SetItem(index, 4, row["reason"] or "")
+        label = f"{len(rows)} ocorrência(s) encontrada(s)."
+        stats = self.bot.get_recipient_stats(term)
+        if stats:
+            label += f"  Total acumulado: {stats['attempts']} envio(s), {stats['success']} sucesso(s), {stats['fail']} falha(s)."
+        self.result_label.SetLabel(label)
+
+
+class DriverStatsDialog(wx.Dialog):
+    """Tempos das chamadas ao navegador na campanha atual, atualizados ao vivo."""
+    COLUMNS = [("Fase", 190), ("Chamadas", 75), ("Média", 70), ("p50", 75),
+               ("p95", 75), ("Máximo", 70), ("Timeouts", 70), ("Erros", 55)]
+    FIELDS = ["phase", "count", "avg", "p50",
+              "p95", "max", "timeouts", "errors"]
+
+    def __init__(self, parent, bot):
+        super(DriverStatsDialog, self).__init__(
+            parent, title="Estatísticas do Navegador", size=(720, 320),
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        self.bot = bot
+        self.SetBackgroundColour(C.THEME_COLORS["panel"])
+        self.SetForegroundColour(C.THEME_COLORS["text"])
+        self.InitUI()
+        self.BindEvents()
+        self.RefreshStats()
+        self.timer.Start(C.DRIVER_STATS_REFRESH_MS)
+
+    def InitUI(self):
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+        self.stats_list = wx.ListCtrl(self, style=wx.LC_REPORT)
+        for index, (label, width) in enumerate(self.COLUMNS):
+            self.stats_list.InsertColumn(index, label, width=width)
+        self.empty_label = wx.StaticText(
+            self, label="Nenhuma chamada registrada nesta campanha.")
+        self.close_btn = wx.Button(self, label="Fechar")
+        main_sizer.Add(self.stats_list, 1, wx.EXPAND | wx.ALL, 10)
+        main_sizer.Add(self.empty_label, 0, wx.LEFT | wx.RIGHT, 10)
+        main_sizer.Add(self.close_btn, 0, wx.ALIGN_RIGHT | wx.ALL, 10)
+        self.SetSizer(main_sizer)
+        self.timer = wx.Timer(self)
+
+    def BindEvents(self):
+        self.Bind(wx.EVT_TIMER, lambda e: self.RefreshStats(), self.timer)
+        self.close_btn.Bind(wx.EVT_BUTTON, lambda e: self.Close())
+        self.Bind(wx.EVT_CLOSE, self.OnClose)
+
+    def RefreshStats(self):
+        rows = self.bot.get_driver_stats()
+        self.stats_list.Freeze()
+        try:
+            self.stats_list.DeleteAllItems()
+            for row in rows:
+                index = self.stats_list.InsertItem(
+                    self.stats_list.GetItemCount(), str(row["phase"]))
+                for column, field in enumerate(self.FIELDS[1:], start=1):
+                    self.stats_list.SetItem(index, column, str(row[field]))
+        finally:
+            self.stats_list.Thaw()
+        self.empty_label.Show(not rows)
+        self.Layout()
+
+    def OnClose(self, e):
+        self.timer.Stop()
+        self.Destroy()
+
+
+class OptOutDialog(wx.Dialog):
+    def __init__(self, parent, bot):
+        super(OptOutDialog, self).__init__(
+            parent, title="Lista de Exclusão", size=(480, 460))
+        self.bot = bot
+        self.SetBackgroundColour(C.THEME_COLORS["panel"])
+        self.SetForegroundColour(C.THEME_COLORS["text"])
+        main_sizer = wx.BoxSizer(wx.VERTICAL)
+        self.count_label = wx.StaticText(self)
+        main_sizer.Add(self.count_label, 0, wx.ALL, 10)
+        main_sizer.Add(wx.StaticText(self, label="Números ou nomes de grupo (um por linha):"),
+                       0, wx.LEFT | wx.RIGHT, 10)
+        self.entries = wx.TextCtrl(self, style=wx.TE_MULTILINE)
+        self.entries.SetHint("Ex: 5511987654321")
+        main_sizer.Add(self.entries, 1, wx.EXPAND | wx.ALL, 10)
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.add_btn = wx.Button(self, label="Adicionar")
+        self.remove_btn = wx.Button(self, label="Remover")
+        self.import_btn = wx.Button(self, label="Importar Arquivo...")
+        self.close_btn = wx.Button(self, label="Fechar")
+        button_sizer.Add(self.add_btn, 0, wx.RIGHT, 5)
+        button_sizer.Add(self.remove_btn, 0, wx.RIGHT, 5)
+        button_sizer.Add(self.import_btn, 0)
+        button_sizer.AddStretchSpacer()
+        button_sizer.Add(self.close_btn, 0)
+        main_sizer.Add(button_sizer, 0, wx.EXPAND |
+                       wx.BOTTOM | wx.RIGHT | wx.LEFT, 10)
+        self.SetSizer(main_sizer)
+        self.BindEvents()
+        self.RefreshCount()
+
+    def BindEvents(self):
+        self.add_btn.Bind(wx.EVT_BUTTON, self.OnAdd)
+        self.remove_btn.Bind(wx.EVT_BUTTON, self.OnRemove)
+        self.import_btn.Bind(wx.EVT_BUTTON, self.OnImport)
+        self.close_btn.Bind(wx.EVT_BUTTON, lambda e: self.Close())
+
+    def RefreshCount(self):
+        self.count_label.SetLabel(
+            f"Destinatários na lista de exclusão: {self.bot.get_optout_count()}")
+
+    def _get_entries(self):
+        return [line.strip() for line in self.entries.GetValue().splitlines() if line.strip()]
+
+    def OnAdd(self, e):
+        entries = self._get_entries()
+        if not entries:
+            return
+        self.bot.add_to_optout(entries)
+        self.entries.Clear()
+        self.RefreshCount()
+
+    def OnRemove(self, e):
+        entries = self._get_entries()
+        if not entries:
+            return
+        self.bot.remove_from_optout(entries)
+        self.entries.Clear()
+        self.RefreshCount()
+
+    def OnImport(self, e):
+        with wx.FileDialog(self, "Escolha a lista de exclusão", wildcard=C.WILDCARD_CONTACTS, style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fd:
+            if fd.ShowModal() == wx.ID_OK:
+                self.bot.import_optout_file(fd.GetPath())
+                self.RefreshCount()
+
 # --- Classe do Ícone da Barra de Tarefas ---
 
 
@@ -248,14 +657,16 @@ class ZapFacilUI(wx.Frame):
     def __init__(self, parent, title):
         super(ZapFacilUI, self).__init__(parent, title=title, size=(720, 850))
         self.bot = None
+        self.stats_dialog = None
+        self.log_buffer = log_buffer.LogBuffer()
         self._setup_theme()
         self.taskBarIcon = TaskBarIcon(self)
         self.InitUI()
         self._create_menu_bar()
-        self.statusBar = self.CreateStatusBar(2)
-        self.statusBar.SetStatusWidths([-1, 180])
+        self.statusBar = self.CreateStatusBar(3)
+        self.statusBar.SetStatusWidths([-1, 150, 180])
         self.statusBar.SetStatusText("Aguardando inicialização...", 0)
-        self.statusBar.SetStatusText(f"{C.COMPANY_NAME} v{C.APP_VERSION}", 1)
+        self.statusBar.SetStatusText(f"{C.COMPANY_NAME} v{C.APP_VERSION}", 2)
         self.Centre()
         self.SetMinSize(self.GetSize())
         icon_path = get_icon_path(C.APP_ICON_FILENAME)
@@ -394,12 +805,14 @@ class ZapFacilUI(wx.Frame):
                          self.colors["accent_yellow"])
         self._set_status_text("Conectando...")
         self.activity_indicator.Start()
-        threading.Thread(target=self.bot.setup_driver, daemon=True).start()
+        self.bot.connect()
 
     def _create_menu_bar(self):
         menu_bar = wx.MenuBar()
         file_menu = wx.Menu()
         menu_restore = file_menu.Append(wx.ID_ANY, "&Restaurar\tCtrl+R")
+        menu_resume = file_menu.Append(
+            wx.ID_ANY, "Retomar Última &Campanha")
         file_menu.AppendSeparator()
         menu_exit = file_menu.Append(wx.ID_EXIT, "Sai&r\tAlt+F4")
         schedule_menu = wx.Menu()
@@ -408,22 +821,44 @@ class ZapFacilUI(wx.Frame):
         reports_menu = wx.Menu()
         menu_view_reports = reports_menu.Append(
             wx.ID_ANY, "&Visualizar Relatórios...")
+        menu_search_reports = reports_menu.Append(
+            wx.ID_ANY, "&Buscar Destinatário...")
+        reports_menu.AppendSeparator()
+        self.menu_txt_reports = reports_menu.AppendCheckItem(
+            wx.ID_ANY, "Gerar Relatório em &Texto (.txt)")
+        self.menu_txt_reports.Check(settings.current().general.txt_reports)
         settings_menu = wx.Menu()
         self.menu_startup = settings_menu.AppendCheckItem(
             wx.ID_ANY, "Iniciar com o Sistema")
-        self.menu_startup.Check(config_manager.get_setting(
-            'General', 'start_on_boot', 'false').lower() == 'true')
+        self.menu_startup.Check(settings.current().general.start_on_boot)
+        self.menu_skip_failures = settings_menu.AppendCheckItem(
+            wx.ID_ANY, "Pular Números Recusados Recentemente")
+        self.menu_skip_failures.Check(
+            settings.current().general.skip_known_failures)
+        menu_cooldown = settings_menu.Append(
+            wx.ID_ANY, "Intervalo Mínimo Entre Contatos...")
+        settings_menu.AppendSeparator()
+        menu_optout = settings_menu.Append(
+            wx.ID_ANY, "Lista de &Exclusão...")
         menu_bar.Append(file_menu, "&Arquivo")
         menu_bar.Append(schedule_menu, "&Agendamentos")
         menu_bar.Append(reports_menu, "&Relatórios")
         menu_bar.Append(settings_menu, "&Configurações")
         self.SetMenuBar(menu_bar)
         self.Bind(wx.EVT_MENU, self.OnRestore, menu_restore)
+        self.Bind(wx.EVT_MENU, self.OnResumeCampaign, menu_resume)
         self.Bind(wx.EVT_MENU, self.OnExitApp, menu_exit)
         self.Bind(wx.EVT_MENU, self.OnToggleStartup, self.menu_startup)
         self.Bind(wx.EVT_MENU, self.OnViewReports, menu_view_reports)
+        self.Bind(wx.EVT_MENU, self.OnSearchReports, menu_search_reports)
+        self.Bind(wx.EVT_MENU, self.OnToggleTxtReports,
+                  self.menu_txt_reports)
+        self.Bind(wx.EVT_MENU, self.OnToggleSkipFailures,
+                  self.menu_skip_failures)
         self.Bind(wx.EVT_MENU, self.OnShowScheduleDialog,
                   menu_schedule_collection)
+        self.Bind(wx.EVT_MENU, self.OnShowOptOutDialog, menu_optout)
+        self.Bind(wx.EVT_MENU, self.OnSetContactCooldown, menu_cooldown)
 
     def _create_notebook(self, parent):
         notebook = wx.Notebook(parent)
@@ -520,12 +955,15 @@ class ZapFacilUI(wx.Frame):
         self.parar_btn = self._create_button(
             parent, "Parar", wx.ART_CROSS_MARK)
         self.pausar_btn = self._create_button(parent, "Pausar", wx.ART_PASTE)
+        self.stats_btn = self._create_button(
+            parent, "Estatísticas", wx.ART_REPORT_VIEW)
         self.minimize_btn = self._create_button(
             parent, "Minimizar", wx.ART_GO_DOWN)
         sizer.Add(self.start_campaign_btn, 2, wx.EXPAND | wx.ALL, 5)
         sizer.AddStretchSpacer(1)
         sizer.Add(self.parar_btn, 1, wx.EXPAND | wx.ALL, 5)
         sizer.Add(self.pausar_btn, 1, wx.EXPAND | wx.ALL, 5)
+        sizer.Add(self.stats_btn, 0, wx.ALL, 5)
         sizer.Add(self.minimize_btn, 0, wx.ALL, 5)
         return sizer
 
@@ -546,7 +984,12 @@ class ZapFacilUI(wx.Frame):
         self.start_campaign_btn.Bind(wx.EVT_BUTTON, self.OnStartCampaign)
         self.parar_btn.Bind(wx.EVT_BUTTON, self.OnParar)
         self.pausar_btn.Bind(wx.EVT_BUTTON, self.OnPausar)
+        self.stats_btn.Bind(wx.EVT_BUTTON, self.OnShowDriverStats)
         self.Bind(wx.EVT_CLOSE, self.OnMinimizeToTray)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.OnDestroy)
+        self.log_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self._drain_log, self.log_timer)
+        self.log_timer.Start(C.LOG_DRAIN_INTERVAL_MS)
         self.start_campaign_btn.Enable(False)
         self.parar_btn.Enable(False)
         self.pausar_btn.Enable(False)
@@ -560,6 +1003,7 @@ class ZapFacilUI(wx.Frame):
 
         # Agora iniciamos os serviços que dependem do bot
         if self.bot:
+            self._subscribe_bot_events(self.bot.events)
             # Inicia o agendador em segundo plano (Otimização de performance)
             threading.Thread(
                 target=self.bot.initialize_scheduler, daemon=True).start()
@@ -567,6 +1011,30 @@ class ZapFacilUI(wx.Frame):
             # Inicia a conexão com o WhatsApp
             wx.CallAfter(self.initiate_automatic_connection)
 
+    def _subscribe_bot_events(self, events):
+        # Os eventos chegam pela thread do barramento; cada método abaixo já
+        # repassa o trabalho para a thread da interface.
+        events.subscribe(event_bus.LogMessage,
+                         lambda ev: self.log_message(ev.message, ev.color))
+        events.subscribe(event_bus.ConnectionReady,
+                         lambda ev: self.enable_buttons())
+        events.subscribe(event_bus.ConnectionFailed,
+                         lambda ev: self.on_connection_failed())
+        events.subscribe(event_bus.ConnectionStateChanged,
+                         lambda ev: self.update_connection_status(ev.connected))
+        events.subscribe(event_bus.CampaignStateChanged,
+                         lambda ev: self.update_buttons_for_running(ev.running))
+        events.subscribe(event_bus.PauseStateChanged,
+                         lambda ev: self.update_pause_button(ev.paused))
+        events.subscribe(event_bus.RecordingFailed,
+                         lambda ev: self.on_recording_error())
+        events.subscribe(event_bus.PlaybackStateChanged,
+                         lambda ev: self.set_playback_buttons_state(ev.playing))
+        events.subscribe(event_bus.QueueChanged,
+                         lambda ev: self.update_queue_status(ev.current, ev.pending))
+        events.subscribe(event_bus.BotShutdown,
+                         lambda ev: wx.CallAfter(self.on_bot_shutdown))
+
     def OnShowScheduleDialog(self, e):
         if not self.bot:
             return
@@ -579,6 +1047,12 @@ class ZapFacilUI(wx.Frame):
         with ReportsDialog(self, self.bot) as dialog:
             dialog.ShowModal()
 
+    def OnShowOptOutDialog(self, e):
+        if not self.bot:
+            return
+        with OptOutDialog(self, self.bot) as dialog:
+            dialog.ShowModal()
+
     def OnToggleStartup(self, e):
         is_checked = self.menu_startup.IsChecked()
         if is_checked and system_utils.add_to_startup():
@@ -593,6 +1067,35 @@ class ZapFacilUI(wx.Frame):
         config_manager.save_setting(
             'General', 'start_on_boot', str(is_checked))
 
+    def OnSetContactCooldown(self, e):
+        current = int(settings.current().general.contact_cooldown_hours)
+        hours = wx.GetNumberFromUser(
+            "Campanhas manuais não enviam para quem já recebeu mensagem nas\n"
+            "últimas horas informadas (0 = sem intervalo). As campanhas agendadas\n"
+            "usam o intervalo definido em Agendamentos.",
+            "Horas:", "Intervalo Mínimo Entre Contatos", current,
+            0, C.MAX_CONTACT_COOLDOWN_HOURS, self)
+        if hours < 0 or hours == current:
+            return
+        config_manager.save_setting(
+            'General', 'contact_cooldown_hours', str(hours))
+        self.log_message(
+            f"[INFO] Intervalo mínimo entre contatos: {hours}h.")
+
+    def OnSearchReports(self, e):
+        if not self.bot:
+            return
+        with ReportSearchDialog(self, self.bot) as dialog:
+            dialog.ShowModal()
+
+    def OnToggleTxtReports(self, e):
+        config_manager.save_setting(
+            'General', 'txt_reports', str(self.menu_txt_reports.IsChecked()))
+
+    def OnToggleSkipFailures(self, e):
+        config_manager.save_setting(
+            'General', 'skip_known_failures', str(self.menu_skip_failures.IsChecked()))
+
     def OnSourceTypeChange(self, e): self.manual_panel.Show(self.rb_manual.GetValue(
     )); self.list_panel.Show(not self.rb_manual.GetValue()); self.Layout()
 
@@ -643,8 +1146,20 @@ class ZapFacilUI(wx.Frame):
             wx.MessageBox("A campanha está vazia.",
                           "Aviso", wx.OK | wx.ICON_WARNING)
             return
-        threading.Thread(target=self.bot.start_campaign,
-                         args=(cfg,), daemon=True).start()
+        cfg['cooldown_hours'] = settings.current().general.contact_cooldown_hours
+        # Se já houver uma campanha em andamento, esta aguarda na fila.
+        self.bot.submit_campaign(cfg)
+
+    def OnResumeCampaign(self, e):
+        if not (self.bot and self.bot.driver):
+            wx.MessageBox("Aguarde a conexão com o WhatsApp.",
+                          "Aviso", wx.OK | wx.ICON_WARNING)
+            return
+        if not self.bot.has_resumable_campaign():
+            wx.MessageBox("Nenhuma campanha interrompida para retomar.",
+                          "Aviso", wx.OK | wx.ICON_INFORMATION)
+            return
+        self.bot.resume_last_campaign()
 
     def update_buttons_for_running(self, running): wx.CallAfter(
         self._do_update_buttons_for_running, running)
@@ -652,13 +1167,25 @@ class ZapFacilUI(wx.Frame):
     def _do_update_buttons_for_running(self, running):
         self._set_status_text(
             "Campanha em execução..." if running else "Ocioso")
-        self.start_campaign_btn.Enable(not running)
-        self.notebook.Enable(not running)
+        # Durante uma campanha, o botão iniciar passa a enfileirar a próxima.
+        self.start_campaign_btn.SetLabel(
+            "ADICIONAR À FILA" if running else "INICIAR CAMPANHA")
         self.parar_btn.Enable(running)
         self.pausar_btn.Enable(running)
         for i in range(self.GetMenuBar().GetMenuCount()):
             self.GetMenuBar().EnableTop(i, not running)
 
+    def update_connection_status(self, connected):
+        if connected:
+            self._set_status_text(
+                "Campanha em execução..." if self.bot and self.bot.running else "Conectado")
+        else:
+            self._set_status_text("Conexão perdida. Reconectando...")
+
+    def update_queue_status(self, current, pending):
+        text = f"Fila: {len(pending)} aguardando" if pending else ""
+        self._set_status_text(text, 1)
+
     def update_pause_button(self, paused): wx.CallAfter(
         self._do_update_pause_button, paused)
 
@@ -668,11 +1195,37 @@ class ZapFacilUI(wx.Frame):
         self.pausar_btn.SetBitmap(wx.ArtProvider.GetBitmap(
             wx.ART_GO_FORWARD if paused else wx.ART_PASTE, wx.ART_BUTTON, (16, 16)))
 
-    def log_message(self, message, color=None): wx.CallAfter(
-        self._do_log_message, message, color or self.colors["text"])
+    def log_message(self, message, color=None):
+        # Chamado de qualquer thread; o timer leva as linhas à tela em lotes.
+        self.log_buffer.push(message, color or self.colors["text"])
 
-    def _do_log_message(self, message, color): self.log.SetDefaultStyle(
-        wx.TextAttr(color)); self.log.AppendText(f"{message}\n")
+    def _drain_log(self, e):
+        lines, dropped = self.log_buffer.drain()
+        if dropped:
+            lines.insert(0, (
+                f"[AVISO] {dropped} linha(s) omitida(s) no painel; veja '{log_buffer.LOG_PATH}'.", "orange"))
+        if not lines:
+            return
+        self.log.Freeze()
+        try:
+            for color, text in log_buffer.coalesce(lines):
+                self.log.SetDefaultStyle(wx.TextAttr(color))
+                self.log.AppendText(text)
+            excess = self.log.GetNumberOfLines() - C.LOG_SCREEN_MAX_LINES
+            if excess > 0:
+                # Remove um bloco de uma vez, para não aparar a cada lote.
+                end = self.log.XYToPosition(0, excess + C.LOG_SCREEN_TRIM_LINES)
+                if end > 0:
+                    self.log.Remove(0, end)
+            self.log.ShowPosition(self.log.GetLastPosition())
+        finally:
+            self.log.Thaw()
+
+    def OnDestroy(self, e):
+        if e.GetEventObject() is self:
+            self.log_timer.Stop()
+            self.log_buffer.close()
+        e.Skip()
 
     def OnBrowseContacts(self, e):
         with wx.FileDialog(self, "Escolha a lista", wildcard=C.WILDCARD_CONTACTS, style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fd:
@@ -739,6 +1292,10 @@ class ZapFacilUI(wx.Frame):
 
     def OnParar(self, e):
         if self.bot:
+            pending = len(self.bot.jobs.pending())
+            if pending and wx.MessageBox(f"Há {pending} campanha(s) aguardando na fila.\nCancelar também as campanhas da fila?",
+                                         "Parar", wx.YES_NO | wx.ICON_QUESTION) == wx.YES:
+                self.bot.cancel_queued_campaigns()
             self.log_message("[INFO] Parando...", "yellow")
             self.bot.stop()
 
@@ -746,6 +1303,16 @@ class ZapFacilUI(wx.Frame):
         if self.bot:
             self.bot.toggle_pause()
 
+    def OnShowDriverStats(self, e):
+        if not self.bot:
+            return
+        # Janela sem modo: acompanha a campanha em andamento sem bloquear os
+        # controles (os menus ficam desabilitados enquanto ela roda).
+        if not self.stats_dialog:
+            self.stats_dialog = DriverStatsDialog(self, self.bot)
+        self.stats_dialog.Show()
+        self.stats_dialog.Raise()
+
     def OnMinimizeToTray(self, e):
         self.Hide()
         self.log_message("[INFO] Zap Fácil minimizado.", "yellow")